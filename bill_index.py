@@ -0,0 +1,336 @@
+"""
+Local full-text index of Congress.gov bills.
+
+Bill listings are paged from Congress.gov into a SQLite FTS5 index (title, sponsor, policy
+area and bill number) so searches are answered locally with BM25 ranking instead of
+filtering the few most recently updated bills per Congress. Ingestion is incremental: each
+run only requests bills updated since the newest `updateDate` already indexed.
+"""
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from congress_client import CongressClient
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bills (
+    id TEXT PRIMARY KEY,
+    congress INTEGER NOT NULL,
+    bill_type TEXT NOT NULL,
+    bill_number TEXT NOT NULL,
+    update_date TEXT,
+    has_details INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bills_update_date ON bills (update_date);
+CREATE INDEX IF NOT EXISTS bills_details ON bills (has_details, update_date);
+CREATE VIRTUAL TABLE IF NOT EXISTS bills_fts USING fts5 (
+    title, sponsor, policy_area, number, id UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS ingest_state (
+    congress INTEGER PRIMARY KEY,
+    last_update_date TEXT,
+    last_run TEXT
+);
+"""
+
+# BM25 column weights: title, sponsor, policy_area, number (id is unindexed)
+BM25_WEIGHTS = (10.0, 3.0, 2.0, 6.0, 0.0)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_BILL_CODE = re.compile(r"^\s*(h\.?\s*r|s|h\.?\s*res|s\.?\s*res|h\.?\s*j\.?\s*res|s\.?\s*j\.?\s*res|h\.?\s*con\.?\s*res|s\.?\s*con\.?\s*res)\.?\s*(\d+)\s*$", re.IGNORECASE)
+
+
+class BillIndex:
+    """SQLite FTS5 index of processed bill records (the dicts returned by bill search)"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.generation = 0  # Bumped on every write so readers can invalidate derived data
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM bills").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, records: Iterable[Dict[str, Any]], has_details: bool = False) -> int:
+        """Insert or replace processed bill records; returns the number written"""
+        rows = []
+        for record in records:
+            rows.append((
+                record["id"], int(record["congress"]), record["type"], str(record["number"]),
+                record.get("updateDate") or "", int(has_details), json.dumps(record),
+            ))
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            ids = [(row[0],) for row in rows]
+            if not has_details:
+                # A listing refresh must not discard sponsor/policy area fetched from bill details
+                existing = {
+                    bill_id: json.loads(data)
+                    for bill_id, data in self._conn.execute(
+                        f"SELECT id, data FROM bills WHERE has_details = 1 AND id IN ({','.join('?' * len(ids))})",
+                        [i[0] for i in ids],
+                    )
+                }
+                merged = []
+                for row in rows:
+                    prior = existing.get(row[0])
+                    if prior is None:
+                        merged.append(row)
+                        continue
+                    record = json.loads(row[6])
+                    record["sponsor"] = prior.get("sponsor", record.get("sponsor"))
+                    record["policyArea"] = prior.get("policyArea") or record.get("policyArea", "")
+                    merged.append(row[:5] + (1, json.dumps(record)))
+                rows = merged
+
+            self._conn.executemany("DELETE FROM bills_fts WHERE id = ?", ids)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bills (id, congress, bill_type, bill_number, update_date, has_details, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany(
+                "INSERT INTO bills_fts (title, sponsor, policy_area, number, id) VALUES (?, ?, ?, ?, ?)",
+                [self._fts_row(json.loads(row[6])) for row in rows],
+            )
+            self.generation += 1
+        return len(rows)
+
+    @staticmethod
+    def _fts_row(record: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+        bill_type, number = record.get("type", ""), str(record.get("number", ""))
+        sponsor = record.get("sponsor", "")
+        if sponsor == "Unknown Sponsor":
+            sponsor = ""
+        # Index "HR 1234", "HR1234" and "H.R. 1234" spellings of the bill number
+        number_field = f"{bill_type} {number} {bill_type}{number} {number}"
+        return (record.get("title", ""), sponsor, record.get("policyArea", ""), number_field, record["id"])
+
+    def get_ingest_state(self, congress: int) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT last_update_date FROM ingest_state WHERE congress = ?", (congress,)).fetchone()
+        return row[0] if row else None
+
+    def set_ingest_state(self, congress: int, last_update_date: Optional[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingest_state (congress, last_update_date, last_run) VALUES (?, ?, ?)",
+                (congress, last_update_date, datetime.utcnow().isoformat()),
+            )
+
+    def missing_details(self, limit: int) -> List[Dict[str, Any]]:
+        """Most recently updated records still lacking sponsor/policy area"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM bills WHERE has_details = 0 ORDER BY update_date DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def build_match_query(terms: Iterable[str]) -> str:
+        """FTS5 MATCH expression OR-ing quoted terms (prefix match on each)"""
+        tokens = []
+        for term in terms:
+            words = _TOKEN.findall(term.lower())
+            if not words:
+                continue
+            phrase = " ".join(words)
+            tokens.append(f'"{phrase}"*')
+        return " OR ".join(dict.fromkeys(tokens))
+
+    def search(self, match_query: str, limit: int) -> List[Tuple[Dict[str, Any], float]]:
+        """(record, bm25 score) pairs, best first (lower bm25 is better)"""
+        if not match_query:
+            return []
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT b.data, bm25(bills_fts, {weights}) AS score "
+                f"FROM bills_fts JOIN bills b ON b.id = bills_fts.id "
+                f"WHERE bills_fts MATCH ? ORDER BY score LIMIT ?",
+                (match_query, limit),
+            ).fetchall()
+        return [(json.loads(data), score) for data, score in rows]
+
+    def lookup_number(self, query: str) -> List[Dict[str, Any]]:
+        """Exact bill number lookup for queries like "HR 1234" or "S.567" (all congresses, newest first)"""
+        match = _BILL_CODE.match(query)
+        if not match:
+            return []
+        bill_type = re.sub(r"[^a-z]", "", match.group(1).lower()).upper()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM bills WHERE bill_type = ? AND bill_number = ? ORDER BY congress DESC",
+                (bill_type, match.group(2)),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def changed_since(self, rowid: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Records written after `rowid` and the new high-water mark (INSERT OR REPLACE assigns a new rowid)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT rowid, data FROM bills WHERE rowid > ? ORDER BY rowid", (rowid,)).fetchall()
+        return [json.loads(data) for _, data in rows], (rows[-1][0] if rows else rowid)
+
+    def get_many(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Records for the given ids, in the same order (unknown ids are skipped)"""
+        if not ids:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, data FROM bills WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        found = {bill_id: json.loads(data) for bill_id, data in rows}
+        return [found[bill_id] for bill_id in ids if bill_id in found]
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """Most recently updated records (candidates for fuzzy matching)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM bills ORDER BY update_date DESC LIMIT ?", (limit,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+class BillIndexer:
+    """Periodically pages Congress.gov bill listings into a BillIndex"""
+
+    PAGE_SIZE = 250  # Congress.gov maximum
+
+    def __init__(self, client: CongressClient, index: BillIndex,
+                 process_fn: Callable[[Dict[str, Any], int], Optional[Dict[str, Any]]],
+                 congresses: Iterable[int] = (119, 118, 117, 116), interval: float = 3600,
+                 max_pages_per_run: int = 40, details_per_run: int = 100,
+                 after_run: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            client: Congress.gov API client
+            index: Index to ingest into
+            process_fn: Converts a raw Congress.gov bill into the search record format
+            congresses: Congress sessions kept in the index
+            interval: Seconds between ingestion runs
+            max_pages_per_run: Listing pages requested per Congress per run (backfill continues next run)
+            details_per_run: Bill detail requests per run for sponsor and policy area
+            after_run: Called after each run, e.g. to refresh indexes derived from this one
+        """
+        self.client = client
+        self.index = index
+        self.process_fn = process_fn
+        self.congresses = list(congresses)
+        self.interval = interval
+        self.max_pages_per_run = max_pages_per_run
+        self.details_per_run = details_per_run
+        self.after_run = after_run
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Dict[str, Any] = {}
+
+    async def ingest_congress(self, congress: int) -> int:
+        """Ingest bills of one Congress updated since the last run; returns bills written"""
+        since = await asyncio.to_thread(self.index.get_ingest_state, congress)
+        from_datetime = None
+        if since:
+            # Overlap by a day; re-ingesting a few bills is cheap and covers clock/ordering skew
+            from_date = datetime.fromisoformat(since.replace("Z", "")[:19]) - timedelta(days=1)
+            from_datetime = from_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        written = 0
+        newest = since
+        pages = self.client.iter_bill_pages(congress, sort="updateDate+asc", from_datetime=from_datetime,
+                                            page_size=self.PAGE_SIZE, max_pages=self.max_pages_per_run)
+        async for bills in pages:
+            records = [r for r in (self.process_fn(bill, congress) for bill in bills) if r]
+            written += await asyncio.to_thread(self.index.upsert, records)
+            for record in records:
+                if record.get("updateDate") and (newest is None or record["updateDate"] > newest):
+                    newest = record["updateDate"]
+            # Save progress per page so an interrupted backfill resumes where it stopped
+            await asyncio.to_thread(self.index.set_ingest_state, congress, newest)
+        return written
+
+    async def fetch_details(self, concurrency: int = 4) -> int:
+        """Fill in sponsor and policy area for recently updated bills from the bill detail endpoint"""
+        pending = await asyncio.to_thread(self.index.missing_details, self.details_per_run)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    bill = await self.client.get_bill(record["congress"], record["type"], record["number"])
+                except Exception as e:
+                    logger.warning(f"Could not fetch details for {record['id']}: {e}")
+                    return None
+            return self.process_fn(bill, record["congress"])
+
+        updated = [r for r in await asyncio.gather(*(fetch(record) for record in pending)) if r]
+        return await asyncio.to_thread(self.index.upsert, updated, True)
+
+    async def run_once(self) -> Dict[str, Any]:
+        started = datetime.utcnow()
+        results: Dict[str, Any] = {}
+        for congress in self.congresses:
+            try:
+                results[str(congress)] = await self.ingest_congress(congress)
+            except Exception as e:
+                logger.warning(f"Bill index ingestion failed for Congress {congress}: {e}")
+                results[str(congress)] = f"failed: {e}"
+        try:
+            results["details"] = await self.fetch_details()
+        except Exception as e:
+            logger.warning(f"Bill detail ingestion failed: {e}")
+            results["details"] = f"failed: {e}"
+        self.last_run = {
+            "started": started.isoformat(),
+            "finished": datetime.utcnow().isoformat(),
+            "results": results,
+            "indexed": await asyncio.to_thread(self.index.count),
+        }
+        logger.info(f"Bill index ingestion finished: {self.last_run}")
+        if self.after_run is not None:
+            self.after_run()
+        return self.last_run
+
+    async def _loop(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if not self.client.api_key:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
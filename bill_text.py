@@ -0,0 +1,484 @@
+"""
+Bill text processing utilities shared by the Congress.gov and LegiScan paths.
+
+Contains a streaming parser for Congress.gov bill XML that emits structured sections
+in a single pass, the section index built from them, and the text normalizer used
+for both Congress.gov and LegiScan bill text.
+"""
+import functools
+import hashlib
+import html
+import logging
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Organizational units that start a new section in the parsed output
+STRUCTURAL_TAGS = {"section", "title", "subtitle", "chapter", "subchapter", "part", "subpart", "division"}
+
+# Elements whose full text content (including inline children) is collected
+INLINE_TAGS = {"text", "enum", "header", "official-title"}
+
+# Heading labels per structural unit
+HEADING_LABELS = {
+    "section": "SEC.",
+    "title": "TITLE",
+    "subtitle": "Subtitle",
+    "chapter": "CHAPTER",
+    "subchapter": "Subchapter",
+    "part": "PART",
+    "subpart": "Subpart",
+    "division": "DIVISION",
+}
+
+
+@dataclass
+class BillSection:
+    """A structural unit of a bill with its own (non-nested) text"""
+    kind: str
+    enum: str = ""
+    header: str = ""
+    text: str = ""
+    level: int = 0
+    key: str = ""
+    start: int = 0  # Offset of the rendered block in the parsed bill text
+    end: int = 0
+
+    @property
+    def heading(self) -> str:
+        if self.kind == "preamble":
+            return ""
+        parts = [HEADING_LABELS.get(self.kind, self.kind.upper())]
+        if self.enum:
+            parts.append(self.enum)
+        if self.header:
+            parts.append(self.header.upper() if self.kind == "section" else self.header)
+        return " ".join(parts)
+
+    def render(self) -> str:
+        heading = self.heading
+        if heading and self.text:
+            return f"{heading}\n{self.text}"
+        return heading or self.text
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(f"{self.heading}\n{self.text}".encode("utf-8")).hexdigest()
+
+    @property
+    def body_hash(self) -> str:
+        """Hash of the header and text without the enumerator, stable across renumbering"""
+        return hashlib.sha256(f"{self.kind}\n{self.header}\n{self.text}".encode("utf-8")).hexdigest()
+
+
+def _local_name(tag: str) -> str:
+    """Strip any XML namespace from a tag"""
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _collapse(text: str) -> str:
+    return " ".join(text.split())
+
+
+class BillXMLParser:
+    """
+    Incremental Congress.gov bill XML parser.
+
+    Feed the document in chunks (or all at once) and read finished sections as they
+    complete. Elements are detached from the tree once processed, so memory is bounded
+    by nesting depth rather than document size, and every element is visited once.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[ET.Element] = []
+        self._tags: List[str] = []  # Local names matching self._stack
+        self._names: Dict[str, str] = {}
+        self._structure: List[Tuple[str, List[str]]] = []  # (kind, [enum, header]) of open units
+        self._key_counts: Dict[str, int] = {}
+        self._inline_depth = 0
+        self._quoted_depth = 0
+        self._current: Optional[BillSection] = None
+        self._lines: List[str] = []
+        self._prefix: List[str] = []
+        self._offset = 0
+        self._ready: List[BillSection] = []
+
+    def feed(self, data) -> None:
+        self._parser.feed(data)
+        self._process_events()
+
+    def close(self) -> None:
+        self._parser.close()
+        self._process_events()
+        self._flush()
+
+    def read_sections(self) -> Iterator[BillSection]:
+        """Yield sections completed so far"""
+        ready, self._ready = self._ready, []
+        yield from ready
+
+    def _process_events(self) -> None:
+        names = self._names
+        for event, element in self._parser.read_events():
+            tag = names.get(element.tag)
+            if tag is None:
+                tag = names[element.tag] = _local_name(element.tag)
+            if event == "start":
+                self._on_start(tag, element)
+            else:
+                self._on_end(tag, element)
+
+    def _is_structural(self, tag: str) -> bool:
+        return tag in STRUCTURAL_TAGS and self._quoted_depth == 0
+
+    def _on_start(self, tag: str, element: ET.Element) -> None:
+        self._stack.append(element)
+        self._tags.append(tag)
+        if tag in INLINE_TAGS:
+            self._inline_depth += 1
+        elif tag == "quoted-block":
+            self._quoted_depth += 1
+        elif self._is_structural(tag):
+            self._flush()
+            self._structure.append((tag, ["", ""]))
+            self._current = BillSection(kind=tag, level=len(self._structure) - 1)
+
+    def _on_end(self, tag: str, element: ET.Element) -> None:
+        self._stack.pop()
+        self._tags.pop()
+        parent_tag = self._tags[-1] if self._tags else ""
+
+        if tag in INLINE_TAGS:
+            self._inline_depth -= 1
+            if self._inline_depth == 0:
+                self._on_inline(tag, _collapse("".join(element.itertext())), parent_tag)
+        elif tag == "quoted-block":
+            self._quoted_depth -= 1
+        elif self._is_structural(tag):
+            self._flush()
+            self._structure.pop()
+
+        # Keep inline children until their container has been read, detach everything else
+        if self._inline_depth == 0 and self._stack:
+            element.clear()
+            self._stack[-1].remove(element)
+
+    def _on_inline(self, tag: str, value: str, parent_tag: str) -> None:
+        if not value:
+            return
+
+        # enum/header directly under an open structural unit label that unit
+        if tag in ("enum", "header") and self._is_structural(parent_tag) and self._structure:
+            labels = self._structure[-1][1]
+            index = 0 if tag == "enum" else 1
+            if not labels[index]:
+                labels[index] = value
+                if self._current is not None and self._current.kind == parent_tag:
+                    setattr(self._current, tag, value)
+                return
+
+        if tag == "header" and parent_tag.startswith("appropriations-"):
+            # Appropriations headings (agency/account names) stand on their own line
+            if self._current is None:
+                self._current = BillSection(kind="preamble")
+            self._lines.append(value)
+            return
+
+        if tag in ("enum", "header"):
+            # Subsection/paragraph labels are prefixed to the next line of text
+            self._prefix.append(value if tag == "enum" else f"{value}.—")
+            return
+
+        if self._current is None:
+            self._current = BillSection(kind="preamble")
+        self._lines.append(" ".join(self._prefix + [value]))
+        self._prefix = []
+
+    def _flush(self) -> None:
+        """Finish the current section and queue it for reading"""
+        section = self._current
+        if section is None:
+            return
+        if self._prefix:
+            self._lines.append(" ".join(self._prefix))
+            self._prefix = []
+        section.text = "\n".join(self._lines)
+        self._lines = []
+        self._current = None
+
+        if not (section.heading or section.text):
+            return
+
+        path = "/".join(
+            f"{kind}-{(labels[0] or labels[1]).rstrip('.').strip().lower() or '?'}"
+            for kind, labels in self._structure
+        ) or section.kind
+        occurrence = self._key_counts.get(path, 0)
+        self._key_counts[path] = occurrence + 1
+        section.key = path if occurrence == 0 else f"{path}#{occurrence + 1}"
+
+        block = section.render()
+        section.start = self._offset + (2 if self._offset else 0)
+        section.end = section.start + len(block)
+        self._offset = section.end
+        self._ready.append(section)
+
+
+def iter_bill_sections(xml_content: str, chunk_size: int = 1 << 16) -> Iterator[BillSection]:
+    """Parse bill XML in a single streaming pass, yielding sections as they complete"""
+    parser = BillXMLParser()
+    for i in range(0, len(xml_content), chunk_size):
+        parser.feed(xml_content[i:i + chunk_size])
+        yield from parser.read_sections()
+    parser.close()
+    yield from parser.read_sections()
+
+
+class BillSectionIndex:
+    """Ordered index of a bill's sections, keyed by their structural path (e.g. 'title-i/section-101')"""
+
+    SECTION_LINE = re.compile(r"^[ \t]*SEC(?:TION)?\.?[ \t]+(\d+[A-Z]?)\.?[ \t]*(.*)$", re.MULTILINE | re.IGNORECASE)
+
+    def __init__(self, sections: Iterable[BillSection] = ()):
+        self.sections: List[BillSection] = []
+        self._by_key: Dict[str, BillSection] = {}
+        for section in sections:
+            self.add(section)
+
+    def add(self, section: BillSection) -> None:
+        self.sections.append(section)
+        self._by_key[section.key] = section
+
+    def get(self, key: str) -> Optional[BillSection]:
+        return self._by_key.get(key)
+
+    def keys(self) -> List[str]:
+        return [section.key for section in self.sections]
+
+    def __iter__(self) -> Iterator[BillSection]:
+        return iter(self.sections)
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    @classmethod
+    def from_text(cls, text: str) -> "BillSectionIndex":
+        """Build an index from plain bill text by splitting on 'SEC. N.' lines (non-XML formats)"""
+        index = cls()
+        matches = list(cls.SECTION_LINE.finditer(text))
+        boundaries = [0] + [m.start() for m in matches] + [len(text)]
+        seen: Dict[str, int] = {}
+        for i in range(len(boundaries) - 1):
+            start, end = boundaries[i], boundaries[i + 1]
+            block = text[start:end].strip()
+            if not block:
+                continue
+            if i == 0:
+                section = BillSection(kind="preamble", text=block, key="preamble")
+            else:
+                match = matches[i - 1]
+                number = match.group(1)
+                body = text[match.end():end].strip()
+                section = BillSection(kind="section", enum=f"{number}.", header=match.group(2).strip(),
+                                      text=body, key=f"section-{number.lower()}")
+            occurrence = seen.get(section.key, 0)
+            seen[section.key] = occurrence + 1
+            if occurrence:
+                section.key = f"{section.key}#{occurrence + 1}"
+            section.start, section.end = start, end
+            index.add(section)
+        return index
+
+
+@dataclass
+class SectionDiff:
+    """Section-level differences between two versions of a bill"""
+    added: List[BillSection] = field(default_factory=list)
+    removed: List[BillSection] = field(default_factory=list)
+    changed: List[Tuple[BillSection, BillSection]] = field(default_factory=list)  # (old, new)
+    unchanged: List[BillSection] = field(default_factory=list)  # New-version side, including moved sections
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    @property
+    def changed_fraction(self) -> float:
+        """Share of the new version's text that is added or changed"""
+        changed_chars = sum(len(new.text) for _, new in self.changed) + sum(len(s.text) for s in self.added)
+        total_chars = changed_chars + sum(len(s.text) for s in self.unchanged)
+        return changed_chars / total_chars if total_chars else 0.0
+
+
+def diff_section_indexes(old: BillSectionIndex, new: BillSectionIndex) -> SectionDiff:
+    """
+    Compare two section indexes.
+
+    Sections are matched by structural key; sections whose key disappeared but whose
+    header and text reappear elsewhere (renumbered or moved) count as unchanged.
+    """
+    diff = SectionDiff()
+    unmatched_old: Dict[str, List[BillSection]] = {}
+    for section in old:
+        if new.get(section.key) is None:
+            unmatched_old.setdefault(section.body_hash, []).append(section)
+
+    for section in new:
+        previous = old.get(section.key)
+        if previous is None:
+            if unmatched_old.get(section.body_hash):
+                unmatched_old[section.body_hash].pop(0)
+                diff.unchanged.append(section)
+            else:
+                diff.added.append(section)
+        elif previous.content_hash == section.content_hash:
+            diff.unchanged.append(section)
+        else:
+            diff.changed.append((previous, section))
+
+    remaining = {id(section) for sections in unmatched_old.values() for section in sections}
+    diff.removed = [section for section in old if id(section) in remaining]
+    return diff
+
+
+@dataclass
+class ParsedBill:
+    """Bill text rendered from XML together with its section index"""
+    text: str
+    index: BillSectionIndex = field(default_factory=BillSectionIndex)
+
+
+def parse_bill_xml(xml_content: str) -> ParsedBill:
+    """
+    Parse Congress.gov XML bill format into structured text plus a section index.
+
+    Congress bills use XML with tags like <section>, <title>, <chapter>, <part> and
+    <subtitle> for organizational units, each with an <enum> and <header>, and <text>
+    for content. Falls back to tag stripping if the document is not well-formed.
+    """
+    logger.info("Parsing XML bill content")
+    try:
+        index = BillSectionIndex(iter_bill_sections(xml_content))
+    except ET.ParseError as e:
+        logger.warning(f"XML parsing failed: {e}. Falling back to text extraction.")
+        text = re.sub(r'<[^>]+>', '', xml_content)
+        return ParsedBill(text=text, index=BillSectionIndex.from_text(text))
+
+    bill_text = "\n\n".join(section.render() for section in index)
+    logger.info(f"Extracted {len(bill_text)} characters in {len(index)} sections from XML")
+    return ParsedBill(text=bill_text, index=index)
+
+
+# Section headings that are moved onto their own line, one branch per kind. A heading must
+# start a word (so "subsection 5." and "counterpart parts" are left alone) and is matched in
+# the source text. The branches share one leading character class, so re can skip ahead to
+# candidates and checks the word start once; each then confirms its kind's first letter.
+# The alternation is compiled once, as part of the normalizer's single-pass scanner.
+HEADER_PATTERN = r"""(?x:
+    [SsTtCcPp](?<![^\W\d_].)  # First letter of a kind, starting a word
+    (?i:
+        (?<=s)EC(?:TION)?\.?\s+\d+[A-Z]?\.  # SECTION 5. / SEC. 101A.
+      | (?<=s)UBTITLE\s+[A-Z]+              # SUBTITLE B
+      | (?<=t)ITLE\s+[IVX]+                 # TITLE IV
+      | (?<=c)HAPTER\s+\d+                  # CHAPTER 3
+      | (?<=p)ART\s+[A-Z]+                  # PART A
+    )
+)"""
+
+_TAG = r'<[^>]+>'
+_REFERENCE = r'&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]{1,31});'
+_METADATA = r'\[Congressional Bills[^\n]*?\]|\[From the U\.S\. Government Publishing Office\]'
+
+# Whitespace runs that change when settled: space/tab runs other than a single space, and
+# three or more line breaks
+_SPACE_RUNS = re.compile(r'\t[ \t]*| [ \t]+')
+_BLANK_LINES = re.compile(r'\n\s*\n\s*\n+')
+
+_decode_reference = functools.lru_cache(maxsize=1024)(html.unescape)
+
+
+class BillTextNormalizer:
+    """
+    Compiled cleaner for raw bill text (HTML, formatted text or text rendered from XML).
+
+    A single tokenizing scan finds markup tags, character references, GPO metadata and
+    section headings; everything in between is copied as-is. Tags are removed, references
+    are decoded once with html.unescape semantics and headings are moved onto their own
+    line. Whitespace is settled afterwards: CRLF becomes LF, space/tab runs become one
+    space, three or more line breaks become a blank line and the result is stripped
+    (or, when flattening, all whitespace collapses to single spaces). Metadata is removed
+    last, so the whitespace on either side of it is settled separately, as before.
+
+    Output matches the previous substitution chain except that every reference is decoded
+    exactly once, and headings must start a word and are matched in the source text
+    (tests/test_bill_text.py lists the differences).
+    """
+
+    def __init__(self, detect_headers: bool = False, strip_metadata: bool = False,
+                 flatten_whitespace: bool = False):
+        """
+        Args:
+            detect_headers: Start section/title/chapter/part/subtitle headings on a new line
+            strip_metadata: Remove GPO document metadata ([Congressional Bills ...] etc.)
+            flatten_whitespace: Collapse all whitespace, including line breaks, to single spaces
+        """
+        self.detect_headers = detect_headers and not flatten_whitespace
+        self.flatten_whitespace = flatten_whitespace
+        # Tokens are told apart by their first character: '[' metadata, '<' tag, '&' reference,
+        # a letter a heading. Groups would keep re from skipping ahead to those characters.
+        tokens = ([_METADATA] if strip_metadata else []) + [_TAG, _REFERENCE] + (
+            [HEADER_PATTERN] if self.detect_headers else [])
+        self._scanner = re.compile('|'.join(tokens))
+
+    def _settle(self, text: str) -> str:
+        if self.flatten_whitespace:
+            return ' '.join(text.split())
+        return _BLANK_LINES.sub('\n\n', _SPACE_RUNS.sub(' ', text))
+
+    def normalize(self, text: str) -> str:
+        segments: List[str] = []  # Settled text between metadata
+        lines: List[str] = []  # Current segment up to the last heading, line endings normalized
+        pieces: List[str] = []  # Current segment since the last heading
+        position = 0
+
+        for match in self._scanner.finditer(text):
+            pieces.append(text[position:match.start()])
+            position = match.end()
+            token = match.group()
+            if token[0] == '<':
+                continue
+            if token[0] == '&':
+                pieces.append(_decode_reference(token))
+            elif token[0] == '[':
+                segments.append(self._settle(''.join(lines) + ''.join(pieces).replace('\r\n', '\n')))
+                lines.clear()
+                pieces.clear()
+            else:
+                before = ''.join(pieces).replace('\r\n', '\n')
+                pieces.clear()
+                if before:
+                    lines.append(before)
+                if not (lines and lines[-1].endswith('\n')):
+                    lines.append('\n')
+                lines.append(token.replace('\r\n', '\n'))
+
+        pieces.append(text[position:])
+        segments.append(self._settle(''.join(lines) + ''.join(pieces).replace('\r\n', '\n')))
+        segments[0] = segments[0].lstrip()
+        segments[-1] = segments[-1].rstrip()
+        return ''.join(segments)
+
+
+NORMALIZERS = {
+    "congress": BillTextNormalizer(detect_headers=True, strip_metadata=True),
+    "legiscan": BillTextNormalizer(flatten_whitespace=True),
+}
+
+
+def normalize_bill_text(text: str, profile: str = "congress") -> str:
+    """Clean raw bill text for analysis using the Congress.gov or LegiScan profile"""
+    return NORMALIZERS[profile].normalize(text)
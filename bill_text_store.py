@@ -0,0 +1,264 @@
+"""
+Local store for Congress.gov bill text.
+
+Published bill text versions never change, so each document is downloaded once and kept
+on disk (gzip) with its normalized text. Only the per-bill text version list is
+revalidated, with conditional requests (ETag / If-Modified-Since) and at most once per
+revalidation interval.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from bill_text import BillSectionIndex, normalize_bill_text, parse_bill_xml
+from congress_client import CongressAPIError, CongressClient, CongressNotFound
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredBillText:
+    """Normalized text of one bill text version"""
+    congress: int
+    bill_type: str
+    bill_number: str
+    version_date: str
+    version_type: str
+    format: str
+    text: str
+    path: Path  # Directory holding this bill's documents
+
+    @property
+    def document_key(self) -> str:
+        return BillTextStore.document_key(self.version_date, self.version_type, self.format)
+
+
+class BillTextStore:
+    """Versioned on-disk cache of bill text, keyed by (congress, type, number, version, format)"""
+
+    # Preferred formats in order: XML is the most structured, then GPO formatted text
+    FORMAT_PREFERENCE = ("xml", "formatted text")
+
+    def __init__(self, cache_dir: Path, revalidate_interval: float = 600):
+        """
+        Args:
+            cache_dir: Directory for stored documents and version lists
+            revalidate_interval: Seconds a version list is trusted before it is revalidated
+        """
+        self.cache_dir = Path(cache_dir)
+        self.revalidate_interval = revalidate_interval
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}  # path -> (lock, holders and waiters)
+        self._indexes = TTLCache(maxsize=50, ttl=3600)
+        self.stats = {"version_checks": 0, "not_modified": 0, "downloads": 0, "hits": 0}
+
+    @staticmethod
+    def _slug(value: str) -> str:
+        return re.sub(r"[^a-z0-9]+", "-", (value or "").lower()).strip("-") or "unknown"
+
+    @classmethod
+    def document_key(cls, version_date: str, version_type: str, doc_format: str) -> str:
+        return f"{cls._slug(version_date or version_type)}--{cls._slug(doc_format)}"
+
+    def _bill_dir(self, congress: int, bill_type: str, bill_number: str) -> Path:
+        return self.cache_dir / str(congress) / bill_type.lower() / str(bill_number)
+
+    @asynccontextmanager
+    async def _locked(self, key: str) -> AsyncIterator[None]:
+        """Hold the per-key lock; it is dropped once nothing holds or awaits it"""
+        lock, users = self._locks.get(key, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            _, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Version list
+    # ------------------------------------------------------------------
+
+    async def get_versions(self, client: CongressClient, congress: int, bill_type: str,
+                           bill_number: str) -> List[Dict[str, Any]]:
+        """Return the bill's text versions (newest first), revalidating the stored list when due"""
+        bill_dir = self._bill_dir(congress, bill_type, bill_number)
+        versions_path = bill_dir / "versions.json"
+
+        async with self._locked(str(versions_path)):
+            cached = None
+            if versions_path.exists():
+                try:
+                    cached = json.loads(versions_path.read_text(encoding="utf-8"))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable version list {versions_path}: {e}")
+
+            if cached and time.time() - cached.get("checked_at", 0) < self.revalidate_interval:
+                return cached["versions"]
+
+            self.stats["version_checks"] += 1
+            try:
+                response = await client.get_text_versions(
+                    congress, bill_type, bill_number,
+                    etag=cached.get("etag") if cached else None,
+                    last_modified=cached.get("last_modified") if cached else None,
+                )
+            except CongressNotFound:
+                logger.error(f"Bill text not found: {bill_type} {bill_number}")
+                raise ValueError("No text versions available for this bill")
+            except CongressAPIError as e:
+                if cached:
+                    logger.warning(f"Version list revalidation failed for {bill_type} {bill_number}, using stored list: {e}")
+                    return cached["versions"]
+                raise
+
+            if response.status == 304 and cached:
+                self.stats["not_modified"] += 1
+                cached["checked_at"] = time.time()
+                self._write_atomic(versions_path, json.dumps(cached).encode("utf-8"))
+                return cached["versions"]
+
+            record = {
+                "versions": (response.data or {}).get("textVersions", []),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "checked_at": time.time(),
+            }
+
+            self._write_atomic(versions_path, json.dumps(record).encode("utf-8"))
+            return record["versions"]
+
+    # ------------------------------------------------------------------
+    # Documents
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _ordered_formats(cls, formats: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """XML first, then formatted text, then anything else"""
+        def rank(format_info):
+            format_type = (format_info.get("type") or "").lower()
+            for position, preferred in enumerate(cls.FORMAT_PREFERENCE):
+                if preferred in format_type:
+                    return position
+            return len(cls.FORMAT_PREFERENCE)
+        return sorted((f for f in formats if f.get("url")), key=rank)
+
+    @staticmethod
+    def _process(raw: str, doc_format: str) -> str:
+        if "xml" in doc_format.lower():
+            raw = parse_bill_xml(raw).text
+        return normalize_bill_text(raw)
+
+    async def get_text(self, client: CongressClient, congress: int, bill_type: str,
+                       bill_number: str) -> StoredBillText:
+        """Return the normalized text of the latest version, downloading it only if not stored yet"""
+        versions = await self.get_versions(client, congress, bill_type, bill_number)
+        if not versions:
+            raise ValueError("No text versions available for this bill")
+
+        # Get the most recent text version (usually the first one)
+        latest_version = versions[0]
+        version_date = latest_version.get("date") or ""
+        version_type = latest_version.get("type") or ""
+        bill_dir = self._bill_dir(congress, bill_type, bill_number)
+
+        for format_info in self._ordered_formats(latest_version.get("formats", [])):
+            doc_format = format_info.get("type") or "unknown"
+            key = self.document_key(version_date, version_type, doc_format)
+            text_path = bill_dir / f"{key}.txt.gz"
+
+            async with self._locked(str(text_path)):
+                if text_path.exists():
+                    self.stats["hits"] += 1
+                    text = await asyncio.to_thread(lambda: gzip.decompress(text_path.read_bytes()).decode("utf-8"))
+                    return StoredBillText(congress, bill_type, bill_number, version_date, version_type,
+                                          doc_format, text, bill_dir)
+
+                logger.info(f"Fetching {doc_format} format from: {format_info['url']}")
+                try:
+                    raw = await client.fetch_document(format_info["url"])
+                except CongressAPIError as e:
+                    logger.warning(f"Could not fetch {doc_format} text for {bill_type} {bill_number}: {e}")
+                    continue
+                self.stats["downloads"] += 1
+                logger.info(f"Successfully fetched {doc_format} format ({len(raw)} chars)")
+
+                def save() -> str:
+                    text = self._process(raw, doc_format)
+                    self._write_atomic(bill_dir / f"{key}.raw.gz", gzip.compress(raw.encode("utf-8")))
+                    self._write_atomic(text_path, gzip.compress(text.encode("utf-8")))
+                    return text
+
+                text = await asyncio.to_thread(save)
+                return StoredBillText(congress, bill_type, bill_number, version_date, version_type,
+                                      doc_format, text, bill_dir)
+
+        raise ValueError("Could not retrieve bill text content")
+
+    async def get_previous_stored(self, client: CongressClient, current: StoredBillText) -> Optional[StoredBillText]:
+        """Most recent version older than `current` that is already stored locally (never downloads)"""
+        versions = await self.get_versions(client, current.congress, current.bill_type, current.bill_number)
+        current_key = self.document_key(current.version_date, current.version_type, "")
+        older = False
+        for version in versions:
+            version_date = version.get("date") or ""
+            version_type = version.get("type") or ""
+            if not older:
+                older = self.document_key(version_date, version_type, "") == current_key
+                continue
+
+            for format_info in self._ordered_formats(version.get("formats", [])):
+                doc_format = format_info.get("type") or "unknown"
+                text_path = current.path / f"{self.document_key(version_date, version_type, doc_format)}.txt.gz"
+                if text_path.exists():
+                    text = await asyncio.to_thread(lambda: gzip.decompress(text_path.read_bytes()).decode("utf-8"))
+                    return StoredBillText(current.congress, current.bill_type, current.bill_number,
+                                          version_date, version_type, doc_format, text, current.path)
+        return None
+
+    def load_artifact(self, stored: StoredBillText, name: str) -> Optional[str]:
+        """Read a derived artifact (e.g. an analysis) saved alongside a stored version"""
+        path = stored.path / f"{stored.document_key}.{name}.gz"
+        try:
+            return gzip.decompress(path.read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def save_artifact(self, stored: StoredBillText, name: str, content: str) -> None:
+        self._write_atomic(stored.path / f"{stored.document_key}.{name}.gz", gzip.compress(content.encode("utf-8")))
+
+    def load_raw(self, stored: StoredBillText) -> str:
+        """Original document (XML/HTML) for a stored version"""
+        return gzip.decompress((stored.path / f"{stored.document_key}.raw.gz").read_bytes()).decode("utf-8")
+
+    async def get_section_index(self, stored: StoredBillText) -> BillSectionIndex:
+        """Section index of a stored version, built from the XML when available"""
+        cache_key = (str(stored.path), stored.document_key)
+        if cache_key not in self._indexes:
+            def build() -> BillSectionIndex:
+                if "xml" in stored.format.lower():
+                    return parse_bill_xml(self.load_raw(stored)).index
+                return BillSectionIndex.from_text(stored.text)
+            self._indexes[cache_key] = await asyncio.to_thread(build)
+        return self._indexes[cache_key]
+
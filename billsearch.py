@@ -1,13 +1,22 @@
 import os
-import aiohttp
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from dotenv import load_dotenv
 from cachetools import TTLCache
 import json
+import math
 import re
-from rapidfuzz.fuzz import partial_ratio 
+import time
+from collections import Counter
+from datetime import datetime, timezone
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from bill_index import BillIndex
+from congress_client import CongressClient
+from prefix_index import PrefixIndex, normalize_key
+from semantic_index import SemanticIndex
 
 # Load environment variables
 load_dotenv()
@@ -20,14 +29,28 @@ if not CONGRESS_API_KEY:
     logger.warning("CONGRESS_API_KEY not found. Search will use mock data.")
 
 class BillSearcher:
-    def __init__(self, session: aiohttp.ClientSession):
-        self.session = session
+    def __init__(self, client: CongressClient, index: Optional[BillIndex] = None,
+                 semantic_index: Optional[SemanticIndex] = None):
+        self.client = client
+        self.index = index  # Local full-text index; live Congress.gov search is the fallback
+        self._index_ready = False
+        self.semantic_index = semantic_index  # Sentence embeddings of indexed bills for semantic mode
+        self.semantic_min_score = 0.25  # Cosine similarity below which semantic matches are dropped
+        self._semantic_rowid = 0
+        self._semantic_task: Optional[asyncio.Task] = None
         self.current_congress = 119  # Current Congress (2025-2027)
         
         # Smart caching - different TTLs for different types of data
         self.search_cache = TTLCache(maxsize=100, ttl=1800)  # 30 minutes for search results
         self.popular_bills_cache = TTLCache(maxsize=50, ttl=3600)  # 1 hour for popular bills
         self.suggestions_cache = TTLCache(maxsize=200, ttl=3600)  # 1 hour for suggestions
+        self.page_cache = TTLCache(maxsize=20, ttl=60)  # 1 minute for raw Congress pages shared by one search
+
+        # Deadline shared by all Congress requests issued for one search
+        self.search_deadline = 10.0
+        # Indexed bills fuzzy-matched when no indexed term matches the query
+        self.fuzzy_candidates = 5000
+        self._fuzzy_corpus: Tuple[int, List[Dict[str, Any]], List[Tuple[str, ...]]] = (-1, [], [])
         
         # Popular search terms that users commonly look for
         self.popular_terms = [
@@ -43,12 +66,35 @@ class BillSearcher:
         "immigration": ["migrant", "border", "asylum", "visa"],
         # we can add more as we expand categories
         }
-        
-    def _fuzzy_match(self, text: str, query: str, threshold: int = 75) -> bool:
-        return partial_ratio(text.lower(), query.lower()) >= threshold
-    
-    async def search_bills(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Fast bill search using Congress.gov search API directly"""
+
+        # Typeahead index over popular terms, searched queries and (once synced) indexed bills
+        self.prefix_index = PrefixIndex()
+        for term in self.popular_terms:
+            self.prefix_index.set_source(f"term:{term}", [(term.title(), self.POPULAR_TERM_WEIGHT)])
+        self.prefix_index.rebuild()
+        self.prefix_rebuild_interval = 300  # Minimum seconds between background rebuilds
+        self._prefix_rowid = 0
+        self._prefix_generation: Optional[int] = None
+        self._prefix_built_at = 0.0
+        self._prefix_task: Optional[asyncio.Task] = None
+        self._sponsor_bills: Dict[str, set] = {}
+        self._query_counts: Counter = Counter()
+        
+    fuzzy_threshold = 75
+
+    # Typeahead weights: popular terms first, then searched queries, then bills by recency, then sponsors
+    POPULAR_TERM_WEIGHT = 40.0
+    QUERY_WEIGHT = 25.0
+    BILL_WEIGHT = 10.0
+    SPONSOR_WEIGHT = 5.0
+
+    async def search_bills(self, query: str, limit: int = 20, mode: str = "keyword") -> List[Dict[str, Any]]:
+        """
+        Fast bill search using Congress.gov search API directly
+
+        mode="semantic" ranks indexed bills by embedding similarity to the query, falling
+        back to keyword search when the semantic index is unavailable or finds nothing.
+        """
         
         if not CONGRESS_API_KEY:
             return await self._get_mock_results(query, limit)
@@ -59,12 +105,33 @@ class BillSearcher:
             return []
         
         # Check cache first
-        cache_key = f"search_{query.lower()}_{limit}"
+        cache_key = f"search_{mode}_{query.lower()}_{limit}"
         if cache_key in self.search_cache:
             logger.info(f"Returning cached results for query: '{query}'")
             return self.search_cache[cache_key]
         
+        if mode == "semantic" and self.semantic_index is not None and await self._use_index():
+            self.refresh_semantic_index()
+            try:
+                results = await asyncio.to_thread(self._semantic_search, query, limit)
+            except Exception as e:
+                logger.warning(f"Semantic search failed, using keyword search: {e}")
+                results = []
+            if results:
+                self.search_cache[cache_key] = results
+                logger.info(f"Found {len(results)} semantically related bills for query: '{query}'")
+                return results
+
         try:
+            # Serve from the local index when it has been populated
+            if await self._use_index():
+                results = await asyncio.to_thread(self._index_search, query, limit)
+                if results:
+                    self.search_cache[cache_key] = results
+                    self._record_query(query)
+                    logger.info(f"Found {len(results)} indexed bills for query: '{query}'")
+                    return results
+
             # Use Congress.gov search API for fast, direct search
             results = await self._direct_search(query, limit)
             
@@ -96,57 +163,148 @@ class BillSearcher:
             # Return empty results instead of failing
             return []
     
+    async def _use_index(self) -> bool:
+        if self.index is None:
+            return False
+        if not self._index_ready:
+            self._index_ready = await asyncio.to_thread(self.index.count) > 0
+        return self._index_ready
+
+    def _index_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """BM25 search of the local index, re-ranked with the simple relevance score"""
+        results = {bill["id"]: bill for bill in self.index.lookup_number(query)}
+
+        # Whole query as a phrase, plus its keywords and their synonyms
+        match_query = self.index.build_match_query([query] + self._extract_keywords(query))
+        hits = self.index.search(match_query, max(limit * 5, 50))
+        if hits:
+            best = hits[0][1] or -1.0
+            scored = []
+            relevance = self._relevance_scores([bill for bill, _ in hits], query)
+            for (bill, bm25), bonus in zip(hits, relevance.tolist()):
+                # bm25() is negative, lower is better; scale to 0-100 relative to the best hit
+                text_score = 100 * (bm25 / best) if best < 0 else 0
+                scored.append((text_score + bonus, bill))
+            scored.sort(key=lambda pair: pair[0], reverse=True)
+            for _, bill in scored:
+                results.setdefault(bill["id"], bill)
+        else:
+            # No term matched (e.g. a misspelling): fuzzy match recently updated bills
+            bills, fields = self._get_fuzzy_corpus()
+            for bill, relevant in zip(bills, self._relevance_mask(bills, query, fields)):
+                if relevant:
+                    results.setdefault(bill["id"], bill)
+                    if len(results) >= limit:
+                        break
+
+        return list(results.values())[:limit]
+
+    def _semantic_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        hits = [(bill_id, score) for bill_id, score in self.semantic_index.search("bills", query, limit)
+                if score >= self.semantic_min_score]
+        return self.index.get_many([bill_id for bill_id, _ in hits])
+
+    @staticmethod
+    def _semantic_text(bill: Dict[str, Any]) -> str:
+        policy_area = bill.get("policyArea", "")
+        return f"{bill.get('title', '')}. {policy_area}" if policy_area else bill.get("title", "")
+
+    def _sync_semantic_index(self) -> None:
+        """Encode bills written to the bill index since the last sync"""
+        records, rowid = self.index.changed_since(self._semantic_rowid)
+        self.semantic_index.update("bills", [(bill["id"], self._semantic_text(bill)) for bill in records])
+        self._semantic_rowid = rowid
+
+    def refresh_semantic_index(self) -> None:
+        """Start a background embedding sync of the bill index unless one is running"""
+        if self.semantic_index is None or self.index is None:
+            return
+        if self._semantic_task is not None and not self._semantic_task.done():
+            return
+
+        def done(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Semantic index sync failed: {task.exception()}")
+
+        self._semantic_task = asyncio.create_task(asyncio.to_thread(self._sync_semantic_index))
+        self._semantic_task.add_done_callback(done)
+
+    def _page_size(self, limit: int) -> int:
+        """Bills requested per Congress; more than `limit` to account for filtering"""
+        return min(50, limit * 2)
+
+    async def _fetch_bill_page(self, congress: int, page_size: int) -> List[Dict[str, Any]]:
+        """Most recently updated bills of one Congress, shared briefly between searches"""
+        cache_key = (congress, page_size)
+        if cache_key in self.page_cache:
+            return self.page_cache[cache_key]
+
+        # A single attempt: the search deadline leaves no room for retries
+        bills_data = await self.client.list_bills(congress, limit=page_size, sort="updateDate+desc",
+                                                  timeout=self.search_deadline, retries=0)
+
+        self.page_cache[cache_key] = bills_data
+        return bills_data
+
     async def _direct_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
         """Direct search using Congress.gov search API"""
         
-        results = []
-        
-        # Search current and recent Congress sessions (most relevant first)
+        # Search current and recent Congress sessions concurrently (most relevant first)
         congress_sessions = [119, 118, 117, 116]  # Current and recent sessions
-        
-        for congress in congress_sessions:
-            if len(results) >= limit:
-                break
-                
-            # Use the search endpoint for faster results
-            url = f"https://api.congress.gov/v3/bill/{congress}"
-            params = {
-                "api_key": CONGRESS_API_KEY,
-                "format": "json",
-                "limit": min(50, limit * 2),  # Request more to account for filtering
-                "sort": "updateDate+desc"
-            }
-            
+        page_size = self._page_size(limit)
+        matches: Dict[int, List[Dict[str, Any]]] = {}
+
+        def by_priority() -> List[Dict[str, Any]]:
+            """Matches in Congress order, up to the first session that has not arrived yet"""
+            merged = []
+            for congress in congress_sessions:
+                if congress not in matches:
+                    break
+                merged.extend(matches[congress])
+            return merged
+
+        async def fetch(congress: int):
             try:
-                async with self.session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status != 200:
-                        logger.warning(f"Congress {congress} API returned {response.status}")
-                        continue
-                    
-                    data = await response.json()
-                    bills_data = data.get("bills", [])
-                    
-                    # Fast filtering for relevant bills
-                    for bill in bills_data:
-                        if len(results) >= limit:
-                            break
-                        
-                        if self._is_relevant_match(bill, query):
-                            processed_bill = self._process_bill_fast(bill, congress)
-                            if processed_bill:
-                                results.append(processed_bill)
-                
+                return congress, await self._fetch_bill_page(congress, page_size)
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout searching Congress {congress}")
-                continue
             except Exception as e:
                 logger.warning(f"Error searching Congress {congress}: {e}")
-                continue
-        
-        # Sort by relevance
-        results.sort(key=lambda x: self._calculate_simple_relevance(x, query), reverse=True)
+            return congress, []
+
+        tasks = [asyncio.create_task(fetch(congress)) for congress in congress_sessions]
+        try:
+            for next_page in asyncio.as_completed(tasks, timeout=self.search_deadline):
+                congress, bills_data = await next_page
+
+                # Fast filtering for relevant bills
+                matches[congress] = []
+                for bill, relevant in zip(bills_data, self._relevance_mask(bills_data, query)):
+                    if len(matches[congress]) >= limit:
+                        break
+
+                    if relevant:
+                        processed_bill = self._process_bill_fast(bill, congress)
+                        if processed_bill:
+                            matches[congress].append(processed_bill)
+
+                # Enough results from the newest sessions: don't wait for the older ones
+                if len(by_priority()) >= limit:
+                    break
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Search deadline of {self.search_deadline}s reached, returning the sessions that arrived")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Newer sessions fill the results first, as when they were searched one after another
+        results = [bill for congress in congress_sessions for bill in matches.get(congress, [])][:limit]
+
+        # Sort by relevance (stable, so equally relevant bills keep Congress order)
+        order = np.argsort(-self._relevance_scores(results, query), kind="stable")
         
-        return results[:limit]
+        return [results[i] for i in order]
     
     async def _enhanced_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
         """Enhanced search for when direct search yields few results"""
@@ -154,17 +312,24 @@ class BillSearcher:
         results = []
         
         # Try searching with individual keywords
-        keywords = self._extract_keywords(query)
+        keywords = [keyword for keyword in self._extract_keywords(query) if len(keyword) >= 3]  # Skip very short keywords
+        if not keywords:
+            return results
+
+        # All keyword searches filter the same current-Congress page, which the direct search
+        # has usually just fetched, so it is requested at most once
+        try:
+            bills_data = await self._fetch_bill_page(self.current_congress, self._page_size(limit))
+        except Exception as e:
+            logger.warning(f"Error in keyword search for '{query}': {e}")
+            return results
         
-        for keyword in keywords[:2]:  # Limit to top 2 keywords to avoid too many requests
+        for keyword in keywords[:2]:  # Limit to top 2 keywords
             if len(results) >= limit:
                 break
-                
-            if len(keyword) < 3:  # Skip very short keywords
-                continue
             
             # Search with single keyword
-            single_results = await self._search_by_keyword(keyword, limit - len(results))
+            single_results = self._search_by_keyword(bills_data, keyword, limit - len(results))
             
             # Add unique results
             existing_ids = {r.get("id") for r in results}
@@ -174,82 +339,90 @@ class BillSearcher:
         
         return results
     
-    async def _search_by_keyword(self, keyword: str, limit: int) -> List[Dict[str, Any]]:
-        """Search for bills by single keyword"""
+    def _search_by_keyword(self, bills_data: List[Dict[str, Any]], keyword: str, limit: int) -> List[Dict[str, Any]]:
+        """Filter a page of current-Congress bills by single keyword"""
         
         results = []
         
-        # Search only current Congress for keyword search
-        url = f"https://api.congress.gov/v3/bill/{self.current_congress}"
-        params = {
-            "api_key": CONGRESS_API_KEY,
-            "format": "json",
-            "limit": min(30, limit * 3),
-            "sort": "updateDate+desc"
-        }
-        
-        try:
-            async with self.session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=8)) as response:
-                if response.status != 200:
-                    return results
-                
-                data = await response.json()
-                bills_data = data.get("bills", [])
-                
-                for bill in bills_data:
-                    if len(results) >= limit:
-                        break
-                    
-                    if self._matches_keyword(bill, keyword):
-                        processed_bill = self._process_bill_fast(bill, self.current_congress)
-                        if processed_bill:
-                            results.append(processed_bill)
+        for bill, matches in zip(bills_data, self._keyword_mask(bills_data, keyword)):
+            if len(results) >= limit:
+                break
             
-        except Exception as e:
-            logger.warning(f"Error in keyword search for '{keyword}': {e}")
+            if matches:
+                processed_bill = self._process_bill_fast(bill, self.current_congress)
+                if processed_bill:
+                    results.append(processed_bill)
         
         return results
     
-    def _is_relevant_match(self, bill: Dict[str, Any], query: str) -> bool:
-        query_lower = query.lower()
-        title = bill.get("title", "").lower()
-
-        if self._fuzzy_match(title, query_lower):
-            return True
-
-        bill_type = bill.get("type", "").lower()
-        bill_number = str(bill.get("number", ""))
-        if bill_type and bill_number:
-            bill_code = f"{bill_type} {bill_number}"
-            if query_lower in bill_code or bill_code in query_lower:
-                return True
-            if re.search(rf"\b{re.escape(bill_type)}\s*{re.escape(bill_number)}\b", query_lower):
-                return True
-
+    @staticmethod
+    def _search_fields(bill: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+        """Lowercased (title, sponsor last name, policy area, bill type, bill number) of a raw or processed bill"""
         sponsors = bill.get("sponsors", [])
-        if sponsors and isinstance(sponsors[0], dict):
-            last_name = sponsors[0].get("lastName", "").lower()
-            if self._fuzzy_match(last_name, query_lower):
-                return True
+        last_name = sponsors[0].get("lastName", "") if sponsors and isinstance(sponsors[0], dict) else ""
+        policy_area = bill.get("policyArea", {})
+        if isinstance(policy_area, dict):
+            policy_area = policy_area.get("name", "")
+        return (
+            bill.get("title", "").lower(),
+            last_name.lower(),
+            (policy_area or "").lower(),
+            bill.get("type", "").lower(),
+            str(bill.get("number", "")),
+        )
+
+    @staticmethod
+    def _fuzzy_scores(query: str, choices: Sequence[str]) -> np.ndarray:
+        """partial_ratio of the query against every choice in one call (multi-threaded for large batches)"""
+        if not choices:
+            return np.zeros(0, dtype=np.float32)
+        workers = -1 if len(choices) >= 1000 else 1
+        return process.cdist([query], choices, scorer=fuzz.partial_ratio, processor=None,
+                             dtype=np.float32, workers=workers)[0]
 
-        for keyword in self._expand_keywords([query_lower]):
-            if keyword in title:
-                return True
+    def _relevance_mask(self, bills: List[Dict[str, Any]], query: str,
+                        fields: Optional[List[Tuple[str, ...]]] = None) -> List[bool]:
+        """Whether each bill matches the query by title, sponsor (fuzzy), bill code or keyword"""
+        query_lower = query.lower()
+        fields = fields if fields is not None else [self._search_fields(bill) for bill in bills]
+        title_hits = self._fuzzy_scores(query_lower, [f[0] for f in fields]) >= self.fuzzy_threshold
+        sponsor_hits = self._fuzzy_scores(query_lower, [f[1] for f in fields]) >= self.fuzzy_threshold
+        expanded = self._expand_keywords([query_lower])
 
-        return False
+        mask = []
+        for i, (title, _, _, bill_type, bill_number) in enumerate(fields):
+            if title_hits[i] or sponsor_hits[i]:
+                mask.append(True)
+                continue
+            relevant = False
+            if bill_type and bill_number:
+                bill_code = f"{bill_type} {bill_number}"
+                relevant = (
+                    query_lower in bill_code or bill_code in query_lower
+                    or (bill_number in query_lower
+                        and re.search(rf"\b{re.escape(bill_type)}\s*{re.escape(bill_number)}\b", query_lower) is not None)
+                )
+            mask.append(relevant or any(keyword in title for keyword in expanded))
+        return mask
 
-    def _matches_keyword(self, bill: Dict[str, Any], keyword: str) -> bool:
+    def _keyword_mask(self, bills: List[Dict[str, Any]], keyword: str) -> List[bool]:
+        """Whether each bill's title or policy area fuzzy-matches the keyword"""
         keyword_lower = keyword.lower()
-        title = bill.get("title", "").lower()
-        if self._fuzzy_match(title, keyword_lower):
-            return True
+        fields = [self._search_fields(bill) for bill in bills]
+        title_hits = self._fuzzy_scores(keyword_lower, [f[0] for f in fields]) >= self.fuzzy_threshold
+        policy_hits = self._fuzzy_scores(keyword_lower, [f[2] for f in fields]) >= self.fuzzy_threshold
+        return (title_hits | policy_hits).tolist()
 
-        policy_area = bill.get("policyArea", {}).get("name", "").lower()
-        if self._fuzzy_match(policy_area, keyword_lower):
-            return True
+    def _get_fuzzy_corpus(self) -> Tuple[List[Dict[str, Any]], List[Tuple[str, ...]]]:
+        """Recently updated indexed bills with precomputed match fields, rebuilt when the index changes"""
+        generation, bills, fields = self._fuzzy_corpus
+        if generation != self.index.generation or not bills:
+            generation = self.index.generation
+            bills = self.index.recent(self.fuzzy_candidates)
+            fields = [self._search_fields(bill) for bill in bills]
+            self._fuzzy_corpus = (generation, bills, fields)
+        return bills, fields
 
-        return False
-        
     def _process_bill_fast(self, bill: Dict[str, Any], congress_num: int = None) -> Optional[Dict[str, Any]]:
         """Fast bill processing - minimal data transformation"""
         try:
@@ -308,40 +481,33 @@ class BillSearcher:
             logger.warning(f"Error processing bill: {e}")
             return None
     
-    def _calculate_simple_relevance(self, bill: Dict[str, Any], query: str) -> int:
-        """Simplified relevance scoring for fast sorting"""
+    def _relevance_scores(self, bills: List[Dict[str, Any]], query: str) -> np.ndarray:
+        """Simplified relevance scores of processed bills for fast sorting, one array op per rule"""
+        if not bills:
+            return np.zeros(0, dtype=np.int64)
         query_lower = query.lower()
-        score = 0
-        
-        title = bill.get("title", "").lower()
-        bill_code = f"{bill.get('type', '')} {bill.get('number', '')}".lower()
-        
+        titles = np.array([bill.get("title", "").lower() for bill in bills], dtype=str)
+        codes = np.array([f"{bill.get('type', '')} {bill.get('number', '')}".lower() for bill in bills], dtype=str)
+        sponsors = np.array([bill.get("sponsor", "").lower() for bill in bills], dtype=str)
+        update_dates = np.array([bill.get("updateDate", "") for bill in bills], dtype=str)
+        current = np.array([bill.get("congress") == self.current_congress for bill in bills])
+
         # Title matches (highest priority)
-        if title.startswith(query_lower):
-            score += 100
-        elif query_lower in title:
-            score += 50
-        
+        score = np.where(np.char.startswith(titles, query_lower), 100,
+                         np.where(np.char.find(titles, query_lower) >= 0, 50, 0))
+
         # Bill code exact match
-        if query_lower == bill_code:
-            score += 90
-        elif query_lower in bill_code:
-            score += 40
-        
+        score += np.where(codes == query_lower, 90, np.where(np.char.find(codes, query_lower) >= 0, 40, 0))
+
         # Sponsor match
-        sponsor = bill.get("sponsor", "").lower()
-        if query_lower in sponsor:
-            score += 30
-        
+        score += 30 * (np.char.find(sponsors, query_lower) >= 0)
+
         # Boost for current Congress
-        if bill.get("congress") == self.current_congress:
-            score += 10
-        
+        score += 10 * current
+
         # Boost for recent updates
-        update_date = bill.get("updateDate", "")
-        if update_date and "2024" in update_date or "2025" in update_date:
-            score += 5
-        
+        score += 5 * ((np.char.find(update_dates, "2024") >= 0) | (np.char.find(update_dates, "2025") >= 0))
+
         return score
     def _extract_keywords(self, query: str) -> List[str]:
         """Extract meaningful keywords from search query"""
@@ -360,11 +526,83 @@ class BillSearcher:
             expanded.update(self.synonym_map.get(word, []))
         return expanded
 
+    def _record_query(self, query: str) -> None:
+        """Count a query that found bills so it is suggested to later users (applied at the next rebuild)"""
+        key = normalize_key(query)
+        if len(key) < 3:
+            return
+        self._query_counts[key] += 1
+        weight = self.QUERY_WEIGHT + 5 * math.log2(self._query_counts[key])
+        self.prefix_index.set_source(f"query:{key}", [(query.strip(), weight)])
+
+    def _bill_weight(self, bill: Dict[str, Any]) -> float:
+        """Bills updated recently rank higher; the boost halves roughly every three months"""
+        try:
+            updated = datetime.fromisoformat(bill.get("updateDate", "")[:10]).replace(tzinfo=timezone.utc)
+            age_days = max(0.0, (datetime.now(timezone.utc) - updated).total_seconds() / 86400)
+        except ValueError:
+            return self.BILL_WEIGHT
+        return self.BILL_WEIGHT + 10 / (1 + age_days / 90)
+
+    def _sync_prefix_index(self) -> None:
+        """Apply bills written to the bill index since the last sync, then re-sort the prefix index"""
+        if self.index is not None:
+            records, self._prefix_rowid = self.index.changed_since(self._prefix_rowid)
+            changed_sponsors = set()
+            for bill in records:
+                weight = self._bill_weight(bill)
+                self.prefix_index.set_source(f"bill:{bill['id']}", [
+                    (bill.get("title", ""), weight),
+                    (f"{bill.get('type', '')} {bill.get('number', '')}", weight - 1),
+                ])
+                sponsor = bill.get("sponsor", "")
+                if sponsor and sponsor != "Unknown Sponsor":
+                    self._sponsor_bills.setdefault(sponsor, set()).add(bill["id"])
+                    changed_sponsors.add(sponsor)
+            for sponsor in changed_sponsors:
+                # Prolific sponsors rank higher
+                weight = self.SPONSOR_WEIGHT + math.log2(1 + len(self._sponsor_bills[sponsor]))
+                self.prefix_index.set_source(f"sponsor:{sponsor}", [(sponsor, weight)])
+            if records:
+                logger.info(f"Prefix index synced {len(records)} bills, {len(changed_sponsors)} sponsors")
+
+        if self.prefix_index.dirty:
+            self.prefix_index.rebuild()
+        self._prefix_built_at = time.monotonic()
+
+    def _refresh_prefix_index(self) -> None:
+        """Start a background prefix index sync when the bill index or searched queries changed"""
+        if self._prefix_task is not None and not self._prefix_task.done():
+            return
+        if time.monotonic() - self._prefix_built_at < self.prefix_rebuild_interval:
+            return
+        index_changed = self.index is not None and self.index.generation != self._prefix_generation
+        if not index_changed and not self.prefix_index.dirty:
+            return
+        if self.index is not None:
+            self._prefix_generation = self.index.generation
+
+        def done(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Prefix index sync failed: {task.exception()}")
+                # Retry once the rebuild interval has passed again
+                self._prefix_generation = None
+                self._prefix_built_at = time.monotonic()
+
+        self._prefix_task = asyncio.create_task(asyncio.to_thread(self._sync_prefix_index))
+        self._prefix_task.add_done_callback(done)
+
     async def get_suggestions(self, query: str, limit: int = 5) -> List[str]:
         """Get search suggestions for autocomplete"""
         
         if not query or len(query) < 2:
             return []
+
+        # Answered from the in-memory prefix index; rebuilding happens in the background
+        self._refresh_prefix_index()
+        suggestions = self.prefix_index.suggest(query, limit)
+        if suggestions:
+            return suggestions
         
         cache_key = f"suggest_{query.lower()}_{limit}"
         if cache_key in self.suggestions_cache:
@@ -426,4 +664,5 @@ class BillSearcher:
             }
         ]
         
-        return mock_bills[:limit]
\ No newline at end of file
+        return mock_bills[:limit]
+
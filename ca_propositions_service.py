@@ -1,17 +1,91 @@
 """
 California Propositions Service
 Fetches and parses CA ballot propositions from the Secretary of State
+
+Each election's consolidated "text of proposed laws" PDF is downloaded once (asynchronously,
+streamed to a local cache and re-checked daily with a conditional request) and parsed once
+in the shared extraction pool into a page index: the text of every page plus the page range
+of each proposition it contains. Proposition lists and texts are served from that index.
 """
+import asyncio
+import json
 import logging
-import requests
+import os
 import re
-import io
+import time
+from datetime import date, timedelta
+from pathlib import Path
 from typing import List, Dict, Any, Optional
+
+import aiohttp
 from cachetools import TTLCache
 import pdfplumber
 
+import extraction_pool
+from swr_cache import StaleWhileRevalidateCache
+
 logger = logging.getLogger(__name__)
 
+# Bumped when index_proposition_pdf changes, so indexes parsed by an older version are rebuilt
+INDEX_VERSION = 2
+
+# A proposition heading is a line of its own; the legal text cites other propositions inline
+_PROPOSITION = re.compile(r"^PROPOSITION\s+(\d+)\s*$", re.MULTILINE)
+_SENTENCE_END = re.compile(r"\.(\s|$)")
+_TITLE_LINE = re.compile(r"^[A-Z][A-Z0-9 ,.'’&\-:;()]{8,100}$")
+
+
+def index_proposition_pdf(pdf_path: str) -> Dict[str, Any]:
+    """
+    Page texts of a consolidated proposition PDF and the page range of each proposition.
+
+    A proposition starts at the first page with a "PROPOSITION N" heading line whose number is
+    higher than the previous proposition's (propositions appear in ballot order, so a repeated
+    or lower number is a running header or a citation), and runs until the next one starts.
+    Runs in the extraction pool.
+    """
+    pages: List[str] = []
+    starts: List[Dict[str, Any]] = []
+    last_number = 0
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_number, page in enumerate(pdf.pages):
+            text = page.extract_text() or ""
+            pages.append(text)
+            for match in _PROPOSITION.finditer(text):
+                if int(match.group(1)) > last_number:
+                    last_number = int(match.group(1))
+                    starts.append({"number": match.group(1), "start": page_number,
+                                   **_describe(text[match.end():])})
+                    break
+
+    for i, prop in enumerate(starts):
+        prop["end"] = starts[i + 1]["start"] if i + 1 < len(starts) else len(pages)
+    return {"pages": pages, "propositions": starts}
+
+
+def _describe(text: str) -> Dict[str, str]:
+    """Title (first all-caps heading) and a short description (first prose sentence) after a heading"""
+    title, description = "", ""
+    for line in (line.strip() for line in text.splitlines()):
+        if not line:
+            continue
+        if not title and _TITLE_LINE.match(line) and not _PROPOSITION.match(line):
+            title = line.title()
+        elif not description and len(line) > 40 and not line.isupper():
+            description = line
+        if title and description:
+            break
+    if description:
+        # Run on into the rest of the paragraph, up to the first sentence end
+        rest = text[text.find(description):][:600].replace("\n", " ").strip()
+        sentence_end = _SENTENCE_END.search(rest)
+        if sentence_end and sentence_end.start() < 300:
+            description = rest[:sentence_end.start() + 1]
+        else:
+            description = rest[:300].rsplit(" ", 1)[0] + "..."
+    return {"title": title, "description": description}
+
+
 class CAPropositionsService:
     """Service for fetching and parsing California ballot propositions"""
 
@@ -33,102 +107,175 @@ class CAPropositionsService:
         }
     }
 
-    def __init__(self):
-        """Initialize CA Propositions service"""
-        # Cache for proposition lists and texts (24 hour TTL)
-        self.props_cache = TTLCache(maxsize=50, ttl=86400)  # 24 hours
-        self.text_cache = TTLCache(maxsize=100, ttl=86400)
+    # Hand-written summaries shown instead of the ones derived from the PDF
+    CURATED = {
+        ("2025_special", "50"): {
+            "shortTitle": "Redistricting Commission Reform",
+            "description": "Constitutional amendment to reform California's redistricting process and commission structure.",
+        },
+    }
 
-    def get_current_election(self) -> str:
-        """Get the most current/relevant election cycle"""
-        # For now, return 2025 special election
-        # TODO: Auto-detect based on current date
-        return "2025_special"
+    # How long after election day an election stays the current one
+    CURRENT_GRACE_DAYS = 30
 
-    async def get_propositions_list(self, election_cycle: Optional[str] = None) -> List[Dict[str, Any]]:
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None, cache_dir: Optional[Path] = None,
+                 recheck_after: float = 86400):
         """
-        Get list of propositions for an election cycle
+        Initialize CA Propositions service
 
-        For now, this returns a hardcoded list of known propositions.
-        In production, you could scrape the SOS website index page.
+        Args:
+            session: Shared aiohttp session for PDF downloads
+            cache_dir: Where downloaded PDFs and their page indexes are kept
+            recheck_after: Seconds before a cached PDF is revalidated with the SOS server
         """
-        if not election_cycle:
-            election_cycle = self.get_current_election()
-
-        cache_key = f"props_list_{election_cycle}"
-        if cache_key in self.props_cache:
-            return self.props_cache[cache_key]
-
-        # Hardcoded list for 2025 special election
-        # In production, scrape from https://www.sos.ca.gov/elections/ballot-measures
-        propositions = []
-
-        if election_cycle == "2025_special":
-            propositions = [
-                {
-                    "id": "prop_2025_50",
-                    "number": "50",
-                    "election": "2025_special",
-                    "title": "PROPOSITION 50",
-                    "shortTitle": "Redistricting Commission Reform",
-                    "description": "Constitutional amendment to reform California's redistricting process and commission structure.",
-                    "type": "Prop",
-                    "url": f"{self.BASE_URL}/2025/special/pdf/text-proposed-law.pdf",
-                    "lastAction": "On ballot November 4, 2025",
-                    "lastActionDate": "2025-11-04",
-                    "sponsor": "California Secretary of State"
-                }
-            ]
-
-        self.props_cache[cache_key] = propositions
-        return propositions
+        self.session = session
+        self.cache_dir = Path(cache_dir or Path(__file__).parent / "ca_props_cache")
+        self.recheck_after = recheck_after
+        # Cache for proposition lists (refreshed in the background daily, served stale for a week) and texts (24 hour TTL)
+        self.props_cache = StaleWhileRevalidateCache(refresh_after=86400, max_stale=7 * 86400, maxsize=50)
+        self.text_cache = TTLCache(maxsize=100, ttl=86400)
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
 
-    def extract_proposition_text(self, pdf_content: bytes, prop_number: str) -> Optional[str]:
+    def get_current_election(self, today: Optional[date] = None) -> str:
+        """Get the most current/relevant election cycle"""
+        # The next election with a text PDF (or one held within the grace period), else the latest one
+        today = today or date.today()
+        with_text = sorted(
+            (info["date"], cycle) for cycle, info in self.ELECTIONS.items() if "text_pdf_url" in info
+        )
+        cutoff = (today - timedelta(days=self.CURRENT_GRACE_DAYS)).isoformat()
+        for election_date, cycle in with_text:
+            if election_date >= cutoff:
+                return cycle
+        return with_text[-1][1]
+
+    def _election_for_year(self, year: str) -> Optional[str]:
+        """Election cycle of a proposition id's year, preferring one with a text PDF"""
+        cycles = [cycle for cycle in self.ELECTIONS if cycle.startswith(f"{year}_")]
+        cycles.sort(key=lambda cycle: "text_pdf_url" not in self.ELECTIONS[cycle])
+        return cycles[0] if cycles else None
+
+    # ------------------------------------------------------------------
+    # PDF download and index
+    # ------------------------------------------------------------------
+
+    def _paths(self, election_cycle: str):
+        directory = self.cache_dir / election_cycle
+        return directory / "text.pdf", directory / "text.meta.json", directory / f"index.v{INDEX_VERSION}.json"
+
+    async def _ensure_pdf(self, election_cycle: str) -> Optional[Path]:
         """
-        Extract text for a specific proposition from the consolidated PDF
+        Local copy of an election's text PDF, downloaded or revalidated when due.
 
-        Args:
-            pdf_content: Raw PDF bytes
-            prop_number: Proposition number (e.g., "50")
-
-        Returns:
-            Extracted text for the proposition
+        Returns the cached copy when the SOS server can't be reached, None if there is none.
         """
+        url = self.ELECTIONS[election_cycle]["text_pdf_url"]
+        pdf_path, meta_path, index_path = self._paths(election_cycle)
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() and pdf_path.exists() else {}
+        if meta and time.time() - meta.get("checked_at", 0) < self.recheck_after:
+            return pdf_path
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
         try:
-            with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-                prop_pattern = re.compile(rf"\bPROPOSITION\s+{prop_number}\b", re.IGNORECASE)
-                next_prop_pattern = re.compile(r"\bPROPOSITION\s+\d+\b", re.IGNORECASE)
-
-                prop_pages = []
-                in_proposition = False
-
-                for page in pdf.pages:
-                    text = page.extract_text() or ""
-
-                    # Check if this page starts the target proposition
-                    if prop_pattern.search(text):
-                        in_proposition = True
-                        prop_pages.append(text)
-                        logger.info(f"Found start of Proposition {prop_number}")
-                    elif in_proposition:
-                        # Check if we've reached the next proposition
-                        next_match = next_prop_pattern.search(text)
-                        if next_match and next_match.group() != f"PROPOSITION {prop_number}":
-                            logger.info(f"Reached next proposition, stopping extraction")
-                            break
-                        prop_pages.append(text)
-
-                if prop_pages:
-                    full_text = "\n\n".join(prop_pages)
-                    logger.info(f"Extracted {len(prop_pages)} pages for Proposition {prop_number}")
-                    return full_text
+            logger.info(f"Downloading proposition text PDF from: {url}")
+            async with self.session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=120)) as response:
+                if response.status == 304:
+                    meta["checked_at"] = time.time()
+                elif response.status == 200:
+                    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_path = pdf_path.with_name(f"{pdf_path.name}.{os.getpid()}.tmp")
+                    with open(tmp_path, "wb") as f:
+                        async for chunk in response.content.iter_chunked(1 << 16):
+                            f.write(chunk)
+                    os.replace(tmp_path, pdf_path)
+                    # The page index belongs to the previous version of the PDF
+                    index_path.unlink(missing_ok=True)
+                    self._indexes.pop(election_cycle, None)
+                    meta = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"),
+                            "checked_at": time.time(), "size": pdf_path.stat().st_size}
+                    logger.info(f"Downloaded {meta['size']} byte proposition PDF for {election_cycle}")
                 else:
-                    logger.warning(f"No text found for Proposition {prop_number}")
-                    return None
+                    raise aiohttp.ClientResponseError(response.request_info, (), status=response.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error downloading proposition PDF: {e}")
+            return pdf_path if pdf_path.exists() else None
 
-        except Exception as e:
-            logger.error(f"Error extracting proposition text: {e}")
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        return pdf_path
+
+    async def get_index(self, election_cycle: str) -> Optional[Dict[str, Any]]:
+        """Page index of an election's text PDF, parsed once per PDF version"""
+        if "text_pdf_url" not in self.ELECTIONS.get(election_cycle, {}):
             return None
+        lock = self._locks.setdefault(election_cycle, asyncio.Lock())
+        async with lock:
+            pdf_path = await self._ensure_pdf(election_cycle)
+            if pdf_path is None:
+                return None
+            if election_cycle in self._indexes:
+                return self._indexes[election_cycle]
+
+            _, _, index_path = self._paths(election_cycle)
+            if index_path.exists():
+                index = json.loads(await asyncio.to_thread(index_path.read_text, encoding="utf-8"))
+            else:
+                started = time.monotonic()
+                index = await extraction_pool.run(index_proposition_pdf, str(pdf_path))
+                await asyncio.to_thread(index_path.write_text, json.dumps(index), encoding="utf-8")
+                logger.info(f"Indexed {len(index['pages'])} pages, {len(index['propositions'])} propositions "
+                            f"for {election_cycle} in {time.monotonic() - started:.1f}s")
+            self._indexes[election_cycle] = index
+            return index
+
+    # ------------------------------------------------------------------
+    # Propositions
+    # ------------------------------------------------------------------
+
+    async def get_propositions_list(self, election_cycle: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get list of propositions for an election cycle, as found in its text PDF"""
+        if not election_cycle:
+            election_cycle = self.get_current_election()
+
+        cache_key = f"props_list_{election_cycle}"
+        return await self.props_cache.get(cache_key, lambda: self._load_propositions_list(election_cycle))
+
+    async def _load_propositions_list(self, election_cycle: str) -> List[Dict[str, Any]]:
+        """Build the proposition list for an election cycle"""
+        election = self.ELECTIONS.get(election_cycle)
+        if not election:
+            return []
+        index = await self.get_index(election_cycle)
+        if index is None:
+            # No PDF available (yet); fall back to the propositions we have summaries for
+            entries = [{"number": number, "title": "", "description": ""}
+                       for cycle, number in self.CURATED if cycle == election_cycle]
+        else:
+            entries = index["propositions"]
+
+        year = election_cycle.split("_")[0]
+        election_day = date.fromisoformat(election["date"])
+        propositions = []
+        for entry in entries:
+            curated = self.CURATED.get((election_cycle, entry["number"]), {})
+            propositions.append({
+                "id": f"prop_{year}_{entry['number']}",
+                "number": entry["number"],
+                "election": election_cycle,
+                "title": f"PROPOSITION {entry['number']}",
+                "shortTitle": curated.get("shortTitle") or entry["title"] or f"Proposition {entry['number']}",
+                "description": curated.get("description") or entry["description"],
+                "type": "Prop",
+                "url": election["text_pdf_url"],
+                "lastAction": f"On ballot {election_day:%B} {election_day.day}, {election_day.year}",
+                "lastActionDate": election["date"],
+                "sponsor": "California Secretary of State"
+            })
+        return propositions
 
     async def get_proposition_text(self, prop_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -155,44 +302,35 @@ class CAPropositionsService:
             election_year = parts[1]
             prop_number = parts[2]
 
-            # Determine election cycle
-            # For 2025, use special election
-            if election_year == "2025":
-                election_cycle = "2025_special"
-            else:
-                election_cycle = f"{election_year}_general"
-
-            election_info = self.ELECTIONS.get(election_cycle)
-            if not election_info or "text_pdf_url" not in election_info:
-                logger.error(f"No PDF URL for election cycle: {election_cycle}")
+            election_cycle = self._election_for_year(election_year)
+            if not election_cycle or "text_pdf_url" not in self.ELECTIONS[election_cycle]:
+                logger.error(f"No PDF URL for election year: {election_year}")
                 return None
 
-            # Download PDF
-            logger.info(f"Downloading proposition text PDF from: {election_info['text_pdf_url']}")
-            response = requests.get(election_info["text_pdf_url"], timeout=60)
-            response.raise_for_status()
-
-            # Extract proposition text
-            prop_text = self.extract_proposition_text(response.content, prop_number)
-
-            if not prop_text:
+            index = await self.get_index(election_cycle)
+            if index is None:
+                return None
+            entry = next((p for p in index["propositions"] if p["number"] == prop_number), None)
+            if entry is None:
+                logger.warning(f"No text found for Proposition {prop_number}")
                 return None
 
+            prop_text = "\n\n".join(index["pages"][entry["start"]:entry["end"]])
+            logger.info(f"Extracted {entry['end'] - entry['start']} pages for Proposition {prop_number}")
+
             result = {
                 "id": prop_id,
                 "number": prop_number,
                 "election": election_cycle,
                 "text": prop_text,
                 "text_length": len(prop_text),
-                "pdf_url": election_info["text_pdf_url"]
+                "pdf_url": self.ELECTIONS[election_cycle]["text_pdf_url"],
+                "pages": [entry["start"] + 1, entry["end"]]
             }
 
             self.text_cache[cache_key] = result
             return result
 
-        except requests.RequestException as e:
-            logger.error(f"Error downloading proposition PDF: {e}")
-            return None
         except Exception as e:
             logger.error(f"Error getting proposition text: {e}")
             return None
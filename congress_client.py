@@ -0,0 +1,351 @@
+"""
+Async client for the Congress.gov API.
+
+All Congress.gov traffic goes through one CongressClient so that requests share a
+token-bucket limiter sized to the API's hourly quota, retry 429/5xx responses and network
+errors with jittered exponential backoff, and are counted in one set of request, latency
+and quota metrics. List endpoints are paginated with the next pages prefetched concurrently.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Mapping, Optional
+
+import aiohttp
+
+from http_cache import CachedResponse, HTTPCache
+
+logger = logging.getLogger(__name__)
+
+CONGRESS_API_BASE = "https://api.congress.gov/v3"
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CongressAPIError(RuntimeError):
+    """Congress.gov returned an error status (after retries) or could not be reached"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CongressNotFound(CongressAPIError):
+    """The requested bill or resource does not exist (404)"""
+
+
+@dataclass
+class CongressResponse:
+    status: int
+    data: Any
+    headers: Mapping[str, str]
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, waiting until one is available; returns seconds waited"""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def limit_to(self, remaining: float) -> None:
+        """Never allow more immediate requests than the server says remain in the quota"""
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+
+
+class CongressClient:
+    """Rate-limited, retrying Congress.gov API client with typed bill endpoints"""
+
+    def __init__(self, api_key: Optional[str], session_getter: Callable[[], aiohttp.ClientSession],
+                 base_url: str = CONGRESS_API_BASE, hourly_quota: int = 5000, burst: int = 50,
+                 max_retries: int = 3, backoff_base: float = 0.5, timeout: float = 30,
+                 http_cache: Optional[HTTPCache] = None):
+        """
+        Args:
+            api_key: Congress.gov API key
+            session_getter: Returns the shared aiohttp session
+            base_url: API root (overridable for testing)
+            hourly_quota: Requests per hour allowed by the API key
+            burst: Requests that may be made back to back before the hourly rate applies
+            max_retries: Retries for 429/5xx responses and network errors
+            backoff_base: First retry delay in seconds, doubled per attempt with jitter
+            timeout: Default total timeout per request in seconds
+            http_cache: Conditional-request cache for API responses (fresh hits use no quota)
+        """
+        self.api_key = api_key
+        self.session_getter = session_getter
+        self.base_url = base_url.rstrip("/")
+        self.hourly_quota = hourly_quota
+        self.limiter = TokenBucket(hourly_quota / 3600, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.http_cache = http_cache
+
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self.metrics: Dict[str, Any] = {
+            "requests": 0,
+            "cache_hits": 0,
+            "retries": 0,
+            "errors": 0,
+            "statuses": {},
+            "rate_limit_wait_seconds": 0.0,
+            "quota_limit": None,
+            "quota_remaining": None,
+        }
+
+    # ------------------------------------------------------------------
+    # Core request
+    # ------------------------------------------------------------------
+
+    def _url(self, path_or_url: str) -> str:
+        if path_or_url.startswith(("http://", "https://")):
+            return path_or_url
+        return f"{self.base_url}/{path_or_url.lstrip('/')}"
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    def _record_quota(self, headers: Mapping[str, str]) -> None:
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        if limit and limit.isdigit():
+            self.metrics["quota_limit"] = int(limit)
+        if remaining and remaining.isdigit():
+            self.metrics["quota_remaining"] = int(remaining)
+            self.limiter.limit_to(int(remaining))
+
+    async def _send(self, url: str, query: Dict[str, Any], headers: Optional[Dict[str, str]],
+                    timeout: aiohttp.ClientTimeout, limited: bool, use_cache: bool) -> CachedResponse:
+        """One GET, through the HTTP cache when enabled; the limiter is only consulted for network requests"""
+        async def before_network() -> None:
+            if limited:
+                self.metrics["rate_limit_wait_seconds"] += await self.limiter.acquire()
+            self.metrics["requests"] += 1
+
+        if use_cache and self.http_cache is not None:
+            response = await self.http_cache.request(self.session_getter(), url, params=query, headers=headers,
+                                                     timeout=timeout, before_network=before_network)
+            if response.from_cache:
+                self.metrics["cache_hits"] += 1
+            return response
+
+        await before_network()
+        async with self.session_getter().get(url, params=query, headers=headers, timeout=timeout) as response:
+            return CachedResponse(response.status, await response.read(), dict(response.headers), "bypass")
+
+    async def get(self, path_or_url: str, params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None, accept: Iterable[int] = (200,),
+                  timeout: Optional[float] = None, retries: Optional[int] = None,
+                  as_text: bool = False, rate_limited: bool = True, cache: bool = True) -> CongressResponse:
+        """
+        GET a Congress.gov path (or absolute URL) and decode the body.
+
+        Statuses in `accept` are returned; 404 raises CongressNotFound, anything else
+        raises CongressAPIError once retries are exhausted. With cache=False the HTTP
+        cache is skipped (e.g. for documents stored elsewhere).
+        """
+        url = self._url(path_or_url)
+        is_api = url.startswith(self.base_url)
+        query = dict(params or {})
+        if is_api:
+            query.setdefault("api_key", self.api_key)
+            query.setdefault("format", "json")
+        accept = tuple(accept)
+        retries = self.max_retries if retries is None else retries
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+
+        for attempt in range(retries + 1):
+            started = time.monotonic()
+            retry_after = None
+            try:
+                # Documents served from govinfo don't count against the API key's quota
+                response = await self._send(url, query, headers, client_timeout,
+                                            limited=rate_limited and is_api, use_cache=cache)
+                status = response.status
+                statuses = self.metrics["statuses"]
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if is_api and not response.from_cache:
+                    self._record_quota(response.headers)
+
+                if status in accept:
+                    if status == 304:
+                        data = None
+                    elif as_text:
+                        data = response.text()
+                    else:
+                        data = response.json()
+                    self._latencies.append(time.monotonic() - started)
+                    return CongressResponse(status, data, response.headers)
+
+                if status == 404:
+                    self.metrics["errors"] += 1
+                    raise CongressNotFound(f"Congress.gov resource not found: {url}", status)
+                if status not in RETRY_STATUSES or attempt == retries:
+                    self.metrics["errors"] += 1
+                    raise CongressAPIError(f"Congress API error {status}: {response.text()[:200]}", status)
+                retry_after = response.headers.get("Retry-After")
+                reason = f"status {status}"
+            except CongressAPIError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                if attempt == retries:
+                    self.metrics["errors"] += 1
+                    raise CongressAPIError(f"Congress API request failed: {e!r}") from e
+                reason = repr(e)
+
+            delay = self._backoff(attempt, retry_after)
+            self.metrics["retries"] += 1
+            logger.warning(f"Congress API {reason} for {path_or_url}, retrying in {delay:.1f}s "
+                           f"(attempt {attempt + 1}/{retries})")
+            await asyncio.sleep(delay)
+
+        raise CongressAPIError("Congress API request failed")  # Unreachable
+
+    async def get_json(self, path: str, **params) -> Dict[str, Any]:
+        return (await self.get(path, params=params)).data
+
+    async def iter_pages(self, path: str, key: str, params: Optional[Dict[str, Any]] = None,
+                         page_size: int = 250, max_pages: Optional[int] = None,
+                         prefetch: int = 3) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield the `key` list of each page of a list endpoint, in order.
+
+        The first page reports the total count; up to `prefetch` following pages are then
+        requested concurrently while earlier pages are consumed.
+        """
+        params = dict(params or {})
+        params["limit"] = page_size
+        offset = int(params.pop("offset", 0))
+
+        first = (await self.get(path, params={**params, "offset": offset})).data
+        items = first.get(key, [])
+        yield items
+        if len(items) < page_size or max_pages == 1:
+            return
+
+        count = (first.get("pagination") or {}).get("count")
+        if count is None:
+            # No total reported: follow pages one at a time until a short page
+            pages = 1
+            while max_pages is None or pages < max_pages:
+                offset += page_size
+                items = (await self.get(path, params={**params, "offset": offset})).data.get(key, [])
+                pages += 1
+                yield items
+                if len(items) < page_size:
+                    return
+            return
+
+        offsets = list(range(offset + page_size, count, page_size))
+        if max_pages is not None:
+            offsets = offsets[:max_pages - 1]
+
+        pending: Deque[asyncio.Task] = deque()
+        next_offset = iter(offsets)
+
+        def schedule() -> None:
+            page_offset = next(next_offset, None)
+            if page_offset is not None:
+                pending.append(asyncio.create_task(self.get(path, params={**params, "offset": page_offset})))
+
+        try:
+            for _ in range(max(1, prefetch)):
+                schedule()
+            while pending:
+                response = await pending.popleft()
+                schedule()
+                yield response.data.get(key, [])
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        snapshot = dict(self.metrics, statuses=dict(self.metrics["statuses"]))
+        snapshot["rate_limit_wait_seconds"] = round(snapshot["rate_limit_wait_seconds"], 3)
+        snapshot["limiter_tokens"] = round(self.limiter.tokens, 2)
+        if latencies:
+            snapshot["latency_ms"] = {
+                "p50": round(latencies[len(latencies) // 2] * 1000, 1),
+                "p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 1),
+                "max": round(latencies[-1] * 1000, 1),
+                "samples": len(latencies),
+            }
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Bill endpoints
+    # ------------------------------------------------------------------
+
+    async def list_bills(self, congress: int, limit: int = 20, offset: int = 0, sort: str = "updateDate+desc",
+                         from_datetime: Optional[str] = None, timeout: Optional[float] = None,
+                         retries: Optional[int] = None) -> List[Dict[str, Any]]:
+        """One page of a Congress's bills"""
+        params: Dict[str, Any] = {"limit": limit, "offset": offset, "sort": sort}
+        if from_datetime:
+            params["fromDateTime"] = from_datetime
+        response = await self.get(f"bill/{congress}", params=params, timeout=timeout, retries=retries)
+        return response.data.get("bills", [])
+
+    def iter_bill_pages(self, congress: int, sort: str = "updateDate+desc", from_datetime: Optional[str] = None,
+                        page_size: int = 250, max_pages: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """All of a Congress's bills, page by page"""
+        params: Dict[str, Any] = {"sort": sort}
+        if from_datetime:
+            params["fromDateTime"] = from_datetime
+        return self.iter_pages(f"bill/{congress}", "bills", params, page_size=page_size, max_pages=max_pages)
+
+    async def get_bill(self, congress: int, bill_type: str, bill_number: str) -> Dict[str, Any]:
+        """Bill detail record (sponsors, policy area, summaries...); raises CongressNotFound"""
+        data = await self.get_json(f"bill/{congress}/{bill_type.lower()}/{bill_number}")
+        bill = data.get("bill") or {}
+        if not bill:
+            raise CongressNotFound(f"Bill not found: {bill_type} {bill_number} ({congress})", 404)
+        return bill
+
+    async def get_text_versions(self, congress: int, bill_type: str, bill_number: str,
+                                etag: Optional[str] = None, last_modified: Optional[str] = None) -> CongressResponse:
+        """Text version list, conditionally requested; status is 304 when unchanged"""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return await self.get(f"bill/{congress}/{bill_type.lower()}/{bill_number}/text",
+                              headers=headers, accept=(200, 304), cache=False)
+
+    async def fetch_document(self, url: str) -> str:
+        """Download a bill text document (XML/HTML/PDF link from a text version)"""
+        return (await self.get(url, as_text=True, cache=False)).data
@@ -0,0 +1,67 @@
+"""
+Shared process pool for CPU-bound document extraction.
+
+PDF parsing (pdfplumber) and decoding/normalizing large documents take hundreds of
+milliseconds to seconds and hold the GIL, so running them inline on the event loop stalls
+every other request. Callers submit module-level functions here instead; the pool is
+started lazily with the spawn start method (workers import only what the task needs and
+never inherit the server's sockets or threads) and is shared by all services.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _max_workers() -> int:
+    return int(os.getenv("EXTRACTION_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_max_workers(), mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"Started document extraction pool with {_max_workers()} workers")
+    return _pool
+
+
+async def run(fn: Callable[..., T], *args: Any) -> T:
+    """Run a picklable module-level function in the pool without blocking the event loop"""
+    global _pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_pool(), fn, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a huge PDF); replace the pool so later calls still work
+        logger.error("Document extraction worker died, restarting the pool")
+        _pool = None
+        raise
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def pdf_to_text(pdf_bytes: bytes) -> str:
+    """Text of every page of a PDF joined by blank lines (empty when nothing is extractable)"""
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        text_parts = []
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text_parts.append(page_text)
+    return "\n\n".join(text_parts).strip()
@@ -0,0 +1,352 @@
+"""
+Disk-backed HTTP cache with conditional revalidation for upstream metadata APIs.
+
+Successful GET responses are stored on disk (gzip body plus a JSON header record). While
+an entry is fresh it is served without any network request; once stale it is revalidated
+with If-None-Match / If-Modified-Since, and a 304 reuses the stored body. Freshness comes
+from Cache-Control (max-age, no-cache, no-store) or Expires when the upstream sends them,
+and from per-URL TTL rules otherwise. API keys are stripped from cache keys and never
+written to disk. Once the stored entries grow past `max_bytes` the least recently used are
+evicted; a hit touches the body's mtime, so recency survives restarts.
+"""
+import asyncio
+import email.utils
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that identify the caller rather than the resource
+SECRET_PARAMS = frozenset({"api_key", "key"})
+
+# Response headers worth keeping with a cached body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Expires")
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*(?:s-maxage|max-age)\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+
+@dataclass
+class CachedResponse:
+    """Response body and headers, whether served from disk or the network"""
+    status: int
+    body: bytes
+    headers: Dict[str, str]
+    source: str  # "hit", "revalidated", "miss" or "bypass"
+
+    @property
+    def from_cache(self) -> bool:
+        return self.source in ("hit", "revalidated")
+
+    def text(self) -> str:
+        match = re.search(r"charset=([\w-]+)", self.headers.get("Content-Type", ""), re.IGNORECASE)
+        return self.body.decode(match.group(1) if match else "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+@dataclass
+class _Entry:
+    url: str
+    headers: Dict[str, str]
+    stored_at: float
+    expires_at: float
+    size: int
+    body_path: Path = field(repr=False, default=None)
+
+
+class HTTPCache:
+    """Conditional-request cache in front of a shared aiohttp session"""
+
+    def __init__(self, cache_dir: Path, default_ttl: float = 300,
+                 ttl_rules: Iterable[Tuple[str, float]] = (), max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory for cached responses
+            default_ttl: Seconds a response without caching headers is considered fresh
+            ttl_rules: (URL regex, seconds) pairs overriding default_ttl; the first match wins
+            max_bytes: Total size on disk kept before least recently used entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.default_ttl = default_ttl
+        self.ttl_rules: List[Tuple[re.Pattern, float]] = [(re.compile(pattern), ttl) for pattern, ttl in ttl_rules]
+        self.max_bytes = max_bytes
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}  # cache URL -> (lock, holders and waiters)
+        self._index_lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # digest -> bytes on disk, least recent first
+        self._size = 0
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "bypassed": 0, "evictions": 0,
+                      "bytes_saved": 0, "bytes_downloaded": 0}
+
+    # ------------------------------------------------------------------
+    # Keys and storage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cache_url(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+        """URL identifying the resource: sorted query without API keys"""
+        base, _, query = url.partition("?")
+        items = parse_qsl(query, keep_blank_values=True)
+        items += [(str(k), str(v)) for k, v in (params or {}).items() if v is not None]
+        items = sorted((k, v) for k, v in items if k not in SECRET_PARAMS)
+        return f"{base}?{urlencode(items)}" if items else base
+
+    @staticmethod
+    def _digest(cache_url: str) -> str:
+        return hashlib.sha256(cache_url.encode("utf-8")).hexdigest()
+
+    def _digest_paths(self, digest: str) -> Tuple[Path, Path]:
+        directory = self.cache_dir / digest[:2]
+        return directory / f"{digest}.json", directory / f"{digest}.body.gz"
+
+    def _paths(self, cache_url: str) -> Tuple[Path, Path]:
+        return self._digest_paths(self._digest(cache_url))
+
+    @asynccontextmanager
+    async def _locked(self, key: str) -> AsyncIterator[None]:
+        """Hold the per-key lock; it is dropped once nothing holds or awaits it"""
+        lock, users = self._locks.get(key, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            _, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Size bound (blocking; called from worker threads)
+    # ------------------------------------------------------------------
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            if self.cache_dir.exists():
+                for body_path in self.cache_dir.glob("*/*.body.gz"):
+                    meta_path = body_path.with_name(body_path.name[:-len(".body.gz")] + ".json")
+                    try:
+                        stat = body_path.stat()
+                        size = stat.st_size + meta_path.stat().st_size
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, meta_path.stem, size))
+            entries.sort()
+            self._index = OrderedDict((digest, size) for _, digest, size in entries)
+            self._size = sum(self._index.values())
+            logger.info(f"HTTP cache: {len(self._index)} entries, {self._size / 1e6:.1f} MB")
+        return self._index
+
+    def _account(self, cache_url: str, size: int) -> None:
+        """Record a stored entry as most recently used and evict past max_bytes"""
+        digest = self._digest(cache_url)
+        with self._index_lock:
+            index = self._load_index()
+            self._size += size - index.pop(digest, 0)
+            index[digest] = size
+            while self._size > self.max_bytes and len(index) > 1:
+                evicted, evicted_size = index.popitem(last=False)
+                self._size -= evicted_size
+                for path in self._digest_paths(evicted):
+                    path.unlink(missing_ok=True)
+                self.stats["evictions"] += 1
+
+    def _forget(self, cache_url: str) -> None:
+        with self._index_lock:
+            if self._index is not None:
+                self._size -= self._index.pop(self._digest(cache_url), 0)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._index_lock:
+            return {
+                **self.stats,
+                "entries": len(self._index) if self._index is not None else None,
+                "bytes": self._size if self._index is not None else None,
+                "maxBytes": self.max_bytes,
+            }
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    def _load(self, cache_url: str) -> Optional[_Entry]:
+        meta_path, body_path = self._paths(cache_url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable HTTP cache entry {meta_path}: {e}")
+            return None
+        if meta.get("url") != cache_url or not body_path.exists():
+            return None
+        return _Entry(meta["url"], meta["headers"], meta["stored_at"], meta["expires_at"], meta["size"], body_path)
+
+    def _store(self, cache_url: str, headers: Dict[str, str], body: bytes, expires_at: float) -> None:
+        _, body_path = self._paths(cache_url)
+        compressed = gzip.compress(body)
+        self._write_atomic(body_path, compressed)
+        meta_size = self._save_meta(cache_url, headers, len(body), expires_at)
+        self._account(cache_url, len(compressed) + meta_size)
+
+    def _save_meta(self, cache_url: str, headers: Dict[str, str], size: int, expires_at: float) -> int:
+        meta_path, _ = self._paths(cache_url)
+        meta = {"url": cache_url, "headers": headers, "stored_at": time.time(), "expires_at": expires_at, "size": size}
+        data = json.dumps(meta).encode("utf-8")
+        self._write_atomic(meta_path, data)
+        return len(data)
+
+    def _refresh_meta(self, entry: _Entry, headers: Dict[str, str], expires_at: float) -> None:
+        try:
+            body_size = entry.body_path.stat().st_size
+        except OSError:
+            return  # Evicted meanwhile
+        meta_size = self._save_meta(entry.url, headers, entry.size, expires_at)
+        self._account(entry.url, body_size + meta_size)
+
+    def invalidate(self, url: str, params: Optional[Mapping[str, Any]] = None) -> None:
+        """Drop a stored response, e.g. when its body turned out to be an application-level error"""
+        cache_url = self.cache_url(url, params)
+        for path in self._paths(cache_url):
+            path.unlink(missing_ok=True)
+        self._forget(cache_url)
+
+    def _read_body(self, entry: _Entry) -> Optional[bytes]:
+        """Stored body, marked most recently used; None when it was evicted meanwhile"""
+        try:
+            body = gzip.decompress(entry.body_path.read_bytes())
+            os.utime(entry.body_path)
+        except OSError:
+            self._forget(entry.url)
+            return None
+        with self._index_lock:
+            if self._index is not None and self._digest(entry.url) in self._index:
+                self._index.move_to_end(self._digest(entry.url))
+        return body
+
+    # ------------------------------------------------------------------
+    # Freshness
+    # ------------------------------------------------------------------
+
+    def _fallback_ttl(self, cache_url: str) -> float:
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(cache_url):
+                return ttl
+        return self.default_ttl
+
+    def _expires_at(self, cache_url: str, headers: Mapping[str, str]) -> Optional[float]:
+        """Expiry time for a response, or None when it must not be stored"""
+        now = time.time()
+        cache_control = headers.get("Cache-Control", "")
+        directives = cache_control.lower()
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return now  # Stored, but revalidated on every use
+        match = _MAX_AGE.search(cache_control)
+        if match:
+            return now + int(match.group(1))
+        if headers.get("Expires"):
+            try:
+                return email.utils.parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return now  # Invalid Expires means already expired
+        return now + self._fallback_ttl(cache_url)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    async def request(self, session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None, timeout: Optional[aiohttp.ClientTimeout] = None,
+                      before_network: Optional[Callable[[], Awaitable[Any]]] = None) -> CachedResponse:
+        """
+        GET through the cache.
+
+        `before_network` is awaited only when a request is actually sent (e.g. to take a
+        rate-limiter token). Requests carrying their own conditional headers bypass the cache.
+        """
+        if headers and any(h in headers for h in ("If-None-Match", "If-Modified-Since")):
+            self.stats["bypassed"] += 1
+            return await self._fetch(session, url, params, headers, timeout, before_network, "bypass")
+
+        cache_url = self.cache_url(url, params)
+        async with self._locked(cache_url):
+            entry = await asyncio.to_thread(self._load, cache_url)
+            if entry is not None and time.time() < entry.expires_at:
+                body = await asyncio.to_thread(self._read_body, entry)
+                if body is not None:
+                    self.stats["hits"] += 1
+                    self.stats["bytes_saved"] += entry.size
+                    return CachedResponse(200, body, entry.headers, "hit")
+                entry = None
+
+            request_headers = dict(headers or {})
+            if entry is not None:
+                if entry.headers.get("ETag"):
+                    request_headers["If-None-Match"] = entry.headers["ETag"]
+                if entry.headers.get("Last-Modified"):
+                    request_headers["If-Modified-Since"] = entry.headers["Last-Modified"]
+
+            response = await self._fetch(session, url, params, request_headers, timeout, before_network, "miss")
+
+            if response.status == 304 and entry is not None:
+                body = await asyncio.to_thread(self._read_body, entry)
+                if body is not None:
+                    # Keep the stored validators, take any fresh caching headers from the 304
+                    merged = dict(entry.headers)
+                    merged.update({k: v for k, v in response.headers.items() if k in STORED_HEADERS})
+                    expires_at = self._expires_at(cache_url, merged) or time.time()
+                    await asyncio.to_thread(self._refresh_meta, entry, merged, expires_at)
+                    self.stats["revalidated"] += 1
+                    self.stats["bytes_saved"] += entry.size
+                    return CachedResponse(200, body, merged, "revalidated")
+                # The body was evicted while revalidating: fetch it again unconditionally
+                response = await self._fetch(session, url, params, headers, timeout, before_network, "miss")
+
+            self.stats["misses"] += 1
+            if response.status == 200:
+                expires_at = self._expires_at(cache_url, response.headers)
+                if expires_at is not None:
+                    stored_headers = {k: v for k, v in response.headers.items() if k in STORED_HEADERS}
+                    await asyncio.to_thread(self._store, cache_url, stored_headers, response.body, expires_at)
+            return response
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, Any]],
+                     headers: Optional[Dict[str, str]], timeout: Optional[aiohttp.ClientTimeout],
+                     before_network: Optional[Callable[[], Awaitable[Any]]], source: str) -> CachedResponse:
+        if before_network is not None:
+            await before_network()
+        async with session.get(url, params=params, headers=headers, timeout=timeout) as response:
+            body = await response.read()
+            kept = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+            # Pass rate-limit and retry headers through to the caller without storing them
+            for name, value in response.headers.items():
+                if name.lower().startswith("x-ratelimit") or name.lower() == "retry-after":
+                    kept[name] = value
+        self.stats["bytes_downloaded"] += len(body)
+        return CachedResponse(response.status, body, kept, source)
@@ -0,0 +1,192 @@
+"""
+Incremental re-analysis of bills that received a new text version.
+
+Instead of regenerating the full analysis, the prior version's analysis is updated using
+short summaries of only the changed, added and removed sections. Section summaries are
+cached on disk by content hash, so a section is summarized at most once per model.
+"""
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bill_text import BillSection, SectionDiff
+
+logger = logging.getLogger(__name__)
+
+CompletionFn = Callable[[dict, str], Awaitable[str]]
+
+
+class SectionSummaryCache:
+    """Per-model section summaries stored as small text files keyed by section body hash"""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, model: str, body_hash: str) -> Path:
+        model_slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+        return self.cache_dir / model_slug / body_hash[:2] / f"{body_hash}.txt"
+
+    def get(self, model: str, section: BillSection) -> Optional[str]:
+        path = self._path(model, section.body_hash)
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def set(self, model: str, section: BillSection, summary: str) -> None:
+        path = self._path(model, section.body_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(summary, encoding="utf-8")
+
+
+class IncrementalAnalyzer:
+    """Updates a prior bill analysis from a section diff"""
+
+    def __init__(self, complete_fn: CompletionFn, summary_cache: SectionSummaryCache,
+                 max_changed_fraction: float = 0.5, summary_batch_chars: int = 16000,
+                 max_section_chars: int = 4000):
+        """
+        Args:
+            complete_fn: Chat completion coroutine taking (payload, purpose)
+            summary_cache: Cache of per-section summaries
+            max_changed_fraction: Above this share of changed text a full re-analysis is cheaper and better
+            summary_batch_chars: Section text per summarization request
+            max_section_chars: Longer sections are truncated before summarization
+        """
+        self.complete_fn = complete_fn
+        self.summary_cache = summary_cache
+        self.max_changed_fraction = max_changed_fraction
+        self.summary_batch_chars = summary_batch_chars
+        self.max_section_chars = max_section_chars
+
+    @staticmethod
+    def _label(section: BillSection) -> str:
+        return section.heading or section.key
+
+    @staticmethod
+    def _parse_summaries(content: str) -> Dict[str, str]:
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            parsed = json.loads(match.group())
+        except ValueError:
+            return {}
+        return {str(k): str(v).strip() for k, v in parsed.items() if v}
+
+    async def summarize_sections(self, sections: List[BillSection], model: str) -> Dict[str, str]:
+        """Summaries by body hash; only sections missing from the cache are sent to the model"""
+        summaries: Dict[str, str] = {}
+        pending: Dict[str, BillSection] = {}
+        for section in sections:
+            cached = self.summary_cache.get(model, section)
+            if cached is not None:
+                summaries[section.body_hash] = cached
+            else:
+                pending.setdefault(section.body_hash, section)
+
+        logger.info(f"Section summaries: {len(summaries)} cached, {len(pending)} to generate")
+
+        batches: List[List[BillSection]] = [[]]
+        batch_chars = 0
+        for section in pending.values():
+            size = min(len(section.text), self.max_section_chars)
+            if batches[-1] and batch_chars + size > self.summary_batch_chars:
+                batches.append([])
+                batch_chars = 0
+            batches[-1].append(section)
+            batch_chars += size
+
+        for batch in batches:
+            if not batch:
+                continue
+            ids = {f"S{i + 1}": section for i, section in enumerate(batch)}
+            sections_text = "\n\n".join(
+                f"[{section_id}] {self._label(section)}\n{section.text[:self.max_section_chars]}"
+                for section_id, section in ids.items()
+            )
+            payload = {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": "You are a legislative analyst summarizing individual bill sections."},
+                    {"role": "user", "content": f"""
+Summarize what each bill section below does in one or two plain-language sentences.
+Respond with only a JSON object mapping each section id (e.g. "S1") to its summary.
+
+{sections_text}
+"""},
+                ],
+                "temperature": 0.2,
+            }
+            content = await self.complete_fn(payload, "section summaries")
+            parsed = self._parse_summaries(content)
+            for section_id, section in ids.items():
+                summary = parsed.get(section_id)
+                if summary:
+                    self.summary_cache.set(model, section, summary)
+                else:
+                    # Not cached, so a later update retries the summary
+                    summary = section.text[:300]
+                summaries[section.body_hash] = summary
+
+        return summaries
+
+    async def update_analysis(self, prior_analysis: str, diff: SectionDiff, model: str,
+                              previous_version: str, new_version: str) -> Optional[str]:
+        """
+        Update a prior version's analysis for the new version.
+
+        Returns None when too much of the bill changed for an update to be worthwhile,
+        in which case the caller should run a full analysis.
+        """
+        if not diff.has_changes:
+            logger.info("New bill version has no section changes, reusing prior analysis")
+            return prior_analysis
+
+        if diff.changed_fraction > self.max_changed_fraction:
+            logger.info(f"{diff.changed_fraction:.0%} of the bill changed, falling back to a full analysis")
+            return None
+
+        sections = [s for pair in diff.changed for s in pair] + diff.added + diff.removed
+        summaries = await self.summarize_sections(sections, model)
+
+        change_lines = []
+        for old, new in diff.changed:
+            change_lines.append(f"- CHANGED {self._label(new)}\n  Before: {summaries[old.body_hash]}\n  Now: {summaries[new.body_hash]}")
+        for section in diff.added:
+            change_lines.append(f"- ADDED {self._label(section)}: {summaries[section.body_hash]}")
+        for section in diff.removed:
+            change_lines.append(f"- REMOVED {self._label(section)}: {summaries[section.body_hash]}")
+
+        changes_text = "\n".join(change_lines)
+        update_prompt = f"""
+The analysis below was written for an earlier version of this bill ({previous_version}). The bill now has a new text version ({new_version}); {len(diff.unchanged)} sections are unchanged and the following sections changed:
+
+{changes_text}
+
+Update the analysis so it accurately describes the new version:
+- Keep the same sections and markdown structure, revising only what the changes affect.
+- Add a "## What Changed" section immediately after "## Executive Summary" that explains the differences between the versions and why they matter.
+- Return the complete updated analysis.
+
+EXISTING ANALYSIS:
+{prior_analysis}
+"""
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": "You are an expert legislative analyst updating an existing analysis for a revised version of a bill."},
+                {"role": "user", "content": update_prompt},
+            ],
+            "temperature": 0.3,
+        }
+
+        logger.debug(
+            f"AI call - incremental analysis update: model={model}, changed={len(diff.changed)}, "
+            f"added={len(diff.added)}, removed={len(diff.removed)}, unchanged={len(diff.unchanged)}, "
+            f"prompt={len(update_prompt)} chars"
+        )
+
+        return await self.complete_fn(payload, "analysis update")
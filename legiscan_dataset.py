@@ -0,0 +1,193 @@
+"""
+Offline ingestion of LegiScan bulk datasets into the local state-bill store.
+
+LegiScan publishes a zip archive of JSON files per legislative session (getDatasetList /
+getDataset), refreshed weekly. For configured states the importer downloads each session's
+archive once per `dataset_hash` and streams it into LegiScanStore: the base64 payload is
+decoded to disk in chunks, zip entries are parsed one at a time and bills are written in
+batched transactions, so memory stays flat however large the session is. Imported sessions
+are then served entirely from the store without live API queries.
+"""
+import asyncio
+import json
+import logging
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from legiscan_service import LegiScanService, decode_base64_field
+from legiscan_store import LegiScanStore
+
+logger = logging.getLogger(__name__)
+
+
+def extract_zip_payload(src: Path, dst: Path, chunk_size: int = 1 << 20) -> None:
+    """Decode the base64 `zip` field of a saved getDataset response into a zip file, chunk by chunk"""
+    with open(src, "rb") as f, open(dst, "wb") as out:
+        try:
+            decode_base64_field(f, out, "zip", chunk_size)
+        except ValueError as e:
+            raise ValueError(f"{e} in dataset response {src.name}") from None
+
+
+class LegiScanDatasetImporter:
+    """Keeps the sessions of configured states imported from LegiScan bulk datasets"""
+
+    def __init__(self, service: LegiScanService, store: LegiScanStore, states: Iterable[str],
+                 work_dir: Path, sessions_per_state: int = 2, interval: float = 7 * 86400,
+                 batch_size: int = 500):
+        """
+        Args:
+            service: LegiScan API service (for its key, HTTP session and record formats)
+            store: Store the datasets are imported into
+            states: States to import
+            work_dir: Scratch directory for downloaded archives (removed after import)
+            sessions_per_state: Most recent sessions imported per state
+            interval: Seconds between checks for new dataset hashes
+            batch_size: Bills written per transaction
+        """
+        self.service = service
+        self.store = store
+        self.states = [state.upper() for state in states]
+        self.work_dir = Path(work_dir)
+        self.sessions_per_state = sessions_per_state
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------
+
+    def import_archive(self, path: Path, dataset_hash: str = "", dataset_date: str = "") -> Dict[str, Any]:
+        """
+        Stream a dataset archive (a zip, or a saved getDataset JSON response) into the store.
+
+        Blocking; run it in a worker thread. Returns the session, state and number of bills imported.
+        """
+        path = Path(path)
+        with open(path, "rb") as f:
+            is_zip = f.read(2) == b"PK"
+        zip_path = path
+        if not is_zip:
+            zip_path = path.with_name(f"{path.name}.zip")
+            extract_zip_payload(path, zip_path)
+
+        state, session_id = None, None
+        seen: List[int] = []
+        records: List[Dict[str, Any]] = []
+        details: List[Dict[str, Any]] = []
+        try:
+            with zipfile.ZipFile(zip_path) as archive:
+                for info in archive.infolist():
+                    # Archives hold {STATE}/{session}/bill/*.json alongside people/ and vote/
+                    if info.is_dir() or "/bill/" not in info.filename or not info.filename.endswith(".json"):
+                        continue
+                    with archive.open(info) as entry:
+                        bill = json.load(entry).get("bill")
+                    if not bill or not bill.get("bill_id"):
+                        continue
+                    if session_id is None:
+                        state = bill.get("state", "").upper()
+                        session_id = int(bill.get("session_id") or bill.get("session", {}).get("session_id"))
+                    records.append(self.service.listing_from_bill(bill))
+                    details.append(self.service.detail_from_bill(bill))
+                    seen.append(int(bill["bill_id"]))
+                    if len(records) >= self.batch_size:
+                        self.store.upsert_bills(state, session_id, records, details)
+                        records, details = [], []
+        finally:
+            if zip_path != path:
+                zip_path.unlink(missing_ok=True)
+
+        if session_id is None:
+            raise ValueError(f"No bills found in dataset archive {path.name}")
+        if records:
+            self.store.upsert_bills(state, session_id, records, details)
+        removed = self.store.prune_session(session_id, seen)
+        self.store.record_dataset(state, session_id, dataset_hash, dataset_date, len(seen))
+        logger.info(f"Imported LegiScan dataset for {state} session {session_id}: {len(seen)} bills, {removed} removed")
+        return {"state": state, "sessionId": session_id, "bills": len(seen), "removed": removed}
+
+    # ------------------------------------------------------------------
+    # Download
+    # ------------------------------------------------------------------
+
+    async def list_datasets(self, state: str) -> List[Dict[str, Any]]:
+        """Available datasets of a state, most recent session first"""
+        url = self.service._build_url("getDatasetList", state=state)
+        async with self.service.session.get(url) as response:
+            if response.status != 200:
+                raise RuntimeError(f"LegiScan API error: {response.status}")
+            data = await response.json()
+        if data.get("status") != "OK":
+            raise RuntimeError(f"LegiScan API error: {data.get('alert', 'Unknown error')}")
+        return sorted(data.get("datasetlist", []), key=lambda d: d.get("year_end", 0), reverse=True)
+
+    async def download(self, dataset: Dict[str, Any]) -> Path:
+        """Save a getDataset response to the work directory without holding it in memory"""
+        url = self.service._build_url("getDataset", id=dataset["session_id"], access_key=dataset["access_key"])
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        path = self.work_dir / f"dataset_{dataset['session_id']}.json"
+        async with self.service.session.get(url) as response:
+            if response.status != 200:
+                raise RuntimeError(f"LegiScan API error: {response.status}")
+            with open(path, "wb") as f:
+                async for chunk in response.content.iter_chunked(1 << 20):
+                    f.write(chunk)
+        return path
+
+    async def import_state(self, state: str) -> List[Dict[str, Any]]:
+        """Import the recent sessions of a state whose dataset hash changed since the last import"""
+        imported = []
+        for dataset in (await self.list_datasets(state))[:self.sessions_per_state]:
+            session_id = dataset["session_id"]
+            if await asyncio.to_thread(self.store.dataset_hash, session_id) == dataset.get("dataset_hash"):
+                continue
+            path = await self.download(dataset)
+            try:
+                imported.append(await asyncio.to_thread(
+                    self.import_archive, path, dataset.get("dataset_hash", ""), dataset.get("dataset_date", "")
+                ))
+            finally:
+                path.unlink(missing_ok=True)
+        return imported
+
+    async def run_once(self) -> Dict[str, Any]:
+        started = datetime.utcnow()
+        results: Dict[str, Any] = {}
+        for state in self.states:
+            try:
+                results[state] = await self.import_state(state)
+            except Exception as e:
+                logger.warning(f"LegiScan dataset import failed for {state}: {e}")
+                results[state] = f"failed: {e}"
+        self.last_run = {
+            "started": started.isoformat(),
+            "finished": datetime.utcnow().isoformat(),
+            "results": results,
+        }
+        logger.info(f"LegiScan dataset import finished: {self.last_run}")
+        return self.last_run
+
+    async def _loop(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if not self.service.api_key or not self.states:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
@@ -1,19 +1,129 @@
 """
 LegiScan API Service for state bill retrieval and analysis
 """
+import asyncio
+import io
+import json
 import logging
+import re
+import time
 import aiohttp
 import base64
-from typing import List, Dict, Any, Optional
-from cachetools import TTLCache
+from functools import lru_cache
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple
+from cachetools import LRUCache, TTLCache
+
+import extraction_pool
+
+from bill_text import normalize_bill_text
+from http_cache import HTTPCache
+from legiscan_store import LegiScanStore
+from master_list import MasterListColumns
+from swr_cache import StaleWhileRevalidateCache
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=None)
+def _field_patterns(field: str) -> Tuple["re.Pattern[bytes]", "re.Pattern[bytes]"]:
+    """Regexes for `"field": "` and for a prefix of it left at the end of a chunk"""
+    marker = re.compile(rb'"' + re.escape(field).encode() + rb'"\s*:\s*"')
+    tail = rb'"\s*(?::\s*)?'
+    for ch in reversed(field):
+        tail = re.escape(ch).encode() + rb"(?:" + tail + rb")?"
+    return marker, re.compile(rb'"(?:' + tail + rb")?\Z")
+
+
+def decode_base64_field(src: BinaryIO, dst: BinaryIO, field: str, chunk_size: int = 1 << 20) -> bytes:
+    """
+    Decode the base64 string value of `field` in a JSON response into `dst`, chunk by chunk.
+
+    LegiScan returns documents and dataset archives base64-encoded inside the JSON, so
+    parsing the whole response would hold the encoded text as well as the decoded bytes.
+    Returns the rest of the response with the field's value emptied, small enough to parse.
+    Raises ValueError when the field is missing or its value is cut off.
+    """
+    marker_pattern, partial_pattern = _field_patterns(field)
+    head: List[bytes] = []
+    buffer = b""
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            raise ValueError(f"No base64 {field!r} field")
+        buffer += chunk
+        marker = marker_pattern.search(buffer)
+        if marker:
+            head.append(buffer[:marker.end()])
+            buffer = buffer[marker.end():]
+            break
+        partial = partial_pattern.search(buffer)
+        keep = partial.start() if partial else len(buffer)
+        head.append(buffer[:keep])
+        buffer = buffer[keep:]
+
+    pending = b""
+    while True:
+        end = buffer.find(b'"')
+        # JSON may escape "/" as "\/"; base64 never contains a backslash
+        pending += (buffer if end < 0 else buffer[:end]).replace(b"\\", b"")
+        usable = len(pending) - len(pending) % 4
+        dst.write(base64.b64decode(pending[:usable]))
+        pending = pending[usable:]
+        if end >= 0:
+            break
+        buffer = src.read(chunk_size)
+        if not buffer:
+            raise ValueError(f"Truncated base64 {field!r} field")
+    if pending:
+        dst.write(base64.b64decode(pending + b"=" * (-len(pending) % 4)))
+    return b"".join(head) + buffer[end:] + src.read()
+
+
+def extract_document_text(raw: bytes) -> Tuple[Optional[str], str]:
+    """
+    (text, note) from a raw getBillText response; text is None when extraction failed and the
+    note says why. Runs in the extraction pool, so it must stay a picklable module-level function.
+    """
+    doc = io.BytesIO()
+    try:
+        data = json.loads(decode_base64_field(io.BytesIO(raw), doc, "doc"))
+    except ValueError:
+        data = json.loads(raw)  # No document, e.g. an error response
+    if data.get("status") != "OK":
+        return None, f"LegiScan API error: {data.get('alert', 'Unknown error')}"
+    mime_type = data.get("text", {}).get("mime", "")
+    doc_bytes = doc.getvalue()
+    del doc
+    if not doc_bytes:
+        return None, "no document data"
+
+    # Handle PDF documents
+    if mime_type == "application/pdf" or doc_bytes.startswith(b'%PDF'):
+        try:
+            text = extraction_pool.pdf_to_text(doc_bytes)
+        except Exception as pdf_error:
+            return None, f"failed to parse PDF: {pdf_error}"
+        return (text, "pdf") if text else (None, "no text extracted from PDF")
+
+    # Handle HTML/text documents
+    try:
+        doc_text = doc_bytes.decode('utf-8')
+    except UnicodeDecodeError:
+        return None, "document is not UTF-8"
+    # Strip HTML tags and entities for cleaner text
+    return normalize_bill_text(doc_text, profile="legiscan"), mime_type or "text"
+
+
 class LegiScanService:
     """Service for interacting with LegiScan API for state bills"""
 
     BASE_URL = "https://api.legiscan.com/"
 
+    # Numeric progress codes used by getMasterListRaw
+    STATUS_NAMES = {
+        1: "Introduced", 2: "Engrossed", 3: "Enrolled", 4: "Passed", 5: "Vetoed", 6: "Failed",
+    }
+
     # US States mapping
     STATES = {
         'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas',
@@ -31,14 +141,31 @@ class LegiScanService:
         'WI': 'Wisconsin', 'WY': 'Wyoming'
     }
 
-    def __init__(self, api_key: str, session: aiohttp.ClientSession):
-        """Initialize LegiScan service"""
+    def __init__(self, api_key: str, session: aiohttp.ClientSession, http_cache: Optional[HTTPCache] = None,
+                 store: Optional[LegiScanStore] = None, sync_max_age: float = 3600):
+        """
+        Initialize LegiScan service.
+
+        With a store, master lists are synced by change_hash and listings, bill details and
+        searches are served locally; sessions older than sync_max_age are re-synced on request.
+        Without one, getBill responses are revalidated through http_cache when given.
+        """
         self.api_key = api_key
         self.session = session
+        self.http_cache = http_cache
+        self.store = store
+        self.sync_max_age = sync_max_age
+        self._sync_locks: Dict[int, asyncio.Lock] = {}
+        self._indexed_session_lists: Dict[str, List[Dict[str, Any]]] = {}
 
         # Cache for API responses (30 minute TTL to conserve monthly query limit)
-        self.session_cache = TTLCache(maxsize=100, ttl=1800)  # 30 minutes
+        # Session lists rarely change: refreshed in the background after 30 minutes, served stale for a week
+        self.session_cache = StaleWhileRevalidateCache(refresh_after=1800, max_stale=7 * 86400, maxsize=100)
         self.bill_cache = TTLCache(maxsize=500, ttl=1800)
+        # Full master lists in columnar form, keyed by session (and store generation)
+        self.listing_cache = TTLCache(maxsize=50, ttl=1800)
+        # Extracted document texts by doc_id (used when there is no store)
+        self.text_cache = LRUCache(maxsize=64)
         self.search_cache = TTLCache(maxsize=200, ttl=1800)
 
     def _build_url(self, operation: str, **params) -> str:
@@ -52,47 +179,127 @@ class LegiScanService:
     async def get_session_list(self, state: str) -> List[Dict[str, Any]]:
         """Get list of legislative sessions for a state"""
         cache_key = f"sessions_{state}"
-        if cache_key in self.session_cache:
-            return self.session_cache[cache_key]
-
         try:
-            url = self._build_url("getSessionList", state=state.upper())
+            return await self.session_cache.get(cache_key, lambda: self._fetch_session_list(state))
+        except Exception as e:
+            logger.error(f"Error fetching sessions for {state}: {e}")
+            return []
+
+    async def _fetch_session_list(self, state: str) -> List[Dict[str, Any]]:
+        """Fetch sessions from LegiScan, raising on errors so a cached list keeps being served"""
+        url = self._build_url("getSessionList", state=state.upper())
+
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                raise RuntimeError(f"LegiScan API error: {response.status}")
+
+            data = await response.json()
+
+            if data.get("status") != "OK":
+                raise RuntimeError(f"LegiScan API error: {data.get('alert', 'Unknown error')}")
+            return data.get("sessions", [])
 
+    async def current_session_id(self, state: str) -> Optional[int]:
+        """Most recent legislative session of a state"""
+        sessions = await self.get_session_list(state)
+        if not sessions:
+            return None
+        return max(sessions, key=lambda x: x.get('year_end', 0)).get('session_id')
+
+    async def sync_session(self, state: str, session_id: int) -> Dict[str, int]:
+        """
+        Sync one session's master list into the store with a single getMasterListRaw query.
+
+        Rows are compared by change_hash, so only new and changed bills are rewritten (and
+        stored details of changed bills become stale). Concurrent calls share one request.
+        """
+        lock = self._sync_locks.setdefault(session_id, asyncio.Lock())
+        synced_at = await asyncio.to_thread(self.store.session_synced_at, session_id)
+        async with lock:
+            if await asyncio.to_thread(self.store.session_synced_at, session_id) != synced_at:
+                return {}  # Another request synced it while we waited
+
+            url = self._build_url("getMasterListRaw", id=session_id)
             async with self.session.get(url) as response:
                 if response.status != 200:
-                    logger.error(f"LegiScan API error: {response.status}")
-                    return []
-
+                    raise RuntimeError(f"LegiScan API error: {response.status}")
                 data = await response.json()
+            if data.get("status") != "OK":
+                raise RuntimeError(f"LegiScan API error: {data.get('alert', 'Unknown error')}")
 
-                if data.get("status") == "OK":
-                    sessions = data.get("sessions", [])
-                    self.session_cache[cache_key] = sessions
-                    return sessions
-                else:
-                    logger.error(f"LegiScan API error: {data.get('alert', 'Unknown error')}")
-                    return []
+            records = [self._raw_master_record(row) for key, row in data.get("masterlist", {}).items()
+                       if key != "session" and isinstance(row, dict)]
+            result = await asyncio.to_thread(self.store.apply_master_list, state.upper(), session_id, records)
+            logger.info(f"Synced LegiScan session {session_id} ({state}): {result}")
+            return result
 
+    @classmethod
+    def _raw_master_record(cls, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Listing record (the get_master_list format) from a getMasterListRaw row"""
+        return {
+            "id": row.get("bill_id"),
+            "number": row.get("number", ""),
+            "title": row.get("title", "Untitled Bill"),
+            "description": row.get("description", ""),
+            "status": cls.STATUS_NAMES.get(row.get("status"), ""),
+            "lastAction": row.get("last_action", ""),
+            "lastActionDate": row.get("last_action_date", ""),
+            "url": row.get("url", ""),
+            "stateLink": "",  # Not in the raw master list
+            "sponsor": "",  # Sponsors not available in master list
+            "changeHash": row.get("change_hash", "")
+        }
+
+    async def _ensure_synced(self, state: str, session_id: int) -> bool:
+        """Sync a session that was never synced or is older than sync_max_age; True if the store can serve it"""
+        if await asyncio.to_thread(self.store.dataset_hash, session_id) is not None:
+            return True  # Imported from a bulk dataset, refreshed by the dataset importer
+        synced_at = await asyncio.to_thread(self.store.session_synced_at, session_id)
+        if synced_at is not None and time.time() - synced_at < self.sync_max_age:
+            return True
+        try:
+            await self.sync_session(state, session_id)
+            return True
         except Exception as e:
-            logger.error(f"Error fetching sessions for {state}: {e}")
-            return []
+            # A previously synced copy is still better than nothing
+            logger.error(f"Error syncing LegiScan session {session_id} for {state}: {e}")
+            return synced_at is not None
 
     async def get_master_list(self, state: str, session_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get master list of bills for a state session"""
+        """Get master list of bills for a state session (the first page of the diversified view)"""
+        columns = await self.get_master_columns(state, session_id)
+        if columns is None:
+            return []
+        bills, _ = columns.page(0, 20, sort="diversified")
+        return bills
+
+    async def get_master_columns(self, state: str, session_id: Optional[int] = None) -> Optional[MasterListColumns]:
+        """Full master list of a session (the current one by default) in columnar form"""
         # Get current session if not provided
         if not session_id:
-            sessions = await self.get_session_list(state)
-            if not sessions:
-                return []
-            # Get most recent session
-            session_id = max(sessions, key=lambda x: x.get('year_end', 0)).get('session_id')
+            session_id = await self.current_session_id(state)
             if not session_id:
-                return []
-
-        cache_key = f"master_list_{state}_{session_id}"
-        if cache_key in self.bill_cache:
-            return self.bill_cache[cache_key]
+                return None
+
+        if self.store is not None and await self._ensure_synced(state, session_id):
+            # Rebuilt only after the store changed
+            cache_key = (session_id, self.store.generation)
+            if cache_key not in self.listing_cache:
+                bills = await asyncio.to_thread(self.store.list_session, session_id)
+                self.listing_cache[cache_key] = await asyncio.to_thread(MasterListColumns, bills)
+            return self.listing_cache[cache_key]
+
+        cache_key = (session_id,)
+        if cache_key in self.listing_cache:
+            return self.listing_cache[cache_key]
+        bills = await self._fetch_master_list(state, session_id)
+        if bills is None:
+            return None
+        self.listing_cache[cache_key] = await asyncio.to_thread(MasterListColumns, bills)
+        return self.listing_cache[cache_key]
 
+    async def _fetch_master_list(self, state: str, session_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Every bill of a session from getMasterList, or None on errors"""
         try:
             # Use getMasterList instead of Raw for better data
             url = self._build_url("getMasterList", id=session_id)
@@ -100,7 +307,7 @@ class LegiScanService:
             async with self.session.get(url) as response:
                 if response.status != 200:
                     logger.error(f"LegiScan API error: {response.status}")
-                    return []
+                    return None
 
                 data = await response.json()
 
@@ -126,54 +333,26 @@ class LegiScanService:
                             "sponsor": "",  # Sponsors not available in master list
                             "changeHash": bill_data.get("change_hash", "")
                         })
-
-                    # Sort by last action date (most recent first)
-                    bills.sort(key=lambda x: x.get("lastActionDate", ""), reverse=True)
-
-                    # Diversify by bill type - get top bills from each type
-                    # This ensures we show a mix of SB, AB, HR, etc. instead of just one type
-                    bill_types = {}
-                    for bill in bills:
-                        # Extract bill type prefix (e.g., "SB" from "SB 123")
-                        import re
-                        match = re.match(r'^([A-Z]+)', bill.get("number", ""))
-                        if match:
-                            bill_type = match.group(1)
-                            if bill_type not in bill_types:
-                                bill_types[bill_type] = []
-                            bill_types[bill_type].append(bill)
-
-                    # Take top bills from each type (round-robin selection)
-                    diversified_bills = []
-                    max_per_type = 10  # Max bills per type to show
-
-                    # Get bills round-robin from each type
-                    type_lists = list(bill_types.values())
-                    if type_lists:
-                        max_length = max(len(lst) for lst in type_lists)
-                        for i in range(max_length):
-                            for type_list in type_lists:
-                                if i < len(type_list) and i < max_per_type:
-                                    diversified_bills.append(type_list[i])
-                    else:
-                        # Fallback if no types found
-                        diversified_bills = bills
-
-                    # Limit to 20 bills total
-                    diversified_bills = diversified_bills[:20]
-
-                    self.bill_cache[cache_key] = diversified_bills
-                    return diversified_bills
+                    return bills
                 else:
                     logger.error(f"LegiScan API error: {data.get('alert', 'Unknown error')}")
-                    return []
+                    return None
 
         except Exception as e:
             logger.error(f"Error fetching master list for {state} session {session_id}: {e}")
-            return []
+            return None
 
     async def search_bills(self, state: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search for bills in a state"""
+        if self.store is not None:
+            # Answer from the synced current session (and any other synced ones); fall back to
+            # getSearchRaw only for bills the store doesn't know, e.g. from archived sessions
+            session_id = await self.current_session_id(state)
+            if session_id and await self._ensure_synced(state, session_id):
+                bills = await asyncio.to_thread(self.store.search, state.upper(), query, limit)
+                if bills:
+                    return bills
+
         cache_key = f"search_{state}_{query}_{limit}"
         if cache_key in self.search_cache:
             return self.search_cache[cache_key]
@@ -220,61 +399,173 @@ class LegiScanService:
             logger.error(f"Error searching bills in {state} for '{query}': {e}")
             return []
 
+    async def find_bill_by_number(self, state: str, bill_number: str,
+                                  year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Listing record for a bill number in the session covering `year` (the current session,
+        then any synced one, when no year is given).
+
+        With a store this is one indexed lookup: the session comes from the stored year ranges
+        and its full master list is synced at most once per sync_max_age.
+        """
+        state = state.upper()
+        if self.store is None:
+            return await self._scan_for_bill_number(state, bill_number, year)
+
+        sessions = await self.get_session_list(state)
+        if sessions and self._indexed_session_lists.get(state) is not sessions:
+            # The session list object only changes when its cache entry is refreshed
+            await asyncio.to_thread(self.store.save_sessions, state, sessions)
+            self._indexed_session_lists[state] = sessions
+
+        if year:
+            session_id = await asyncio.to_thread(self.store.session_for_year, state, int(year))
+        else:
+            session_id = max(sessions, key=lambda x: x.get('year_end', 0)).get('session_id') if sessions else None
+
+        if session_id and await self._ensure_synced(state, session_id):
+            matches = await asyncio.to_thread(self.store.find_number, state, bill_number, session_id)
+            if matches:
+                return matches[0]
+        if not year:
+            matches = await asyncio.to_thread(self.store.find_number, state, bill_number)
+            if matches:
+                return matches[0]
+        return None
+
+    async def _scan_for_bill_number(self, state: str, bill_number: str,
+                                    year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Find a bill number without a store: search results, then master lists"""
+        def match(bills: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            for bill in bills:
+                if bill.get("number", "").upper() == bill_number.upper():
+                    return bill
+            return None
+
+        # LegiScan API doesn't support direct bill lookup by number, so we search
+        matching_bill = match(await self.search_bills(state, bill_number, limit=50))
+        if not matching_bill:
+            # If no exact match in search, try getting from current session
+            logger.info(f"No match in search results, trying master list for current session")
+            matching_bill = match(await self.get_master_list(state, None))
+
+        # If still not found and we have a year, try to find the session for that year
+        if not matching_bill and year:
+            logger.info(f"Trying to find session for year {year}")
+            for session in await self.get_session_list(state):
+                year_start = session.get("year_start")
+                year_end = session.get("year_end")
+                if year_start and year_end and year_start <= int(year) <= year_end:
+                    logger.info(f"Found session {session.get('session_id')} for year {year}")
+                    matching_bill = match(await self.get_master_list(state, session.get("session_id")))
+                    if matching_bill:
+                        break
+        return matching_bill
+
     async def get_bill(self, bill_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific bill"""
-        cache_key = f"bill_{bill_id}"
-        if cache_key in self.bill_cache:
-            return self.bill_cache[cache_key]
+        if self.store is not None:
+            # The stored detail is current until the synced master list shows a new change_hash
+            bill = await asyncio.to_thread(self.store.get_detail, bill_id, 1800)
+            if bill is not None:
+                return bill
+        else:
+            cache_key = f"bill_{bill_id}"
+            if cache_key in self.bill_cache:
+                return self.bill_cache[cache_key]
 
         try:
             url = self._build_url("getBill", id=bill_id)
 
-            async with self.session.get(url) as response:
+            # The store already keys details by change_hash; a TTL cache in front would hide changes
+            if self.http_cache is not None and self.store is None:
+                response = await self.http_cache.request(self.session, url)
                 if response.status != 200:
                     logger.error(f"LegiScan API error: {response.status}")
                     return None
+                data = response.json()
+                if data.get("status") != "OK":
+                    # LegiScan reports errors in a 200 body; don't keep serving them from disk
+                    self.http_cache.invalidate(url)
+            else:
+                async with self.session.get(url) as response:
+                    if response.status != 200:
+                        logger.error(f"LegiScan API error: {response.status}")
+                        return None
+                    data = await response.json()
 
-                data = await response.json()
-
-                if data.get("status") == "OK":
-                    bill = data.get("bill", {})
-
-                    # Extract sponsors
-                    sponsors = bill.get("sponsors", [])
-                    sponsor_name = "Unknown Sponsor"
-                    if sponsors:
-                        sponsor = sponsors[0]
-                        name = sponsor.get("name", "")
-                        if name:
-                            sponsor_name = name
-
-                    bill_info = {
-                        "id": bill.get("bill_id"),
-                        "number": bill.get("bill_number", ""),
-                        "title": bill.get("title", "Untitled Bill"),
-                        "description": bill.get("description", ""),
-                        "status": bill.get("status_desc", ""),
-                        "lastAction": bill.get("last_action", ""),
-                        "lastActionDate": bill.get("last_action_date", ""),
-                        "sponsor": sponsor_name,
-                        "url": bill.get("url", ""),
-                        "stateLink": bill.get("state_link", ""),
-                        "texts": bill.get("texts", []),
-                        "changeHash": bill.get("change_hash", "")
-                    }
+            if data.get("status") == "OK":
+                bill_info = self.detail_from_bill(data.get("bill", {}))
 
-                    self.bill_cache[cache_key] = bill_info
-                    return bill_info
+                if self.store is not None:
+                    await asyncio.to_thread(self.store.save_detail, bill_info)
                 else:
-                    logger.error(f"LegiScan API error: {data.get('alert', 'Unknown error')}")
-                    return None
+                    self.bill_cache[cache_key] = bill_info
+                return bill_info
+            else:
+                logger.error(f"LegiScan API error: {data.get('alert', 'Unknown error')}")
+                return None
 
         except Exception as e:
             logger.error(f"Error fetching bill {bill_id}: {e}")
             return None
 
+    @staticmethod
+    def detail_from_bill(bill: Dict[str, Any]) -> Dict[str, Any]:
+        """Bill detail record (the get_bill format) from a getBill / dataset bill object"""
+        # Extract sponsors
+        sponsors = bill.get("sponsors", [])
+        sponsor_name = "Unknown Sponsor"
+        if sponsors:
+            sponsor = sponsors[0]
+            name = sponsor.get("name", "")
+            if name:
+                sponsor_name = name
+
+        return {
+            "id": bill.get("bill_id"),
+            "number": bill.get("bill_number", ""),
+            "title": bill.get("title", "Untitled Bill"),
+            "description": bill.get("description", ""),
+            "status": bill.get("status_desc", ""),
+            "lastAction": bill.get("last_action", ""),
+            "lastActionDate": bill.get("last_action_date", ""),
+            "sponsor": sponsor_name,
+            "url": bill.get("url", ""),
+            "stateLink": bill.get("state_link", ""),
+            "texts": bill.get("texts", []),
+            "changeHash": bill.get("change_hash", "")
+        }
+
+    @classmethod
+    def listing_from_bill(cls, bill: Dict[str, Any]) -> Dict[str, Any]:
+        """Listing record (the get_master_list format) from a full getBill / dataset bill object"""
+        # Full bill objects carry the action history instead of last_action fields
+        history = bill.get("history") or [{}]
+        return {
+            "id": bill.get("bill_id"),
+            "number": bill.get("bill_number", ""),
+            "title": bill.get("title", "Untitled Bill"),
+            "description": bill.get("description", ""),
+            "status": bill.get("status_desc") or cls.STATUS_NAMES.get(bill.get("status"), ""),
+            "lastAction": bill.get("last_action") or history[-1].get("action", ""),
+            "lastActionDate": bill.get("last_action_date") or history[-1].get("date", ""),
+            "url": bill.get("url", ""),
+            "stateLink": bill.get("state_link", ""),
+            "sponsor": "",  # Sponsors not available in master list
+            "changeHash": bill.get("change_hash", "")
+        }
+
     async def get_bill_text(self, doc_id: int) -> Optional[str]:
         """Get bill text (Base64 decoded) - handles HTML, PDF, and plain text"""
+        # A doc_id always refers to the same document version, so its text never goes stale
+        if self.store is not None:
+            text = await asyncio.to_thread(self.store.get_doc_text, doc_id)
+            if text is not None:
+                return text
+        elif doc_id in self.text_cache:
+            return self.text_cache[doc_id]
+
         try:
             url = self._build_url("getBillText", id=doc_id)
 
@@ -282,69 +573,20 @@ class LegiScanService:
                 if response.status != 200:
                     logger.error(f"LegiScan API error: {response.status}")
                     return None
-
-                data = await response.json()
-
-                if data.get("status") == "OK":
-                    text_data = data.get("text", {})
-                    mime_type = text_data.get("mime", "")
-                    doc_base64 = text_data.get("doc", "")
-
-                    if not doc_base64:
-                        logger.error(f"No document data for doc_id {doc_id}")
-                        return None
-
-                    # Decode from Base64
-                    doc_bytes = base64.b64decode(doc_base64)
-
-                    # Handle PDF documents
-                    if mime_type == "application/pdf" or doc_bytes.startswith(b'%PDF'):
-                        logger.info(f"Processing PDF document for doc_id {doc_id}")
-                        try:
-                            import io
-                            import pdfplumber
-
-                            with pdfplumber.open(io.BytesIO(doc_bytes)) as pdf:
-                                text_parts = []
-                                for page in pdf.pages:
-                                    page_text = page.extract_text()
-                                    if page_text:
-                                        text_parts.append(page_text)
-
-                                if text_parts:
-                                    full_text = '\n\n'.join(text_parts)
-                                    logger.info(f"Successfully extracted {len(full_text)} chars from PDF")
-                                    return full_text.strip()
-                                else:
-                                    logger.error(f"No text extracted from PDF for doc_id {doc_id}")
-                                    return None
-                        except Exception as pdf_error:
-                            logger.error(f"Failed to parse PDF for doc_id {doc_id}: {pdf_error}")
-                            return None
-
-                    # Handle HTML/text documents
-                    try:
-                        doc_text = doc_bytes.decode('utf-8')
-
-                        # Strip HTML tags for cleaner text
-                        import re
-                        clean_text = re.sub(r'<[^>]+>', '', doc_text)
-                        clean_text = re.sub(r'&lt;', '<', clean_text)
-                        clean_text = re.sub(r'&gt;', '>', clean_text)
-                        clean_text = re.sub(r'&amp;', '&', clean_text)
-                        clean_text = re.sub(r'&quot;', '"', clean_text)
-                        clean_text = re.sub(r'&apos;', "'", clean_text)
-                        clean_text = re.sub(r'\s+', ' ', clean_text)
-                        clean_text = re.sub(r'\n\s*\n+', '\n\n', clean_text)
-
-                        return clean_text.strip()
-                    except UnicodeDecodeError:
-                        logger.error(f"Failed to decode bill text for doc_id {doc_id} as UTF-8")
-                        return None
-
-                else:
-                    logger.error(f"LegiScan API error: {data.get('alert', 'Unknown error')}")
-                    return None
+                raw = await response.read()
+
+            # Decoding and PDF parsing happen in the shared extraction pool, off the event loop
+            text, problem = await extraction_pool.run(extract_document_text, raw)
+            if text is None:
+                logger.error(f"Could not extract bill text for doc_id {doc_id}: {problem}")
+                return None
+            logger.info(f"Extracted {len(text)} chars for doc_id {doc_id} ({problem})")
+
+            if self.store is not None:
+                await asyncio.to_thread(self.store.save_doc_text, doc_id, text)
+            else:
+                self.text_cache[doc_id] = text
+            return text
 
         except Exception as e:
             logger.error(f"Error fetching bill text for doc {doc_id}: {e}")
@@ -0,0 +1,429 @@
+"""
+Local store of LegiScan master lists and bill details.
+
+LegiScan gives every bill a `change_hash` that changes whenever anything about the bill does.
+Session master lists (from the cheap `getMasterListRaw`) are diffed against the stored hashes
+so only new or changed rows are rewritten, and a stored bill detail is reused until a master
+list synced after it no longer matches its hash. Listings, bill lookups and searches are then answered from
+SQLite, and quota use follows legislative activity instead of request traffic. Sessions
+imported from a bulk dataset (see legiscan_dataset.py) are served without any live queries.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from bill_index import BillIndex
+
+if TYPE_CHECKING:
+    from legiscan_service import LegiScanService
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bills (
+    bill_id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    number TEXT NOT NULL,
+    change_hash TEXT NOT NULL,
+    last_action_date TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bills_session ON bills (session_id, last_action_date);
+CREATE INDEX IF NOT EXISTS bills_number ON bills (state, number, session_id);
+CREATE TABLE IF NOT EXISTS bill_details (
+    bill_id INTEGER PRIMARY KEY,
+    change_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+-- rowid is the LegiScan bill_id
+CREATE VIRTUAL TABLE IF NOT EXISTS bills_fts USING fts5 (
+    title, description, number,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS state_sessions (
+    session_id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    year_start INTEGER NOT NULL,
+    year_end INTEGER NOT NULL,
+    special INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS state_sessions_years ON state_sessions (state, year_start, year_end);
+CREATE TABLE IF NOT EXISTS doc_texts (
+    doc_id INTEGER PRIMARY KEY,
+    text BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    session_id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    dataset_hash TEXT NOT NULL,
+    dataset_date TEXT,
+    bills INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+# BM25 column weights: title, description, number
+BM25_WEIGHTS = (10.0, 3.0, 6.0)
+
+
+def normalize_number(number: str) -> str:
+    """Uppercase bill number without punctuation or spaces (A.B. 123 -> AB123)"""
+    return "".join(ch for ch in number.upper() if ch.isalnum())
+
+
+class LegiScanStore:
+    """SQLite store of master list rows (listing records) and bill details, keyed by change_hash"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.generation = 0  # Bumped whenever listings change so readers can invalidate derived data
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0],
+                "bills": self._conn.execute("SELECT COUNT(*) FROM bills").fetchone()[0],
+                "details": self._conn.execute("SELECT COUNT(*) FROM bill_details").fetchone()[0],
+                "documents": self._conn.execute("SELECT COUNT(*) FROM doc_texts").fetchone()[0],
+            }
+
+    # ------------------------------------------------------------------
+    # Master lists
+    # ------------------------------------------------------------------
+
+    def apply_master_list(self, state: str, session_id: int, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Replace a session's master list with `records` (listing dicts carrying "changeHash").
+
+        Only rows whose change_hash differs are rewritten; bills no longer listed are dropped.
+        Returns counts of added, changed, removed and unchanged bills.
+        """
+        records = {int(record["id"]): record for record in records if record.get("id")}
+        with self._lock, self._conn:
+            known = dict(self._conn.execute(
+                "SELECT bill_id, change_hash FROM bills WHERE session_id = ?", (session_id,)
+            ).fetchall())
+            changed = [record for bill_id, record in records.items() if known.get(bill_id) != record.get("changeHash", "")]
+            removed = [bill_id for bill_id in known if bill_id not in records]
+
+            self._delete_rows(removed)
+            self._write_rows(state, session_id, changed)
+            if changed or removed:
+                self.generation += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, state, synced_at) VALUES (?, ?, ?)",
+                (session_id, state, time.time()),
+            )
+        added = sum(1 for record in changed if int(record["id"]) not in known)
+        return {"added": added, "changed": len(changed) - added, "removed": len(removed),
+                "unchanged": len(records) - len(changed)}
+
+    def upsert_bills(self, state: str, session_id: int, records: List[Dict[str, Any]],
+                     details: List[Dict[str, Any]]) -> None:
+        """Write a batch of listing records and their bill details in one transaction (bulk import)"""
+        with self._lock, self._conn:
+            self._write_rows(state, session_id, records)
+            self._write_details(details)
+            self.generation += 1
+
+    def prune_session(self, session_id: int, keep_ids: Iterable[int]) -> int:
+        """Drop bills (and their details) of a session not in `keep_ids`; returns the number removed"""
+        keep_ids = set(keep_ids)
+        with self._lock, self._conn:
+            known = [row[0] for row in self._conn.execute("SELECT bill_id FROM bills WHERE session_id = ?", (session_id,))]
+            removed = [bill_id for bill_id in known if bill_id not in keep_ids]
+            self._delete_rows(removed)
+            self._conn.executemany("DELETE FROM bill_details WHERE bill_id = ?", [(bill_id,) for bill_id in removed])
+            if removed:
+                self.generation += 1
+        return len(removed)
+
+    def _delete_rows(self, bill_ids: List[int]) -> None:
+        rows = [(bill_id,) for bill_id in bill_ids]
+        self._conn.executemany("DELETE FROM bills_fts WHERE rowid = ?", rows)
+        self._conn.executemany("DELETE FROM bills WHERE bill_id = ?", rows)
+
+    def _write_rows(self, state: str, session_id: int, records: List[Dict[str, Any]]) -> None:
+        self._conn.executemany("DELETE FROM bills_fts WHERE rowid = ?", [(int(record["id"]),) for record in records])
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO bills (bill_id, session_id, state, number, change_hash, last_action_date, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(int(record["id"]), session_id, state, normalize_number(record.get("number", "")),
+              record.get("changeHash", ""), record.get("lastActionDate", ""), json.dumps(record))
+             for record in records],
+        )
+        self._conn.executemany(
+            "INSERT INTO bills_fts (rowid, title, description, number) VALUES (?, ?, ?, ?)",
+            [self._fts_row(record) for record in records],
+        )
+
+    @staticmethod
+    def _fts_row(record: Dict[str, Any]) -> Tuple[int, str, str, str]:
+        number = record.get("number", "")
+        return (int(record["id"]), record.get("title", ""), record.get("description", ""),
+                f"{number} {normalize_number(number)}")
+
+    def session_synced_at(self, session_id: int) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT synced_at FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def synced_sessions(self) -> List[Tuple[str, int]]:
+        """(state, session_id) of every session synced so far"""
+        with self._lock:
+            return self._conn.execute("SELECT state, session_id FROM sessions ORDER BY state").fetchall()
+
+    def list_session(self, session_id: int) -> List[Dict[str, Any]]:
+        """Listing records of a session, most recent action first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM bills WHERE session_id = ? ORDER BY last_action_date DESC", (session_id,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def search(self, state: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Listing records of a state matching `query`, best BM25 match first"""
+        # The whole phrase or any of its words; BM25 ranks rows matching more of them first
+        match_query = BillIndex.build_match_query([query] + query.split())
+        if not match_query:
+            return []
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT b.data, bm25(bills_fts, {weights}) AS score "
+                f"FROM bills_fts JOIN bills b ON b.bill_id = bills_fts.rowid "
+                f"WHERE bills_fts MATCH ? AND b.state = ? ORDER BY score, b.last_action_date DESC LIMIT ?",
+                (match_query, state, limit),
+            ).fetchall()
+        results = []
+        for data, score in rows:
+            record = json.loads(data)
+            record["relevance"] = round(-score, 4)
+            results.append(record)
+        return results
+
+    def find_number(self, state: str, number: str, session_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Listing records of a state with this bill number (in one session if given), newest session first"""
+        query = "SELECT data FROM bills WHERE state = ? AND number = ?"
+        params: Tuple[Any, ...] = (state, normalize_number(number))
+        if session_id is not None:
+            query += " AND session_id = ?"
+            params += (session_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY session_id DESC", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    # ------------------------------------------------------------------
+    # Document texts
+    # ------------------------------------------------------------------
+
+    def get_doc_text(self, doc_id: int) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM doc_texts WHERE doc_id = ?", (doc_id,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def save_doc_text(self, doc_id: int, text: str) -> None:
+        """Store extracted text (zlib-compressed) of an immutable LegiScan document"""
+        data = zlib.compress(text.encode("utf-8"), 6)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO doc_texts (doc_id, text, fetched_at) VALUES (?, ?, ?)",
+                (doc_id, data, time.time()),
+            )
+
+    # ------------------------------------------------------------------
+    # Session years
+    # ------------------------------------------------------------------
+
+    def save_sessions(self, state: str, sessions: List[Dict[str, Any]]) -> None:
+        """Record the year range of a state's sessions (from getSessionList) for year lookups"""
+        rows = [(s["session_id"], state, int(s.get("year_start") or 0), int(s.get("year_end") or 0), int(s.get("special") or 0))
+                for s in sessions if s.get("session_id")]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM state_sessions WHERE state = ?", (state,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO state_sessions (session_id, state, year_start, year_end, special) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def session_for_year(self, state: str, year: int) -> Optional[int]:
+        """Session of a state covering `year`, preferring the regular session over special ones"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_id FROM state_sessions WHERE state = ? AND year_start <= ? AND year_end >= ? "
+                "ORDER BY special, year_end DESC LIMIT 1",
+                (state, year, year),
+            ).fetchone()
+        return row[0] if row else None
+
+    # ------------------------------------------------------------------
+    # Bill details
+    # ------------------------------------------------------------------
+
+    def get_detail(self, bill_id: int, max_age: float) -> Optional[Dict[str, Any]]:
+        """
+        Stored bill detail if still current: its change_hash matches the synced master list or
+        it was fetched after that list was synced (the bill changed since, and the detail is the
+        newer of the two). For bills outside any synced session, it must have been fetched less
+        than `max_age` seconds ago.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT d.data, d.change_hash, d.fetched_at, b.change_hash, s.synced_at "
+                "FROM bill_details d LEFT JOIN bills b ON b.bill_id = d.bill_id "
+                "LEFT JOIN sessions s ON s.session_id = b.session_id WHERE d.bill_id = ?",
+                (bill_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        data, detail_hash, fetched_at, listed_hash, synced_at = row
+        if listed_hash is not None:
+            current = listed_hash == detail_hash or (synced_at is not None and fetched_at > synced_at)
+            return json.loads(data) if current else None
+        return json.loads(data) if time.time() - fetched_at < max_age else None
+
+    def save_detail(self, bill: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._write_details([bill])
+
+    def _write_details(self, bills: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO bill_details (bill_id, change_hash, fetched_at, data) VALUES (?, ?, ?, ?)",
+            [(int(bill["id"]), bill.get("changeHash", ""), now, json.dumps(bill)) for bill in bills],
+        )
+
+    def stale_details(self, limit: int) -> List[int]:
+        """Bills whose stored detail is older than a master list it no longer matches, most recently active first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.bill_id FROM bill_details d JOIN bills b ON b.bill_id = d.bill_id "
+                "LEFT JOIN sessions s ON s.session_id = b.session_id "
+                "WHERE d.change_hash != b.change_hash AND (s.synced_at IS NULL OR d.fetched_at <= s.synced_at) "
+                "ORDER BY b.last_action_date DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+    # ------------------------------------------------------------------
+    # Bulk datasets
+    # ------------------------------------------------------------------
+
+    def dataset_hash(self, session_id: int) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT dataset_hash FROM datasets WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def record_dataset(self, state: str, session_id: int, dataset_hash: str, dataset_date: str, bills: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO datasets (session_id, state, dataset_hash, dataset_date, bills, imported_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, state, dataset_hash, dataset_date, bills, time.time()),
+            )
+
+    def dataset_sessions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, state, dataset_hash, dataset_date, bills, imported_at FROM datasets ORDER BY state"
+            ).fetchall()
+        return [{"sessionId": r[0], "state": r[1], "datasetHash": r[2], "datasetDate": r[3], "bills": r[4],
+                 "importedAt": datetime.utcfromtimestamp(r[5]).isoformat()} for r in rows]
+
+
+class LegiScanSyncer:
+    """Periodically re-syncs current sessions and refreshes stored bill details that changed"""
+
+    def __init__(self, service: "LegiScanService", store: LegiScanStore, states: Iterable[str] = (),
+                 interval: float = 3600, details_per_run: int = 50):
+        """
+        Args:
+            service: LegiScan API service (performs the diffing sync)
+            store: Store the service syncs into
+            states: States always kept in sync; states first requested by users are added as they sync
+                (sessions imported from bulk datasets are left to the dataset importer)
+            interval: Seconds between runs
+            details_per_run: Changed bill details re-fetched per run
+        """
+        self.service = service
+        self.store = store
+        self.states = [state.upper() for state in states]
+        self.interval = interval
+        self.details_per_run = details_per_run
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Dict[str, Any] = {}
+
+    async def run_once(self) -> Dict[str, Any]:
+        started = datetime.utcnow()
+        synced = await asyncio.to_thread(self.store.synced_sessions)
+        states = list(dict.fromkeys(self.states + [state for state, _ in synced]))
+        results: Dict[str, Any] = {}
+        for state in states:
+            try:
+                session_id = await self.service.current_session_id(state)
+                if session_id and await asyncio.to_thread(self.store.dataset_hash, session_id) is None:
+                    results[state] = await self.service.sync_session(state, session_id)
+            except Exception as e:
+                logger.warning(f"LegiScan sync failed for {state}: {e}")
+                results[state] = f"failed: {e}"
+
+        refreshed = 0
+        for bill_id in await asyncio.to_thread(self.store.stale_details, self.details_per_run):
+            if await self.service.get_bill(bill_id):
+                refreshed += 1
+        results["details"] = refreshed
+
+        self.last_run = {
+            "started": started.isoformat(),
+            "finished": datetime.utcnow().isoformat(),
+            "results": results,
+            "stored": await asyncio.to_thread(self.store.counts),
+        }
+        logger.info(f"LegiScan sync finished: {self.last_run}")
+        return self.last_run
+
+    async def _loop(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if not self.service.api_key:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,171 @@
+"""
+Shared legislation analysis pipeline.
+
+Used by the federal, state and CA proposition analysis endpoints. The bill text is
+preprocessed once, then analysis and grading run concurrently over the same excerpt.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+AnalyzeFn = Callable[..., Awaitable[str]]
+GradeFn = Callable[..., Awaitable[dict]]
+ExtractFn = Callable[[str, int], str]
+PrimeFn = Callable[[], Awaitable[None]]
+
+
+class AnalysisError(RuntimeError):
+    """The analysis stage failed, so there is no result to return"""
+
+    def __init__(self, message: str, timed_out: bool = False):
+        super().__init__(message)
+        self.timed_out = timed_out
+
+
+class LegislationPipeline:
+    """Runs analysis and grading for a bill over a single shared excerpt"""
+
+    def __init__(self, analyze_fn: AnalyzeFn, grade_fn: GradeFn, extract_fn: ExtractFn,
+                 max_chars: int = 40000, analysis_timeout: float = 180.0,
+                 grading_timeout: float = 90.0):
+        """
+        Args:
+            analyze_fn: Coroutine producing the markdown analysis
+            grade_fn: Coroutine producing the rubric grades dict
+            extract_fn: Key-section extractor used for large bills
+            max_chars: Bills longer than this are reduced to key sections once
+            analysis_timeout: Seconds before the analysis is abandoned
+            grading_timeout: Seconds before grading is abandoned (analysis is still returned)
+        """
+        self.analyze_fn = analyze_fn
+        self.grade_fn = grade_fn
+        self.extract_fn = extract_fn
+        self.max_chars = max_chars
+        self.analysis_timeout = analysis_timeout
+        self.grading_timeout = grading_timeout
+
+    def prepare(self, bill_text: str) -> str:
+        """Reduce large bills to their key sections (done once for both stages)"""
+        if len(bill_text) <= self.max_chars:
+            return bill_text
+
+        logger.info(f"Large bill detected ({len(bill_text)} chars), extracting key sections once for analysis and grading")
+        processed_text = self.extract_fn(bill_text, self.max_chars)
+        logger.info(f"Key sections extracted: {len(processed_text)} chars")
+        return processed_text
+
+    def _start(self, bill_text: str, model: str, user_profile: Optional[dict],
+               language: str, extract: bool = True) -> Dict[str, asyncio.Task]:
+        """Preprocess the bill (unless `extract` is False) and launch both stages as tasks"""
+        processed_text = self.prepare(bill_text) if extract else bill_text
+        logger.info(f"Processing bill with model {model} - text length: {len(processed_text)} chars")
+
+        analysis = self.analyze_fn(processed_text, model, skip_extraction=True,
+                                   user_profile=user_profile, language=language)
+        grades = self.grade_fn(processed_text, model, skip_extraction=True)
+        return {
+            "analysis": asyncio.create_task(asyncio.wait_for(analysis, self.analysis_timeout)),
+            "grades": asyncio.create_task(asyncio.wait_for(grades, self.grading_timeout)),
+        }
+
+    @staticmethod
+    async def _prime(prime: PrimeFn) -> None:
+        """Seed the stage caches (e.g. from an earlier bill version); failures only cost the cache hit"""
+        try:
+            await prime()
+        except Exception as e:
+            logger.warning(f"Priming legislation caches failed, running both stages: {e}")
+
+    @staticmethod
+    def _describe_error(stage: str, error: BaseException) -> str:
+        if isinstance(error, asyncio.TimeoutError):
+            return f"{stage.capitalize()} timed out"
+        return f"{stage.capitalize()} failed: {error}"
+
+    async def run(self, bill_text: str, model: str, user_profile: Optional[dict] = None,
+                  language: str = "en", extract: bool = True,
+                  prime: Optional[PrimeFn] = None) -> Dict[str, Any]:
+        """
+        Run analysis and grading concurrently, after `prime` (if given) has seeded their caches.
+
+        Grading failures are reported under "errors" instead of failing the request;
+        an analysis failure is raised since there is nothing useful to return. If the
+        caller is cancelled (e.g. client disconnect), both stages are cancelled too.
+        """
+        start_time = time.time()
+        if prime:
+            await self._prime(prime)
+        tasks = self._start(bill_text, model, user_profile, language, extract)
+        try:
+            await asyncio.wait(tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        result: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for stage, task in tasks.items():
+            error = task.exception()
+            if error is None:
+                result[stage] = task.result()
+                continue
+            if stage == "analysis":
+                raise AnalysisError(self._describe_error(stage, error),
+                                    timed_out=isinstance(error, asyncio.TimeoutError)) from error
+            logger.warning(f"Returning partial legislation result: {self._describe_error(stage, error)}")
+            result[stage] = None
+            errors[stage] = self._describe_error(stage, error)
+
+        if errors:
+            result["errors"] = errors
+
+        logger.info(f"✅ Legislation pipeline finished in {time.time() - start_time:.2f}s")
+        return result
+
+    async def stream(self, bill_text: str, model: str, user_profile: Optional[dict] = None,
+                     language: str = "en", metadata: Optional[dict] = None,
+                     extract: bool = True, prime: Optional[PrimeFn] = None) -> AsyncGenerator[str, None]:
+        """
+        Server-Sent Events variant of run(): each stage is emitted as soon as it completes.
+
+        Events: optional 'metadata', a 'status' event while `prime` runs (if given), then
+        'analysis' / 'grades' in completion order (or 'error' with the failed stage), then
+        'complete'.
+        """
+        if metadata:
+            yield f"data: {json.dumps({'type': 'metadata', **metadata})}\n\n"
+        if prime:
+            yield f"data: {json.dumps({'type': 'status', 'message': 'Preparing analysis...'})}\n\n"
+            await self._prime(prime)
+
+        try:
+            tasks = self._start(bill_text, model, user_profile, language, extract)
+        except Exception as e:
+            logger.error(f"Error preparing legislation pipeline: {e}", exc_info=True)
+            yield f"data: {json.dumps({'type': 'error', 'stage': 'prepare', 'message': str(e)})}\n\n"
+            return
+
+        async def labelled(stage: str, task: asyncio.Task):
+            try:
+                return stage, await task, None
+            except Exception as e:
+                return stage, None, e
+
+        try:
+            for next_done in asyncio.as_completed([labelled(stage, task) for stage, task in tasks.items()]):
+                stage, value, error = await next_done
+                if error is not None:
+                    message = self._describe_error(stage, error)
+                    logger.warning(f"Legislation pipeline stage error: {message}")
+                    yield f"data: {json.dumps({'type': 'error', 'stage': stage, 'message': message})}\n\n"
+                    continue
+                yield f"data: {json.dumps({'type': stage, stage: value})}\n\n"
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        yield f"data: {json.dumps({'type': 'complete'})}\n\n"
@@ -3,10 +3,13 @@ import time
 import asyncio
 import logging
 import re
+import base64
+import hashlib
+import sqlite3
 from datetime import datetime
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from openai import OpenAI
 from dotenv import load_dotenv
@@ -23,8 +26,22 @@ from chains.debater_chain import get_debater_chain
 from chains.judge_chain import judge_chain, get_judge_chain
 from chains.trainer_chain import get_trainer_chain
 from billsearch import BillSearcher
+from congress_client import CongressClient, CongressNotFound
+from bill_index import BillIndex, BillIndexer
+from semantic_index import SEMANTIC_SEARCH_AVAILABLE, SemanticIndex
 from legiscan_service import LegiScanService
+from legiscan_store import LegiScanStore, LegiScanSyncer
+from legiscan_dataset import LegiScanDatasetImporter
+from master_list import SORTS as MASTER_LIST_SORTS
+import extraction_pool
 from ca_propositions_service import CAPropositionsService
+from legislation_pipeline import AnalysisError, LegislationPipeline
+from bill_text import diff_section_indexes
+from bill_text_store import BillTextStore, StoredBillText
+from incremental_analysis import IncrementalAnalyzer, SectionSummaryCache
+from preanalysis import DailyTokenBudget, PreanalysisJob, record_usage
+from swr_cache import StaleWhileRevalidateCache
+from http_cache import HTTPCache
 
 # Initialize logging first
 logging.basicConfig(level=logging.INFO)
@@ -133,6 +150,7 @@ class AnalysisRequest(BaseModel):
     model: str = DEFAULT_MODEL  # Use the global default model
     userProfile: dict = None  # Optional user profile for personalized analysis
     language: str = "en"  # Language preference (en, zh, etc.)
+    stream: bool = False  # Stream analysis and grades as Server-Sent Events
 
 # Connection pooling with optimizations - will be initialized lazily
 connector = None
@@ -155,8 +173,33 @@ cache = TTLCache(maxsize=200, ttl=600)  # Cache up to 200 items for 10 minutes
 
 # Global session variable
 session = None
+
+# Upstream metadata responses are kept on disk and revalidated with ETag/Last-Modified once stale.
+# TTLs apply when the upstream sends no Cache-Control/Expires of its own; least recently used
+# entries are evicted past HTTP_CACHE_MAX_MB.
+http_cache = HTTPCache(
+    Path(os.getenv("HTTP_CACHE_DIR", Path(__file__).parent / "http_cache")),
+    default_ttl=300,
+    max_bytes=int(float(os.getenv("HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    ttl_rules=[
+        (r"/bill/\d+/[a-z]+/\d+(\?|$)", 3600),  # Congress.gov bill details
+        (r"/bill(/\d+)?(\?|$)", 120),  # Congress.gov bill listings
+        (r"[?&]op=getBill(&|$)", 3600),  # LegiScan getBill
+    ],
+)
+
+# All Congress.gov requests share this client's rate limiter, retries and metrics
+congress_client = CongressClient(
+    CONGRESS_API_KEY, lambda: session,
+    hourly_quota=int(os.getenv("CONGRESS_API_HOURLY_QUOTA", "5000")),
+    http_cache=http_cache,
+)
 bill_searcher = None
+bill_indexer = None
+semantic_index = None
 legiscan_service = None
+legiscan_syncer = None
+legiscan_importer = None
 ca_props_service = None
 firestore_db = None
 
@@ -218,19 +261,75 @@ async def save_simulated_debate_to_firestore(debate_data: dict) -> Optional[str]
         logger.error(f"Error saving simulated debate to Firestore: {e}", exc_info=True)
         return None
 
+async def index_topics():
+    """Encode debate topics for /related-topics (only new or changed topics are encoded)"""
+    try:
+        topics = load_topics_from_file()
+        await asyncio.to_thread(semantic_index.update, "topics", [(topic, topic) for topic in topics])
+    except Exception as e:
+        logger.error(f"Error building topic embeddings: {e}", exc_info=True)
+
 @app.on_event("startup")
 async def startup_event():
-    global session, bill_searcher, legiscan_service, ca_props_service
+    global session, bill_searcher, bill_indexer, semantic_index, legiscan_service, legiscan_syncer, legiscan_importer, ca_props_service
     session = aiohttp.ClientSession(connector=get_connector())
-    bill_searcher = BillSearcher(session)
+
+    # Local full-text bill index, kept up to date from Congress.gov listings in the background
+    bill_index = None
+    try:
+        bill_index = BillIndex(Path(os.getenv("BILL_INDEX_PATH", Path(__file__).parent / "bill_index" / "bills.sqlite3")))
+    except sqlite3.Error as e:
+        logger.warning(f"Bill search index unavailable, searching Congress.gov directly: {e}")
+    # Sentence embeddings for semantic bill search and related topics (optional dependency)
+    if SEMANTIC_SEARCH_AVAILABLE:
+        semantic_index = SemanticIndex(
+            Path(os.getenv("SEMANTIC_INDEX_DIR", Path(__file__).parent / "bill_index" / "semantic")),
+            model_name=os.getenv("SEMANTIC_MODEL", "all-MiniLM-L6-v2"),
+        )
+        asyncio.create_task(index_topics())
+    else:
+        logger.warning("sentence-transformers not installed. Semantic search and related topics are disabled.")
+
+    bill_searcher = BillSearcher(congress_client, index=bill_index, semantic_index=semantic_index)
+    bill_searcher.refresh_semantic_index()
+    if bill_index is not None and CONGRESS_API_KEY:
+        bill_indexer = BillIndexer(
+            congress_client, bill_index, bill_searcher._process_bill_fast,
+            interval=float(os.getenv("BILL_INDEX_INTERVAL_SECONDS", "3600")),
+            after_run=bill_searcher.refresh_semantic_index,
+        )
+        bill_indexer.start()
     if LEGISCAN_API_KEY:
-        legiscan_service = LegiScanService(LEGISCAN_API_KEY, session)
+        # Local copy of LegiScan master lists and bill details, synced by change_hash
+        legiscan_store = None
+        try:
+            legiscan_store = LegiScanStore(Path(os.getenv("LEGISCAN_STORE_PATH", Path(__file__).parent / "bill_index" / "legiscan.sqlite3")))
+        except sqlite3.Error as e:
+            logger.warning(f"LegiScan store unavailable, querying LegiScan directly: {e}")
+        legiscan_service = LegiScanService(LEGISCAN_API_KEY, session, http_cache=http_cache, store=legiscan_store,
+                                           sync_max_age=float(os.getenv("LEGISCAN_SYNC_INTERVAL_SECONDS", "3600")))
+        if legiscan_store is not None:
+            legiscan_syncer = LegiScanSyncer(
+                legiscan_service, legiscan_store,
+                states=[s.strip() for s in os.getenv("LEGISCAN_SYNC_STATES", "").split(",") if s.strip()],
+                interval=float(os.getenv("LEGISCAN_SYNC_INTERVAL_SECONDS", "3600")),
+            )
+            legiscan_syncer.start()
+            # Whole sessions of these states come from LegiScan's weekly bulk datasets instead
+            legiscan_importer = LegiScanDatasetImporter(
+                legiscan_service, legiscan_store,
+                states=[s.strip() for s in os.getenv("LEGISCAN_DATASET_STATES", "").split(",") if s.strip()],
+                work_dir=legiscan_store.db_path.parent / "legiscan_datasets",
+            )
+            legiscan_importer.start()
         logger.info("LegiScan service initialized")
     else:
         logger.warning("LegiScan service not initialized - API key missing")
 
     # Initialize CA Propositions service
-    ca_props_service = CAPropositionsService()
+    ca_props_service = CAPropositionsService(
+        session, cache_dir=Path(os.getenv("CA_PROPS_CACHE_DIR", Path(__file__).parent / "ca_props_cache"))
+    )
     logger.info("CA Propositions service initialized")
 
     # Initialize Firebase
@@ -238,6 +337,20 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await preanalysis_job.stop()
+    if bill_indexer is not None:
+        await bill_indexer.stop()
+    await bills_cache.close()
+    if legiscan_importer is not None:
+        await legiscan_importer.stop()
+    if legiscan_syncer is not None:
+        await legiscan_syncer.stop()
+    if legiscan_service is not None:
+        await legiscan_service.session_cache.close()
+    if ca_props_service is not None:
+        await ca_props_service.props_cache.close()
+    extraction_pool.shutdown()
+    tts_worker.shutdown()
     if session is not None:
         await session.close()
 
@@ -383,6 +496,10 @@ class FullDebateRequest(BaseModel):
     language: str = "en"
     model1_elo: Optional[float] = 1500
     model2_elo: Optional[float] = 1500
+    tts: bool = False  # Synthesize each speech while the next one is generated (stream endpoint)
+    pro_voice: Optional[str] = None
+    con_voice: Optional[str] = None
+    tts_rate: float = 1.0
 
 class ELOUpdate(BaseModel):
     model: str
@@ -554,6 +671,11 @@ async def run_full_debate_stream(request: FullDebateRequest):
     def format_model_name(model):
         return model.replace('openai/', '').replace('meta-llama/', '').replace('google/', '').replace('anthropic/', '')
     
+    # Speech audio is synthesized in the background and announced with audio_ready events
+    audio = DebateAudioPipeline(
+        tts_worker, {"Pro": request.pro_voice, "Con": request.con_voice}, rate=request.tts_rate
+    ) if request.tts else None
+    
     async def generate():
         try:
             # Send initial status
@@ -610,6 +732,8 @@ async def run_full_debate_stream(request: FullDebateRequest):
                 full_transcript += f"## Pro (Round {round_num})\n{pro_response}\n\n"
                 
                 yield f"data: {json.dumps({'type': 'transcript_part', 'part': part})}\n\n"
+                if audio is not None:
+                    audio.enqueue(len(transcript_parts) - 1, part)
                 
                 # Con speaks
                 yield f"data: {json.dumps({'type': 'status', 'message': f'Con ({format_model_name(request.model2)}) is speaking...', 'round': round_num, 'total_rounds': request.max_rounds})}\n\n"
@@ -637,6 +761,8 @@ async def run_full_debate_stream(request: FullDebateRequest):
                 full_transcript += f"## Con (Round {round_num})\n{con_response}\n\n"
                 
                 yield f"data: {json.dumps({'type': 'transcript_part', 'part': part})}\n\n"
+                if audio is not None:
+                    audio.enqueue(len(transcript_parts) - 1, part)
             
             # Get judge evaluation
             yield f"data: {json.dumps({'type': 'status', 'message': 'Getting judge evaluation...'})}\n\n"
@@ -732,7 +858,8 @@ async def run_full_debate_stream(request: FullDebateRequest):
             logger.error(f"Error in debate stream: {e}", exc_info=True)
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
     
-    return StreamingResponse(generate(), media_type="text/event-stream", headers={
+    events = generate() if audio is None else audio.merge(generate())
+    return StreamingResponse(events, media_type="text/event-stream", headers={
         "Cache-Control": "no-cache",
         "Connection": "keep-alive",
         "X-Accel-Buffering": "no"
@@ -890,7 +1017,7 @@ class AnalyzeLegislationRequest(BaseModel):
     model: str = DEFAULT_MODEL
 
 @app.post("/analyze-legislation")
-async def analyze_legislation(file: UploadFile = File(...), model: str = Form(DEFAULT_MODEL), userProfile: str = Form(None)):
+async def analyze_legislation(file: UploadFile = File(...), model: str = Form(DEFAULT_MODEL), userProfile: str = Form(None), stream: bool = Form(False)):
     logger.info(f"Received analyze-legislation request with model: {model}")
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF file.")
@@ -955,51 +1082,40 @@ async def analyze_legislation(file: UploadFile = File(...), model: str = Form(DE
         logger.error(f"Error processing PDF file: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error processing PDF file: " + str(e))
 
-    try:
-        # Parse user profile if provided
-        parsed_user_profile = None
-        if userProfile:
-            try:
-                parsed_user_profile = json.loads(userProfile)
-                logger.info("User profile data provided for personalized analysis")
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid user profile JSON, proceeding without personalization: {e}")
-
-        # Optimize large bill processing by extracting key sections once
-        processed_text = text
-        if len(text) > 40000:  # Same threshold as analyze_legislation_text
-            logger.info(f"Large bill detected ({len(text)} chars), extracting key sections once for both analysis and grading")
-            processed_text = extract_key_bill_sections(text, 40000)
-            logger.info(f"Key sections extracted: {len(processed_text)} chars")
+    # Parse user profile if provided
+    parsed_user_profile = None
+    if userProfile:
+        try:
+            parsed_user_profile = json.loads(userProfile)
+            logger.info("User profile data provided for personalized analysis")
+        except json.JSONDecodeError as e:
+            logger.warning(f"Invalid user profile JSON, proceeding without personalization: {e}")
 
-        # Log consolidated processing info
-        logger.info(f"Processing bill with model {model} - text length: {len(processed_text)} chars")
+    if stream:
+        return sse_response(legislation_pipeline.stream(text, model, user_profile=parsed_user_profile, metadata={"extractedText": text}))
 
-        # Generate both analysis and grades using the processed text
-        analysis = await analyze_legislation_text(processed_text, model, skip_extraction=True, user_profile=parsed_user_profile)
-        grades = await grade_legislation_text(processed_text, model, skip_extraction=True)
+    try:
+        # Generate both analysis and grades concurrently from a single excerpt
+        result = await legislation_pipeline.run(text, model, user_profile=parsed_user_profile)
     except Exception as e:
         logger.error(f"Error in analyze_legislation_text: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error analyzing legislation")
 
-    return {"analysis": analysis, "grades": grades, "extractedText": text}
+    return {**result, "extractedText": text}
 
 @app.post("/analyze-legislation-text")
 async def analyze_legislation_text_endpoint(request: AnalysisRequest):
     """Analyze legislation text directly without PDF extraction."""
+    if request.stream:
+        return sse_response(legislation_pipeline.stream(request.text, request.model, user_profile=request.userProfile, language=request.language, extract=False))
+
     try:
-        # Log consolidated processing info
-        logger.info(f"Processing text input with model {request.model} - text length: {len(request.text)} chars")
-        
-        # Generate both analysis and grades (skip redundant logging since this is direct text input)
-        analysis = await analyze_legislation_text(request.text, request.model, skip_extraction=True, user_profile=request.userProfile, language=request.language)
-        grades = await grade_legislation_text(request.text, request.model, skip_extraction=True)
+        # Direct text input is analyzed as given (no key-section extraction), both stages concurrently
+        return await legislation_pipeline.run(request.text, request.model, user_profile=request.userProfile, language=request.language, extract=False)
     except Exception as e:
         logger.error(f"Error in analyze_legislation_text: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error analyzing legislation")
 
-    return {"analysis": analysis, "grades": grades}
-
 @app.post("/extract-text")
 async def extract_text_endpoint(file: UploadFile = File(...)):
     if file.content_type != "application/pdf":
@@ -1080,8 +1196,8 @@ async def judge_feedback(request: JudgeFeedbackRequest):
 async def test_cors():
     return {"message": "CORS preflight OK"}
 
-# Cache for Congress bills
-bills_cache = TTLCache(maxsize=50, ttl=3600)  # Cache for 1 hour
+# Cache for Congress bills: refreshed in the background after 1 hour, served stale for up to a day
+bills_cache = StaleWhileRevalidateCache(refresh_after=3600, max_stale=86400, maxsize=50)
 
 async def fetch_congress_bills() -> List[Dict[str, Any]]:
     """Fetch current bills from Congress.gov API"""
@@ -1089,103 +1205,88 @@ async def fetch_congress_bills() -> List[Dict[str, Any]]:
     if not CONGRESS_API_KEY:
         raise ValueError("CONGRESS_API_KEY is required for fetching bills from Congress.gov")
     
-    # Use cached result if available
-    cache_key = "congress_bills_current"
-    if cache_key in bills_cache:
-        return bills_cache[cache_key]
-    
     try:
-        # Current Congress is 119th (2025-2027)
-        current_congress = 119
-        
-        # Fetch recent bills from current Congress
-        url = f"https://api.congress.gov/v3/bill/{current_congress}"
-        params = {
-            "api_key": CONGRESS_API_KEY,
-            "format": "json",
-            "limit": 20,
-            "sort": "updateDate+desc"  # Sort by most recently updated
-        }
-        
-        async with session.get(url, params=params) as response:
-            if response.status != 200:
-                logger.error(f"Congress API error: {response.status}")
-                raise HTTPException(status_code=500, detail="Error fetching bills from Congress API")
+        return await bills_cache.get("congress_bills_current", load_congress_bills)
+    except Exception as e:
+        logger.error(f"Error fetching Congress bills: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch bills from Congress.gov: {str(e)}")
+
+async def load_congress_bills() -> List[Dict[str, Any]]:
+    """Load the recommended bill list from Congress.gov (raises on upstream errors)"""
+    # Current Congress is 119th (2025-2027)
+    current_congress = 119
+    
+    # Fetch recent bills from current Congress, most recently updated first
+    bills_data = await congress_client.list_bills(current_congress, limit=20, sort="updateDate+desc")
+    
+    # Transform the data to our format
+    processed_bills = []
+    for bill in bills_data[:8]:  # Limit to 8 bills for UI
+        try:
+            # Extract bill information
+            bill_type = bill.get("type", "")
+            bill_number = bill.get("number", "")
+            title = bill.get("title", "Untitled Bill")
             
-            data = await response.json()
-            bills_data = data.get("bills", [])
+            # Get sponsor information
+            sponsors = bill.get("sponsors", [])
+            sponsor_name = "Unknown Sponsor"
+            if sponsors:
+                sponsor = sponsors[0]
+                first_name = sponsor.get("firstName", "")
+                last_name = sponsor.get("lastName", "")
+                party = sponsor.get("party", "")
+                state = sponsor.get("state", "")
+                sponsor_name = f"Rep. {first_name} {last_name} ({party}-{state})" if sponsor.get("type") == "Representative" else f"Sen. {first_name} {last_name} ({party}-{state})"
             
-            # Transform the data to our format
-            processed_bills = []
-            for bill in bills_data[:8]:  # Limit to 8 bills for UI
-                try:
-                    # Extract bill information
-                    bill_type = bill.get("type", "")
-                    bill_number = bill.get("number", "")
-                    title = bill.get("title", "Untitled Bill")
-                    
-                    # Get sponsor information
-                    sponsors = bill.get("sponsors", [])
-                    sponsor_name = "Unknown Sponsor"
-                    if sponsors:
-                        sponsor = sponsors[0]
-                        first_name = sponsor.get("firstName", "")
-                        last_name = sponsor.get("lastName", "")
-                        party = sponsor.get("party", "")
-                        state = sponsor.get("state", "")
-                        sponsor_name = f"Rep. {first_name} {last_name} ({party}-{state})" if sponsor.get("type") == "Representative" else f"Sen. {first_name} {last_name} ({party}-{state})"
-                    
-                    # Get latest action
-                    latest_action = bill.get("latestAction", {})
-                    action_text = latest_action.get("text", "No recent action")
-                    
-                    # Get better description from summary or policy areas
-                    description = title  # Fallback to title
-                    
-                    # Try to get summary first
-                    summaries = bill.get("summaries", [])
-                    if summaries:
-                        latest_summary = summaries[0]  # Get the most recent summary
-                        summary_text = latest_summary.get("text", "")
-                        if summary_text:
-                            description = summary_text
-                    
-                    # If no summary, try to use policy areas to create description
-                    if description == title:
-                        policy_areas = bill.get("policyArea", {})
-                        policy_name = policy_areas.get("name", "")
-                        subjects = bill.get("subjects", [])
-                        if policy_name and subjects:
-                            subject_names = [s.get("name", "") for s in subjects[:3] if s.get("name")]
-                            if subject_names:
-                                description = f"Legislation related to {policy_name}. Key areas: {', '.join(subject_names)}."
-                    
-                    # Only truncate if still very long (over 500 chars)
-                    if len(description) > 500:
-                        description = description[:500] + "..."
-                    
-                    processed_bill = {
-                        "id": f"{bill_type.lower()}{bill_number}-{current_congress}",
-                        "title": title,
-                        "type": bill_type,
-                        "number": bill_number,
-                        "sponsor": sponsor_name,
-                        "lastAction": action_text,  # Don't truncate action text
-                        "description": description
-                    }
-                    processed_bills.append(processed_bill)
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing bill data: {e}")
-                    continue
+            # Get latest action
+            latest_action = bill.get("latestAction", {})
+            action_text = latest_action.get("text", "No recent action")
             
-            # Cache the results
-            bills_cache[cache_key] = processed_bills
-            return processed_bills
+            # Get better description from summary or policy areas
+            description = title  # Fallback to title
             
-    except Exception as e:
-        logger.error(f"Error fetching Congress bills: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch bills from Congress.gov: {str(e)}")
+            # Try to get summary first
+            summaries = bill.get("summaries", [])
+            if summaries:
+                latest_summary = summaries[0]  # Get the most recent summary
+                summary_text = latest_summary.get("text", "")
+                if summary_text:
+                    description = summary_text
+            
+            # If no summary, try to use policy areas to create description
+            if description == title:
+                policy_areas = bill.get("policyArea", {})
+                policy_name = policy_areas.get("name", "")
+                subjects = bill.get("subjects", [])
+                if policy_name and subjects:
+                    subject_names = [s.get("name", "") for s in subjects[:3] if s.get("name")]
+                    if subject_names:
+                        description = f"Legislation related to {policy_name}. Key areas: {', '.join(subject_names)}."
+            
+            # Only truncate if still very long (over 500 chars)
+            if len(description) > 500:
+                description = description[:500] + "..."
+            
+            processed_bill = {
+                "id": f"{bill_type.lower()}{bill_number}-{current_congress}",
+                "title": title,
+                "type": bill_type,
+                "number": bill_number,
+                "sponsor": sponsor_name,
+                "lastAction": action_text,  # Don't truncate action text
+                "description": description
+            }
+            processed_bills.append(processed_bill)
+            
+        except Exception as e:
+            logger.warning(f"Error processing bill data: {e}")
+            continue
+    
+    # Warm text, analysis and grades for the refreshed list in the background
+    if API_KEY:
+        preanalysis_job.schedule(processed_bills)
+    return processed_bills
 
 @app.get("/recommended-bills")
 async def get_recommended_bills():
@@ -1290,6 +1391,9 @@ def extract_key_bill_sections(bill_text: str, max_chars: int) -> str:
     
     return result
 
+# Grades keyed by (grading text hash, model), filled by requests and by background pre-analysis
+grades_cache = TTLCache(maxsize=300, ttl=86400)
+
 async def grade_legislation_text(bill_text: str, model: str, skip_extraction: bool = False) -> dict:
     """Grade legislation text based on the comprehensive rubric"""
     
@@ -1312,6 +1416,11 @@ async def grade_legislation_text(bill_text: str, model: str, skip_extraction: bo
         logger.info(f"After extraction for grading: {len(bill_grading_text)} chars")
     else:
         bill_grading_text = bill_text
+
+    grades_key = hashkey(bill_text_hash(bill_grading_text), model)
+    if grades_key in grades_cache:
+        logger.info("Grades cache hit")
+        return dict(grades_cache[grades_key])
     
     grading_prompt = f"""
 CRITICAL: You must respond with ONLY valid JSON. No explanations, no thinking process, no additional text.
@@ -1379,6 +1488,7 @@ IMPORTANT:
                 raise HTTPException(status_code=500, detail="Error generating grades")
             
             result = await response.json()
+            record_usage(result.get("usage"))
             grades_text = result["choices"][0]["message"]["content"]
             
             # Check if response is empty
@@ -1443,6 +1553,7 @@ IMPORTANT:
                     )
                 
                 logger.info(f"Generated grades: {grades}")
+                grades_cache[grades_key] = dict(grades)
                 return grades
                 
             except (json.JSONDecodeError, ValueError) as e:
@@ -1576,9 +1687,218 @@ def format_user_profile_for_analysis(user_profile: dict) -> str:
 
     return '\n'.join(profile_parts)
 
+# Base analyses keyed by (bill hash, model); personalization and translation are layered on top
+analysis_cache = TTLCache(maxsize=300, ttl=86400)  # Cache base analyses for 24 hours
+_analysis_inflight: Dict[Any, asyncio.Task] = {}
+
+def bill_text_hash(bill_text: str) -> str:
+    """Stable content hash used to key per-bill caches"""
+    return hashlib.sha256(bill_text.encode("utf-8")).hexdigest()
+
+def get_language_instruction(language: str) -> str:
+    """Instruction appended to system prompts for non-English output"""
+    if language == "zh":
+        return " IMPORTANT: Provide your entire analysis in Chinese (中文). All headings, explanations, and content must be in Chinese."
+    elif language != "en":
+        return f" IMPORTANT: Provide your entire analysis in the language code: {language}."
+    return ""
+
+async def openrouter_completion(payload: dict, purpose: str) -> str:
+    """Send a chat completion request to OpenRouter and return the message content"""
+    headers = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://debatesim.app",
+    }
+
+    async with session.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload) as response:
+        if response.status != 200:
+            logger.error(f"OpenRouter API error in {purpose}: {response.status}")
+            raise HTTPException(status_code=500, detail=f"Error generating {purpose}")
+
+        result = await response.json()
+        record_usage(result.get("usage"))
+        return result["choices"][0]["message"]["content"]
+
+async def generate_base_analysis(bill_analysis_text: str, model: str) -> str:
+    """Generate the profile-independent English analysis for a bill excerpt"""
+    analysis_prompt = f"""
+You are a legislative analyst providing a comprehensive analysis of the following bill. The bill text may include key extracted sections marked with === headers === for large bills.
+
+BILL TEXT:
+{bill_analysis_text}
+
+Please provide a detailed analysis with the following sections, including specific explanations for grading criteria:
+
+## Executive Summary
+Provide a 2-3 sentence overview of what this bill does and its main purpose based on the title, findings, and key provisions.
+
+## Bill Details
+- **Bill Title**: Extract the official title and short title if available
+- **Primary Sponsor**: Identify who drafted/sponsored this bill (if mentioned in the text)
+- **Legislative Goals**: What are the main objectives this bill aims to achieve?
+- **Key Provisions**: List the 3-5 most important sections or provisions from the extracted content
+
+## Grading Analysis Explanations
+### Economic Impact Assessment
+Analyze the bill's fiscal impact, cost-effectiveness, and economic benefits. Consider budget allocations, revenue impacts, and cost-benefit analysis. Explain why this bill scores well or poorly on economic criteria.
+
+### Public Benefit Evaluation
+Assess how this bill addresses public needs and benefits different population segments. Consider scope of impact, target demographics, and societal benefits. Explain the public value proposition.
+
+### Implementation Feasibility Review
+Evaluate the practicality of executing this legislation. Consider resource requirements, timeline feasibility, administrative capacity, and potential implementation challenges.
+
+### Legal and Constitutional Soundness
+Analyze the bill's compliance with constitutional principles and existing legal frameworks. Consider jurisdictional issues, legal precedents, and potential constitutional challenges.
+
+### Goal Effectiveness Analysis
+Assess how well the bill addresses its stated problems and achieves intended objectives. Consider whether the proposed solutions match the identified problems and likelihood of success.
+
+## Policy Analysis
+### Potential Benefits
+- Identify 2-3 positive aspects or benefits this bill could provide
+- Explain each point based on the bill's provisions and anticipated outcomes
+
+### Potential Concerns
+- Identify 2-3 potential problems, challenges, or negative consequences
+- Explain each point based on potential risks and implementation challenges
+
+### Implementation Considerations
+- What challenges might arise in implementing this legislation?
+- Are there any unclear provisions or potential ambiguities?
+- Consider authorization levels, effective dates, and enforcement mechanisms if mentioned
+
+## Overall Assessment
+Provide a balanced conclusion about the bill's likely effectiveness and impact based on the available sections. If this analysis is based on extracted sections rather than the full bill, note that the assessment covers the key provisions reviewed.
+
+Please ensure your analysis is objective, comprehensive, and provides practical insights about the legislation's likely impact and effectiveness.
+"""
+
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": "You are an expert legislative analyst providing objective, evidence-based analysis of Congressional bills."},
+            {"role": "user", "content": analysis_prompt}
+        ],
+        "temperature": 0.3,  # Lower temperature for more analytical, less creative output
+    }
+
+    # DEBUG: Print AI call details
+    print("\n" + "="*80)
+    print("🤖 AI CALL - ANALYSIS")
+    print("="*80)
+    print(f"Model: {model}")
+    print(f"System Prompt: {payload['messages'][0]['content']}")
+    print(f"User Prompt (first 1000 chars):\n{analysis_prompt[:1000]}...")
+    print(f"User Prompt Total Length: {len(analysis_prompt)} characters")
+    print(f"Temperature: {payload['temperature']}")
+    print("="*80 + "\n")
+
+    return await openrouter_completion(payload, "analysis")
+
+async def get_base_analysis(bill_analysis_text: str, model: str) -> Dict[str, str]:
+    """
+    Return the cached base analysis for (bill hash, model), generating it on a miss.
+
+    Concurrent requests for the same bill share a single in-flight generation.
+    """
+    cache_key = hashkey(bill_text_hash(bill_analysis_text), model)
+    if cache_key in analysis_cache:
+        logger.info("Base analysis cache hit")
+        return analysis_cache[cache_key]
+
+    task = _analysis_inflight.get(cache_key)
+    if task is None:
+        async def generate():
+            try:
+                analysis = await generate_base_analysis(bill_analysis_text, model)
+                entry = {"analysis": analysis, "generated": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}
+                analysis_cache[cache_key] = entry
+                return entry
+            finally:
+                _analysis_inflight.pop(cache_key, None)
+
+        task = asyncio.create_task(generate())
+        _analysis_inflight[cache_key] = task
+
+    # Shield so one cancelled caller doesn't abort the generation for everyone else
+    return await asyncio.shield(task)
+
+async def personalize_analysis(base_analysis: str, model: str, user_profile: dict = None, language: str = "en") -> str:
+    """
+    Adapt a cached base analysis to a user profile and/or output language.
+
+    Only the base analysis is sent (never the bill text). English personalization asks for
+    just the "Impacts on You" section and splices it in; other languages return the full
+    translated analysis.
+    """
+    formatted_profile = format_user_profile_for_analysis(user_profile) if user_profile else ""
+    translate = language != "en"
+
+    profile_instructions = ""
+    if formatted_profile:
+        profile_instructions = f"""
+USER PROFILE:
+{formatted_profile}
+
+Write an "## Impacts on You" section analyzing how this bill would specifically affect someone with these demographic characteristics, circumstances, and background. Consider:
+- Direct impacts on their situation (economic, legal, social)
+- Indirect effects through programs, services, or policies they might use
+- How their specific demographic group might be affected differently than the general population
+- Potential benefits or challenges they might face
+- Any special provisions or considerations that apply to their circumstances
+
+Provide concrete, specific examples of how the bill's provisions would translate into real-world impacts for this individual.
+"""
+
+    if translate:
+        task_instructions = "Return the complete analysis below, translated, keeping every section and its markdown structure."
+        if formatted_profile:
+            task_instructions += ' Insert the "## Impacts on You" section immediately before "## Overall Assessment".'
+    else:
+        task_instructions = 'Return ONLY the "## Impacts on You" section in markdown. Do not repeat the rest of the analysis.'
+
+    personalization_prompt = f"""
+{task_instructions}
+{profile_instructions}
+EXISTING ANALYSIS:
+{base_analysis}
+"""
+
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": f"You are an expert legislative analyst adapting an existing bill analysis for a specific reader.{get_language_instruction(language)}"},
+            {"role": "user", "content": personalization_prompt}
+        ],
+        "temperature": 0.3,
+    }
+
+    logger.debug(
+        f"AI call - analysis personalization: model={model}, language={language}, "
+        f"profile={'yes' if formatted_profile else 'no'}, prompt={len(personalization_prompt)} chars"
+    )
+
+    content = await openrouter_completion(payload, "analysis personalization")
+    if translate:
+        return content
+
+    # Splice the personalized section in before the overall assessment
+    impacts_section = content.strip()
+    marker = "## Overall Assessment"
+    if marker in base_analysis:
+        before, after = base_analysis.split(marker, 1)
+        return f"{before.rstrip()}\n\n{impacts_section}\n\n{marker}{after}"
+    return f"{base_analysis.rstrip()}\n\n{impacts_section}"
+
 async def analyze_legislation_text(bill_text: str, model: str, skip_extraction: bool = False, user_profile: dict = None, language: str = "en") -> str:
-    """Analyze legislation text with a custom analysis prompt"""
-    
+    """
+    Analyze legislation text with a custom analysis prompt.
+
+    The full bill is only sent for the base analysis, which is cached per (bill hash, model).
+    User profiles and non-English output are applied by a short follow-up call over it.
+    """
     # Debug logging (reduced when called together with grading)
     if not skip_extraction:
         logger.info(f"Analyzing bill text with model {model}")
@@ -1646,134 +1966,22 @@ Based on the bill information available:
     else:
         bill_analysis_text = bill_text
     
-    # Format user profile context if provided
-    user_context = ""
-    personalized_section = ""
-    if user_profile:
-        formatted_profile = format_user_profile_for_analysis(user_profile)
-        if formatted_profile:
-            user_context = f"""
-
-USER PROFILE CONTEXT:
-The analysis should consider how this legislation might specifically affect a person with the following characteristics:
-{formatted_profile}
-"""
-            personalized_section = """
-
-## Impacts on You
-Based on the user's profile information provided, analyze how this bill would specifically affect someone with their demographic characteristics, circumstances, and background. Consider:
-- Direct impacts on their situation (economic, legal, social)
-- Indirect effects through programs, services, or policies they might use
-- How their specific demographic group might be affected differently than the general population
-- Potential benefits or challenges they might face
-- Any special provisions or considerations that apply to their circumstances
-
-Provide concrete, specific examples of how the bill's provisions would translate into real-world impacts for this individual."""
-
-    analysis_prompt = f"""
-You are a legislative analyst providing a comprehensive analysis of the following bill. The bill text may include key extracted sections marked with === headers === for large bills.{user_context}
-
-BILL TEXT:
-{bill_analysis_text}
-
-Please provide a detailed analysis with the following sections, including specific explanations for grading criteria:
-
-## Executive Summary
-Provide a 2-3 sentence overview of what this bill does and its main purpose based on the title, findings, and key provisions.
-
-## Bill Details
-- **Bill Title**: Extract the official title and short title if available
-- **Primary Sponsor**: Identify who drafted/sponsored this bill (if mentioned in the text)
-- **Legislative Goals**: What are the main objectives this bill aims to achieve?
-- **Key Provisions**: List the 3-5 most important sections or provisions from the extracted content
-
-## Grading Analysis Explanations
-### Economic Impact Assessment
-Analyze the bill's fiscal impact, cost-effectiveness, and economic benefits. Consider budget allocations, revenue impacts, and cost-benefit analysis. Explain why this bill scores well or poorly on economic criteria.
-
-### Public Benefit Evaluation
-Assess how this bill addresses public needs and benefits different population segments. Consider scope of impact, target demographics, and societal benefits. Explain the public value proposition.
-
-### Implementation Feasibility Review
-Evaluate the practicality of executing this legislation. Consider resource requirements, timeline feasibility, administrative capacity, and potential implementation challenges.
-
-### Legal and Constitutional Soundness
-Analyze the bill's compliance with constitutional principles and existing legal frameworks. Consider jurisdictional issues, legal precedents, and potential constitutional challenges.
-
-### Goal Effectiveness Analysis
-Assess how well the bill addresses its stated problems and achieves intended objectives. Consider whether the proposed solutions match the identified problems and likelihood of success.
-
-## Policy Analysis
-### Potential Benefits
-- Identify 2-3 positive aspects or benefits this bill could provide
-- Explain each point based on the bill's provisions and anticipated outcomes
-
-### Potential Concerns
-- Identify 2-3 potential problems, challenges, or negative consequences
-- Explain each point based on potential risks and implementation challenges
-
-### Implementation Considerations
-- What challenges might arise in implementing this legislation?
-- Are there any unclear provisions or potential ambiguities?
-- Consider authorization levels, effective dates, and enforcement mechanisms if mentioned
-{personalized_section}
-
-## Overall Assessment
-Provide a balanced conclusion about the bill's likely effectiveness and impact based on the available sections. If this analysis is based on extracted sections rather than the full bill, note that the assessment covers the key provisions reviewed.
-
-Please ensure your analysis is objective, comprehensive, and provides practical insights about the legislation's likely impact and effectiveness.
-"""
-
     try:
-        # Use aiohttp to make the API call
-        headers = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://debatesim.app",
-        }
-        
-        # Determine language instruction
-        language_instruction = ""
-        if language == "zh":
-            language_instruction = " IMPORTANT: Provide your entire analysis in Chinese (中文). All headings, explanations, and content must be in Chinese."
-        elif language != "en":
-            language_instruction = f" IMPORTANT: Provide your entire analysis in the language code: {language}."
-
-        system_message = f"You are an expert legislative analyst providing objective, evidence-based analysis of Congressional bills.{language_instruction}"
+        base = await get_base_analysis(bill_analysis_text, model)
+        analysis = base["analysis"]
+        generated = base["generated"]
 
-        payload = {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": analysis_prompt}
-            ],
-            "temperature": 0.3,  # Lower temperature for more analytical, less creative output
-        }
+        # Personalization / translation is a small delta over the cached base analysis
+        if (user_profile and format_user_profile_for_analysis(user_profile)) or language != "en":
+            try:
+                analysis = await personalize_analysis(analysis, model, user_profile=user_profile, language=language)
+                generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
+            except Exception as personalization_error:
+                logger.warning(f"Personalization failed, returning base analysis: {personalization_error}")
 
-        # DEBUG: Print AI call details
-        print("\n" + "="*80)
-        print("🤖 AI CALL - ANALYSIS")
-        print("="*80)
-        print(f"Model: {model}")
-        print(f"System Prompt: {payload['messages'][0]['content']}")
-        print(f"User Prompt (first 1000 chars):\n{analysis_prompt[:1000]}...")
-        print(f"User Prompt Total Length: {len(analysis_prompt)} characters")
-        print(f"Temperature: {payload['temperature']}")
-        print("="*80 + "\n")
+        # Add model information to the analysis
+        return f"{analysis}\n\n---\n\n## Analysis Information\n\n**Model Used:** {model}\n**Generated:** {generated}"
 
-        async with session.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload) as response:
-            if response.status != 200:
-                logger.error(f"OpenRouter API error in analysis: {response.status}")
-                raise HTTPException(status_code=500, detail="Error generating analysis")
-            
-            result = await response.json()
-            analysis = result["choices"][0]["message"]["content"]
-            
-            # Add model information to the analysis
-            analysis_with_model = f"{analysis}\n\n---\n\n## Analysis Information\n\n**Model Used:** {model}\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}"
-            
-            return analysis_with_model
-            
     except Exception as e:
         logger.error(f"Error in analyze_legislation_text: {e}")
         # Try once more with an even smaller text sample if the error suggests token limits
@@ -1819,16 +2027,13 @@ Keep response concise and focused.
                 print(f"Max Tokens: {payload_emergency['max_tokens']}")
                 print("="*80 + "\n")
 
-                async with session.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload_emergency) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        emergency_analysis = result["choices"][0]["message"]["content"]
-                        
-                        # Add model information to emergency analysis
-                        emergency_analysis_with_model = f"{emergency_analysis}\n\n---\n\n## Analysis Information\n\n**Model Used:** {model}\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}\n**Note:** Emergency reduced analysis due to content length"
-                        
-                        return emergency_analysis_with_model
-                        
+                emergency_analysis = await openrouter_completion(payload_emergency, "emergency analysis")
+
+                # Add model information to emergency analysis
+                emergency_analysis_with_model = f"{emergency_analysis}\n\n---\n\n## Analysis Information\n\n**Model Used:** {model}\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}\n**Note:** Emergency reduced analysis due to content length"
+
+                return emergency_analysis_with_model
+
             except Exception as emergency_error:
                 logger.error(f"Emergency analysis also failed: {emergency_error}")
         
@@ -1863,210 +2068,44 @@ You can try uploading a PDF of specific sections you're most interested in analy
 *Note: This is an automated response due to processing limitations with very large bills.*
         """.strip()
 
-def parse_bill_xml(xml_content: str) -> str:
-    """
-    Parse Congress.gov XML bill format and extract structured text with sections.
-
-    Congress bills use XML with tags like:
-    - <section> for sections
-    - <header> for section headers
-    - <enum> for section numbers
-    - <text> for content
-    - <title> for titles
-    - <chapter>, <part>, <subtitle> for organizational units
-    """
-    try:
-        import xml.etree.ElementTree as ET
-
-        logger.info("Parsing XML bill content")
+# Shared analysis + grading pipeline for every legislation endpoint
+legislation_pipeline = LegislationPipeline(
+    analyze_fn=analyze_legislation_text,
+    grade_fn=grade_legislation_text,
+    extract_fn=extract_key_bill_sections,
+    max_chars=40000
+)
 
-        # Parse the XML
-        try:
-            root = ET.fromstring(xml_content)
-        except ET.ParseError as e:
-            logger.warning(f"XML parsing failed: {e}. Falling back to text extraction.")
-            # Fallback: just strip XML tags
-            import re
-            return re.sub(r'<[^>]+>', '', xml_content)
-
-        # Extract bill text with structure
-        bill_parts = []
-
-        def extract_text_recursive(element, level=0):
-            """Recursively extract text from XML elements while preserving structure"""
-            text_parts = []
-
-            # Extract section header information
-            if element.tag in ['section', 'title', 'chapter', 'part', 'subtitle']:
-                # Look for enum (section number) and header
-                enum = element.find('.//enum')
-                header = element.find('.//header')
-
-                section_text = []
-                if enum is not None and enum.text:
-                    section_text.append(f"\n\nSEC. {enum.text.strip()}")
-                if header is not None and header.text:
-                    section_text.append(f" {header.text.strip().upper()}")
-
-                if section_text:
-                    text_parts.append(''.join(section_text))
-
-            # Extract regular text content
-            if element.tag == 'text' and element.text:
-                text_parts.append(f"\n{element.text.strip()}")
-
-            # Recursively process child elements
-            for child in element:
-                child_text = extract_text_recursive(child, level + 1)
-                if child_text:
-                    text_parts.extend(child_text)
-
-                # Also get tail text (text after the child element)
-                if child.tail and child.tail.strip():
-                    text_parts.append(child.tail.strip())
-
-            return text_parts
-
-        # Extract text from the root element
-        extracted_parts = extract_text_recursive(root)
-        bill_text = ' '.join(extracted_parts)
-
-        # Clean up the text
-        import re
-        # Normalize whitespace
-        bill_text = re.sub(r'\s+', ' ', bill_text)
-        # Add proper spacing around section markers
-        bill_text = re.sub(r'(\n\n)(SEC\.\s+\d+)', r'\1\n\2', bill_text)
-        # Clean up excessive newlines
-        bill_text = re.sub(r'\n{3,}', '\n\n', bill_text)
-        bill_text = bill_text.strip()
-
-        logger.info(f"Extracted {len(bill_text)} characters from XML")
-        logger.info(f"XML parsing preview: {bill_text[:300]}...")
-
-        return bill_text
+def sse_response(generator: AsyncGenerator[str, None]) -> StreamingResponse:
+    """Wrap an SSE generator with the headers used by our streaming endpoints"""
+    return StreamingResponse(generator, media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no"
+    })
 
-    except Exception as e:
-        logger.error(f"Error parsing XML bill: {e}")
-        # Fallback: return raw text with XML tags stripped
-        import re
-        return re.sub(r'<[^>]+>', '', xml_content)
+# Published bill text versions are immutable, so documents are stored locally and only
+# the version list is revalidated (conditionally, at most every BILL_TEXT_REVALIDATE_SECONDS)
+bill_text_store = BillTextStore(
+    cache_dir=Path(os.getenv("BILL_TEXT_CACHE_DIR", Path(__file__).parent / "bill_text_cache")),
+    revalidate_interval=float(os.getenv("BILL_TEXT_REVALIDATE_SECONDS", "600")),
+)
 
 async def fetch_bill_text(bill_type: str, bill_number: str, congress: int = 119) -> str:
-    """Fetch full text of a specific bill from Congress.gov API"""
+    """Fetch full text of a specific bill from Congress.gov API (served from the local bill text store)"""
+    return (await fetch_stored_bill_text(bill_type, bill_number, congress)).text
+
+async def fetch_stored_bill_text(bill_type: str, bill_number: str, congress: int = 119) -> StoredBillText:
+    """Fetch the latest text version of a bill along with its version details"""
     if not CONGRESS_API_KEY:
         raise ValueError("CONGRESS_API_KEY is required for bill text retrieval")
 
     try:
-        # Get bill text versions from Congress API
-        url = f"https://api.congress.gov/v3/bill/{congress}/{bill_type.lower()}/{bill_number}/text"
-        params = {
-            "api_key": CONGRESS_API_KEY,
-            "format": "json"
-        }
+        stored = await bill_text_store.get_text(congress_client, congress, bill_type, bill_number)
+        logger.info(f"Bill text for {bill_type} {bill_number} ({stored.version_type or stored.version_date}, "
+                    f"{stored.format}): {len(stored.text)} chars")
+        return stored
 
-        async with session.get(url, params=params) as response:
-            if response.status == 404:
-                logger.error(f"Bill text not found: {bill_type} {bill_number}")
-                raise ValueError("No text versions available for this bill")
-            elif response.status != 200:
-                logger.error(f"Congress API error fetching bill text: {response.status}")
-                raise HTTPException(status_code=500, detail="Error fetching bill text from Congress API")
-
-            data = await response.json()
-            text_versions = data.get("textVersions", [])
-
-            if not text_versions:
-                raise ValueError("No text versions available for this bill")
-
-            # Get the most recent text version (usually the first one)
-            latest_version = text_versions[0]
-            text_url = latest_version.get("formats", [])
-
-            # Try XML format first (most structured), then formatted text
-            text_content = None
-            is_xml = False
-
-            for format_info in text_url:
-                format_type = format_info.get("type", "")
-                if "XML" in format_type.upper():
-                    format_url = format_info.get("url")
-                    if format_url:
-                        logger.info(f"Fetching XML format from: {format_url}")
-                        async with session.get(format_url) as text_response:
-                            if text_response.status == 200:
-                                text_content = await text_response.text()
-                                is_xml = True
-                                logger.info(f"Successfully fetched XML format ({len(text_content)} chars)")
-                                break
-
-            # Fallback to formatted text if XML not available
-            if not text_content:
-                for format_info in text_url:
-                    if format_info.get("type") == "Formatted Text":
-                        format_url = format_info.get("url")
-                        if format_url:
-                            async with session.get(format_url) as text_response:
-                                if text_response.status == 200:
-                                    text_content = await text_response.text()
-                                    break
-
-            # Last resort - try any available format
-            if not text_content:
-                for format_info in text_url:
-                    format_url = format_info.get("url")
-                    if format_url:
-                        async with session.get(format_url) as text_response:
-                            if text_response.status == 200:
-                                text_content = await text_response.text()
-                                break
-
-            if not text_content:
-                raise ValueError("Could not retrieve bill text content")
-
-            # Parse XML if we got XML format
-            if is_xml:
-                logger.info("Parsing XML bill format")
-                text_content = parse_bill_xml(text_content)
-            
-            # Clean up the text (remove HTML tags if present, etc.)
-            import re
-            # Basic HTML tag removal
-            clean_text = re.sub(r'<[^>]+>', '', text_content)
-            # Remove HTML entities
-            clean_text = re.sub(r'&lt;', '<', clean_text)
-            clean_text = re.sub(r'&gt;', '>', clean_text)
-            clean_text = re.sub(r'&amp;', '&', clean_text)
-            clean_text = re.sub(r'&quot;', '"', clean_text)
-            clean_text = re.sub(r'&apos;', "'", clean_text)
-            # Normalize line endings and clean up whitespace more carefully
-            clean_text = re.sub(r'\r\n', '\n', clean_text)  # Normalize line endings
-            clean_text = re.sub(r'[ \t]+', ' ', clean_text)  # Multiple spaces/tabs to single space
-
-            # Preserve some structure by keeping line breaks around section headers
-            # Look for section patterns and ensure they start on new lines
-            section_patterns = [
-                r'(SEC(?:TION)?\.?\s+\d+[A-Z]?\.)',
-                r'(TITLE\s+[IVX]+)',
-                r'(CHAPTER\s+\d+)',
-                r'(PART\s+[A-Z]+)',
-                r'(SUBTITLE\s+[A-Z]+)'
-            ]
-
-            for pattern in section_patterns:
-                # Ensure section headers start on new lines
-                clean_text = re.sub(f'(?<!^)(?<!\n){pattern}', r'\n\1', clean_text, flags=re.IGNORECASE)
-
-            # Clean up excessive newlines but keep some structure
-            clean_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', clean_text)  # Multiple newlines to double
-            clean_text = clean_text.strip()
-            # Remove document metadata that's not useful for analysis
-            clean_text = re.sub(r'\[Congressional Bills.*?\]', '', clean_text)
-            clean_text = re.sub(r'\[From the U\.S\. Government Publishing Office\]', '', clean_text)
-            clean_text = re.sub(r'&lt;DOC&gt;.*?&lt;/DOC&gt;', '', clean_text, flags=re.DOTALL)
-            
-            return clean_text
-            
     except HTTPException:
         # Let HTTPException propagate up without re-raising as RuntimeError
         raise
@@ -2074,6 +2113,145 @@ async def fetch_bill_text(bill_type: str, bill_number: str, congress: int = 119)
         logger.error(f"Error fetching bill text for {bill_type} {bill_number}: {e}")
         raise RuntimeError(f"Failed to fetch bill text for {bill_type} {bill_number}: {str(e)}")
 
+# Per-section summaries used to update analyses when a bill gets a new text version
+incremental_analyzer = IncrementalAnalyzer(
+    complete_fn=openrouter_completion,
+    summary_cache=SectionSummaryCache(bill_text_store.cache_dir / "section_summaries"),
+)
+
+def _version_label(stored: StoredBillText) -> str:
+    return stored.version_type or stored.version_date or "unknown version"
+
+def _version_artifacts(model: str) -> Dict[str, str]:
+    """Artifact names of a bill version's base analysis and grades for a model"""
+    model_slug = re.sub(r'[^A-Za-z0-9._-]+', '_', model)
+    return {"analysis": f"analysis--{model_slug}.json", "grades": f"grades--{model_slug}.json"}
+
+def base_analysis_key(full_bill_text: str, model: str):
+    """analysis_cache / grades_cache key of the excerpt the legislation pipeline analyzes for this text"""
+    return hashkey(bill_text_hash(legislation_pipeline.prepare(full_bill_text)), model)
+
+def remember_version_analysis(stored: StoredBillText, cache_key, model: str) -> None:
+    """Persist the base analysis and grades of a bill version so a later version can reuse them"""
+    for cache, artifact in zip((analysis_cache, grades_cache), _version_artifacts(model).values()):
+        entry = cache.get(cache_key)
+        if entry is not None:
+            bill_text_store.save_artifact(stored, artifact, json.dumps(entry))
+
+def _load_version_results(stored: StoredBillText, cache_key, model: str) -> Dict[str, Optional[dict]]:
+    """Cached or persisted analysis and grades of a bill version (None where missing)"""
+    results = {}
+    for (stage, artifact), cache in zip(_version_artifacts(model).items(), (analysis_cache, grades_cache)):
+        entry = cache.get(cache_key)
+        if entry is None:
+            stored_entry = bill_text_store.load_artifact(stored, artifact)
+            entry = json.loads(stored_entry) if stored_entry else None
+        results[stage] = entry
+    return results
+
+async def prime_revised_analysis(stored: StoredBillText, bill_title: str, cache_key, model: str) -> None:
+    """
+    Seed the base analysis and grades caches for a new bill version from the previous version.
+
+    Only changed, added and removed sections are summarized (unchanged ones reuse cached
+    summaries), and the prior analysis is updated with a "What Changed" section. Grades are
+    reused only when no section changed: rubric scores judge the bill as a whole and section
+    summaries give nothing to adjust them by, so any substantive change is graded again.
+    Anything that prevents an update simply leaves the full pipeline to run as usual.
+    """
+    current = _load_version_results(stored, cache_key, model)
+    if current["analysis"] is not None:
+        analysis_cache[cache_key] = current["analysis"]
+    if current["grades"] is not None:
+        grades_cache[cache_key] = current["grades"]
+    if cache_key in analysis_cache and cache_key in grades_cache:
+        return
+
+    previous = await bill_text_store.get_previous_stored(congress_client, stored)
+    if previous is None:
+        return
+
+    previous_key = base_analysis_key(f"{bill_title}\n\n{previous.text}", model)
+    prior = _load_version_results(previous, previous_key, model)
+    if prior["analysis"] is None and prior["grades"] is None:
+        return
+
+    logger.info(f"Updating {bill_title} results from {_version_label(previous)} to {_version_label(stored)}")
+    old_index, new_index = await asyncio.gather(
+        bill_text_store.get_section_index(previous),
+        bill_text_store.get_section_index(stored),
+    )
+    diff = diff_section_indexes(old_index, new_index)
+    logger.info(f"Section diff: {len(diff.changed)} changed, {len(diff.added)} added, "
+                f"{len(diff.removed)} removed, {len(diff.unchanged)} unchanged")
+
+    if cache_key not in grades_cache and prior["grades"] is not None and not diff.has_changes:
+        logger.info("New bill version has no section changes, reusing prior grades")
+        grades_cache[cache_key] = prior["grades"]
+
+    if cache_key not in analysis_cache and prior["analysis"] is not None:
+        updated = await incremental_analyzer.update_analysis(
+            prior["analysis"]["analysis"], diff, model,
+            previous_version=_version_label(previous), new_version=_version_label(stored),
+        )
+        if updated:
+            analysis_cache[cache_key] = {"analysis": updated, "generated": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}
+
+# Background pre-analysis of the recommended list for DEFAULT_MODEL, within a daily token budget
+PREANALYSIS_CHARS_PER_TOKEN = 4
+PREANALYSIS_ANALYSIS_OUTPUT_TOKENS = 3000
+PREANALYSIS_GRADES_OUTPUT_TOKENS = 200
+
+async def preanalyze_recommended_bill(bill: dict) -> str:
+    """Prefetch a recommended bill's text and precompute its analysis and grades"""
+    bill_type = bill.get("type", "").upper()
+    bill_number = bill.get("number", "")
+    bill_title = f"{bill_type} {bill_number}"
+
+    stored = await fetch_stored_bill_text(bill_type, bill_number, 119)
+    full_bill_text = f"{bill_title}\n\n{stored.text}"
+
+    # The pipeline analyzes and grades the same excerpt, so both caches share the key
+    processed_text = legislation_pipeline.prepare(full_bill_text)
+    cache_key = hashkey(bill_text_hash(processed_text), DEFAULT_MODEL)
+    input_tokens = len(processed_text) // PREANALYSIS_CHARS_PER_TOKEN
+    estimate = 0
+    if cache_key not in analysis_cache:
+        estimate += input_tokens + PREANALYSIS_ANALYSIS_OUTPUT_TOKENS
+    if cache_key not in grades_cache:
+        estimate += input_tokens + PREANALYSIS_GRADES_OUTPUT_TOKENS
+    if not estimate:
+        return "cached"
+
+    # The full-analysis estimate is only held while the bill is processed; the budget is
+    # charged what the API reports, so incremental updates and cache hits cost what they use
+    with preanalysis_budget.metered(estimate) as usage:
+        logger.info(f"Pre-analyzing {bill_title} (~{estimate} tokens held, {preanalysis_budget.remaining} left today)")
+        result = await legislation_pipeline.run(
+            full_bill_text, DEFAULT_MODEL,
+            prime=lambda: prime_revised_analysis(stored, bill_title, cache_key, DEFAULT_MODEL),
+        )
+    remember_version_analysis(stored, cache_key, DEFAULT_MODEL)
+    if result.get("errors"):
+        return f"partial: {result['errors']}"
+    return f"analyzed ({usage.tokens} tokens, ~{estimate} estimated)"
+
+preanalysis_budget = DailyTokenBudget(
+    int(os.getenv("PREANALYSIS_DAILY_TOKEN_BUDGET", "500000")),
+    state_path=bill_text_store.cache_dir / "preanalysis_budget.json",
+)
+preanalysis_job = PreanalysisJob(preanalyze_recommended_bill, preanalysis_budget)
+
+@app.get("/recommended-bills/preanalysis")
+async def get_preanalysis_status():
+    """Status of the background pre-analysis of recommended bills"""
+    return {
+        "model": DEFAULT_MODEL,
+        "dailyTokenBudget": preanalysis_budget.daily_tokens,
+        "tokensRemainingToday": preanalysis_budget.remaining,
+        "lastRun": preanalysis_job.last_run,
+    }
+
 @app.post("/analyze-recommended-bill")
 async def analyze_recommended_bill(request: dict):
     """Analyze a recommended bill directly"""
@@ -2089,11 +2267,11 @@ async def analyze_recommended_bill(request: dict):
         logger.info(f"Analyzing bill {bill_type} {bill_number} from {congress}th Congress")
         
         # Fetch the full bill text
-        bill_text = await fetch_bill_text(bill_type, bill_number, congress)
+        stored = await fetch_stored_bill_text(bill_type, bill_number, congress)
         
         # Add bill title like the extract endpoint does
         bill_title = f"{bill_type} {bill_number}"
-        full_bill_text = f"{bill_title}\n\n{bill_text}"
+        full_bill_text = f"{bill_title}\n\n{stored.text}"
         
         # Debug logging
         logger.info(f"Fetched bill text length: {len(full_bill_text)}")
@@ -2101,23 +2279,31 @@ async def analyze_recommended_bill(request: dict):
         
         # Log consolidated processing info
         logger.info(f"Processing recommended bill {bill_title} with model {model}")
+
+        # Reuse the previous version's results when only part of the bill changed
+        analysis_key = base_analysis_key(full_bill_text, model)
+        prime = lambda: prime_revised_analysis(stored, bill_title, analysis_key, model)
+
+        if request.get("stream"):
+            async def stream_and_remember():
+                async for event in legislation_pipeline.stream(full_bill_text, model, prime=prime):
+                    yield event
+                remember_version_analysis(stored, analysis_key, model)
+
+            return sse_response(stream_and_remember())
+
+        # Generate both analysis and grades concurrently from a single excerpt
+        result = await legislation_pipeline.run(full_bill_text, model, prime=prime)
+        remember_version_analysis(stored, analysis_key, model)
+        return result
         
-        # Check if we need to process large bill text
-        if len(full_bill_text) > 40000:
-            logger.info(f"Large bill detected ({len(full_bill_text)} chars), extracting key sections for analysis")
-            processed_text = extract_key_bill_sections(full_bill_text, 40000)
-            logger.info(f"Key sections extracted: {len(processed_text)} chars")
-            
-            # Generate both analysis and grades using processed text
-            analysis = await analyze_legislation_text(processed_text, model, skip_extraction=True, user_profile=None)
-            grades = await grade_legislation_text(processed_text, model, skip_extraction=True)
-        else:
-            # Generate both analysis and grades using full text
-            analysis = await analyze_legislation_text(full_bill_text, model, skip_extraction=True, user_profile=None)
-            grades = await grade_legislation_text(full_bill_text, model, skip_extraction=True)
-        
-        return {"analysis": analysis, "grades": grades}
-        
+    except HTTPException:
+        raise
+    except AnalysisError as e:
+        logger.error(f"Error analyzing recommended bill: {e}")
+        if e.timed_out:
+            raise HTTPException(status_code=504, detail="Bill analysis timed out")
+        raise HTTPException(status_code=500, detail="Error analyzing bill")
     except RuntimeError as e:
         # Check if this is a "no text versions available" error or 404 error
         error_str = str(e)
@@ -2250,6 +2436,7 @@ async def extract_recommended_bill_text(request: dict):
 class BillSearchRequest(BaseModel):
     query: str
     limit: int = 20
+    mode: str = "keyword"  # "keyword" or "semantic"
 
 class BillSuggestionsRequest(BaseModel):
     query: str
@@ -2265,7 +2452,7 @@ async def search_bills(request: BillSearchRequest):
         logger.info(f"Searching bills with query: '{request.query}' (limit: {request.limit})")
         
         # Use the bill searcher to find matching bills
-        results = await bill_searcher.search_bills(request.query, request.limit)
+        results = await bill_searcher.search_bills(request.query, request.limit, mode=request.mode)
         
         logger.info(f"Found {len(results)} bills matching query: '{request.query}'")
         
@@ -2275,6 +2462,47 @@ async def search_bills(request: BillSearchRequest):
         logger.error(f"Error in /search-bills endpoint: {e}")
         raise HTTPException(status_code=500, detail="Error searching bills")
 
+@app.get("/congress/metrics")
+async def congress_api_metrics():
+    """Congress.gov request counts, latency percentiles, retries and remaining hourly quota"""
+    return congress_client.metrics_snapshot()
+
+@app.get("/http-cache/stats")
+async def http_cache_stats():
+    """Upstream HTTP cache hits, 304 revalidations, misses, evictions, bytes saved and size on disk"""
+    return http_cache.summary()
+
+@app.get("/search-bills/index")
+async def bill_index_status():
+    """Status of the local bill search index and its last ingestion run"""
+    if not bill_searcher or bill_searcher.index is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "indexed": await asyncio.to_thread(bill_searcher.index.count),
+        "lastRun": bill_indexer.last_run if bill_indexer else {},
+    }
+
+class RelatedTopicsRequest(BaseModel):
+    text: str
+    limit: int = 10
+
+@app.post("/related-topics")
+async def related_topics(request: RelatedTopicsRequest):
+    """Debate topics from topics.txt most semantically similar to a bill title, query or topic"""
+    if semantic_index is None:
+        raise HTTPException(status_code=503, detail="Semantic search is not available")
+    if not request.text.strip():
+        return {"topics": []}
+    try:
+        hits = await asyncio.to_thread(semantic_index.search, "topics", request.text, request.limit)
+    except Exception as e:
+        logger.error(f"Error in /related-topics endpoint: {e}")
+        raise HTTPException(status_code=500, detail="Error finding related topics")
+    if not hits and not semantic_index.size("topics"):
+        raise HTTPException(status_code=503, detail="Topic index is still being built")
+    return {"topics": [{"topic": topic, "score": round(score, 4)} for topic, score in hits]}
+
 @app.post("/search-suggestions")
 async def search_suggestions(request: BillSuggestionsRequest):
     """Get search suggestions for bill queries"""
@@ -2305,7 +2533,7 @@ class BillFromUrlRequest(BaseModel):
 class StateBillFromUrlRequest(BaseModel):
     state: str
     bill_number: str
-    year: Optional[str] = None
+    year: Optional[int] = None
     url: str
 
 @app.post("/extract-bill-from-url")
@@ -2319,73 +2547,54 @@ async def extract_bill_from_url(request: BillFromUrlRequest):
         logger.debug(f"Request data: congress={request.congress}, type={request.type}, number={request.number}")
         
         # Fetch bill information from Congress.gov API
-        url = f"https://api.congress.gov/v3/bill/{request.congress}/{request.type.lower()}/{request.number}"
-        logger.debug(f"Congress API URL: {url}")
+        try:
+            bill_data = await congress_client.get_bill(request.congress, request.type, request.number)
+        except CongressNotFound:
+            logger.error(f"Bill not found: {request.type} {request.number} from {request.congress}th Congress")
+            raise HTTPException(status_code=404, detail="Bill not found in Congress.gov")
+        except RuntimeError as e:
+            logger.error(f"Congress API error fetching bill info: {e}")
+            raise HTTPException(status_code=500, detail="Error fetching bill information from Congress API")
+        
+        # Extract bill information
+        title = bill_data.get("title", f"{request.type.upper()} {request.number}")
+        
+        # Get sponsor information
+        sponsors = bill_data.get("sponsors", [])
+        sponsor_name = "Unknown Sponsor"
+        if sponsors:
+            sponsor = sponsors[0]
+            first_name = sponsor.get("firstName", "")
+            last_name = sponsor.get("lastName", "")
+            party = sponsor.get("party", "")
+            state = sponsor.get("state", "")
+            if last_name:
+                title_prefix = "Rep." if sponsor.get("bioguideId", "").startswith("H") else "Sen."
+                sponsor_name = f"{title_prefix} {first_name} {last_name}"
+                if party and state:
+                    sponsor_name += f" ({party}-{state})"
+        
+        # Create description from title or summary
+        description = title
+        summaries = bill_data.get("summaries", [])
+        if summaries and isinstance(summaries, list) and len(summaries) > 0:
+            latest_summary = summaries[0]
+            if isinstance(latest_summary, dict):
+                summary_text = latest_summary.get("text", "")
+                if summary_text and len(summary_text) > len(title):
+                    description = summary_text[:500] + ("..." if len(summary_text) > 500 else "")
+        else:
+            logger.debug(f"Summaries data type: {type(summaries)}, content: {summaries}")
         
-        params = {
-            "api_key": CONGRESS_API_KEY,
-            "format": "json"
+        return {
+            "title": title,
+            "description": description,
+            "sponsor": sponsor_name,
+            "congress": request.congress,
+            "type": request.type.upper(),
+            "number": request.number
         }
         
-        async with session.get(url, params=params) as response:
-            logger.debug(f"Congress API response status: {response.status}")
-            
-            if response.status == 404:
-                logger.error(f"Bill not found: {request.type} {request.number} from {request.congress}th Congress")
-                raise HTTPException(status_code=404, detail="Bill not found in Congress.gov")
-            elif response.status != 200:
-                response_text = await response.text()
-                logger.error(f"Congress API error fetching bill info: {response.status}, response: {response_text}")
-                raise HTTPException(status_code=500, detail="Error fetching bill information from Congress API")
-            
-            data = await response.json()
-            logger.debug(f"Congress API response data keys: {data.keys() if data else 'None'}")
-            
-            bill_data = data.get("bill", {})
-            
-            if not bill_data:
-                logger.error(f"No bill data in response: {data}")
-                raise HTTPException(status_code=404, detail="Bill not found")
-            
-            # Extract bill information
-            title = bill_data.get("title", f"{request.type.upper()} {request.number}")
-            
-            # Get sponsor information
-            sponsors = bill_data.get("sponsors", [])
-            sponsor_name = "Unknown Sponsor"
-            if sponsors:
-                sponsor = sponsors[0]
-                first_name = sponsor.get("firstName", "")
-                last_name = sponsor.get("lastName", "")
-                party = sponsor.get("party", "")
-                state = sponsor.get("state", "")
-                if last_name:
-                    title_prefix = "Rep." if sponsor.get("bioguideId", "").startswith("H") else "Sen."
-                    sponsor_name = f"{title_prefix} {first_name} {last_name}"
-                    if party and state:
-                        sponsor_name += f" ({party}-{state})"
-            
-            # Create description from title or summary
-            description = title
-            summaries = bill_data.get("summaries", [])
-            if summaries and isinstance(summaries, list) and len(summaries) > 0:
-                latest_summary = summaries[0]
-                if isinstance(latest_summary, dict):
-                    summary_text = latest_summary.get("text", "")
-                    if summary_text and len(summary_text) > len(title):
-                        description = summary_text[:500] + ("..." if len(summary_text) > 500 else "")
-            else:
-                logger.debug(f"Summaries data type: {type(summaries)}, content: {summaries}")
-            
-            return {
-                "title": title,
-                "description": description,
-                "sponsor": sponsor_name,
-                "congress": request.congress,
-                "type": request.type.upper(),
-                "number": request.number
-            }
-            
     except HTTPException:
         raise
     except Exception as e:
@@ -2402,43 +2611,10 @@ async def extract_state_bill_from_url(request: StateBillFromUrlRequest):
         year_info = f" ({request.year})" if request.year else ""
         logger.info(f"Extracting state bill info from URL: {request.state} {request.bill_number}{year_info}")
 
-        # Search for the bill by bill number in the state
-        # LegiScan API doesn't support direct bill lookup by number, so we search
-        bills = await legiscan_service.search_bills(request.state, request.bill_number, limit=50)
-
-        # Find exact match for bill number
-        matching_bill = None
-        for bill in bills:
-            if bill.get("number", "").upper() == request.bill_number.upper():
-                matching_bill = bill
-                break
-
-        if not matching_bill:
-            # If no exact match in search, try getting from current session
-            logger.info(f"No match in search results, trying master list for current session")
-            all_bills = await legiscan_service.get_master_list(request.state, None)
-            for bill in all_bills:
-                if bill.get("number", "").upper() == request.bill_number.upper():
-                    matching_bill = bill
-                    break
-
-        # If still not found and we have a year, try to find the session for that year
-        if not matching_bill and request.year:
-            logger.info(f"Trying to find session for year {request.year}")
-            sessions = await legiscan_service.get_session_list(request.state)
-            for session in sessions:
-                year_start = session.get("year_start")
-                year_end = session.get("year_end")
-                if year_start and year_end:
-                    if int(request.year) >= year_start and int(request.year) <= year_end:
-                        logger.info(f"Found session {session.get('session_id')} for year {request.year}")
-                        session_bills = await legiscan_service.get_master_list(request.state, session.get("session_id"))
-                        for bill in session_bills:
-                            if bill.get("number", "").upper() == request.bill_number.upper():
-                                matching_bill = bill
-                                break
-                        if matching_bill:
-                            break
+        # Indexed (state, session, number) lookup; the session for a year comes from stored session years
+        matching_bill = await legiscan_service.find_bill_by_number(
+            request.state, request.bill_number, request.year
+        )
 
         if not matching_bill:
             logger.error(f"Bill not found: {request.state} {request.bill_number}{year_info}")
@@ -2446,7 +2622,7 @@ async def extract_state_bill_from_url(request: StateBillFromUrlRequest):
             # Provide more helpful error message
             error_detail = f"Bill {request.bill_number} not found in {request.state}."
 
-            if request.year and int(request.year) >= 2025:
+            if request.year and request.year >= 2025:
                 error_detail += f" Note: {request.year} legislative sessions may not have started yet or may not be fully tracked in LegiScan. Try checking if the session is active on your state legislature's website."
             else:
                 error_detail += " The bill may not be available in the LegiScan database, it may be from an archived session, or the session may not be currently tracked."
@@ -2494,6 +2670,19 @@ async def get_states():
         logger.error(f"Error getting state list: {e}")
         raise HTTPException(status_code=500, detail="Error getting state list")
 
+@app.get("/legiscan/sync")
+async def legiscan_sync_status():
+    """Status of the local LegiScan store, its last change_hash sync and imported bulk datasets"""
+    if not legiscan_syncer:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "stored": await asyncio.to_thread(legiscan_syncer.store.counts),
+        "lastRun": legiscan_syncer.last_run,
+        "datasets": await asyncio.to_thread(legiscan_syncer.store.dataset_sessions),
+        "lastDatasetRun": legiscan_importer.last_run if legiscan_importer else {},
+    }
+
 @app.get("/state-sessions/{state}")
 async def get_state_sessions(state: str):
     """Get legislative sessions for a state"""
@@ -2510,14 +2699,25 @@ async def get_state_sessions(state: str):
         raise HTTPException(status_code=500, detail=f"Error getting sessions for {state}")
 
 @app.get("/state-bills/{state}")
-async def get_state_bills(state: str, session_id: Optional[int] = None):
-    """Get bills for a state session"""
+async def get_state_bills(state: str, session_id: Optional[int] = None, offset: int = 0, limit: int = 20,
+                          sort: str = "diversified", bill_type: Optional[str] = None, status: Optional[str] = None):
+    """
+    Page through the full master list of a state session.
+
+    sort is one of diversified (round-robin across bill types, the default), recent, oldest,
+    number or title; bill_type ("SB") and status ("Passed") filter the list.
+    """
     try:
         if not legiscan_service:
             raise HTTPException(status_code=503, detail="LegiScan service not available. API key may be missing.")
-
-        bills = await legiscan_service.get_master_list(state.upper(), session_id)
-        return {"bills": bills[:20]}  # Return 20 most recent bills
+        if sort not in MASTER_LIST_SORTS:
+            raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(MASTER_LIST_SORTS)}")
+
+        columns = await legiscan_service.get_master_columns(state.upper(), session_id)
+        if columns is None:
+            return {"bills": [], "total": 0, "offset": offset, "limit": limit, "types": {}, "statuses": {}}
+        bills, total = columns.page(max(offset, 0), min(max(limit, 1), 100), sort, bill_type, status)
+        return {"bills": bills, "total": total, "offset": offset, "limit": limit, **columns.facets()}
     except HTTPException:
         raise
     except Exception as e:
@@ -2624,6 +2824,7 @@ class AnalyzeStateBillRequest(BaseModel):
     bill_id: int
     model: str = DEFAULT_MODEL
     userProfile: dict = None
+    stream: bool = False  # Stream analysis and grades as Server-Sent Events
 
 @app.post("/analyze-state-bill")
 async def analyze_state_bill(request: AnalyzeStateBillRequest):
@@ -2664,21 +2865,11 @@ async def analyze_state_bill(request: AnalyzeStateBillRequest):
         # Log consolidated processing info
         logger.info(f"Processing state bill {bill.get('number', '')} with model {request.model}")
 
-        # Check if we need to process large bill text
-        if len(full_text) > 40000:
-            logger.info(f"Large bill detected ({len(full_text)} chars), extracting key sections for analysis")
-            processed_text = extract_key_bill_sections(full_text, 40000)
-            logger.info(f"Key sections extracted: {len(processed_text)} chars")
+        if request.stream:
+            return sse_response(legislation_pipeline.stream(full_text, request.model, user_profile=request.userProfile))
 
-            # Generate both analysis and grades using processed text
-            analysis = await analyze_legislation_text(processed_text, request.model, skip_extraction=True, user_profile=request.userProfile)
-            grades = await grade_legislation_text(processed_text, request.model, skip_extraction=True)
-        else:
-            # Generate both analysis and grades using full text
-            analysis = await analyze_legislation_text(full_text, request.model, skip_extraction=True, user_profile=request.userProfile)
-            grades = await grade_legislation_text(full_text, request.model, skip_extraction=True)
-
-        return {"analysis": analysis, "grades": grades}
+        # Generate both analysis and grades concurrently from a single excerpt
+        return await legislation_pipeline.run(full_text, request.model, user_profile=request.userProfile)
     except HTTPException:
         raise
     except Exception as e:
@@ -2736,6 +2927,7 @@ class AnalyzeCAPropositionRequest(BaseModel):
     prop_id: str
     model: str = DEFAULT_MODEL
     userProfile: dict = None
+    stream: bool = False  # Stream analysis and grades as Server-Sent Events
 
 @app.post("/analyze-ca-proposition")
 async def analyze_ca_proposition(request: AnalyzeCAPropositionRequest):
@@ -2758,21 +2950,11 @@ async def analyze_ca_proposition(request: AnalyzeCAPropositionRequest):
         # Log processing info
         logger.info(f"Processing CA Prop {prop_data['number']} with model {request.model}")
 
-        # Check if we need to process large text
-        if len(full_text) > 40000:
-            logger.info(f"Large proposition detected ({len(full_text)} chars), extracting key sections")
-            processed_text = extract_key_bill_sections(full_text, 40000)
-            logger.info(f"Key sections extracted: {len(processed_text)} chars")
+        if request.stream:
+            return sse_response(legislation_pipeline.stream(full_text, request.model, user_profile=request.userProfile))
 
-            # Generate analysis and grades
-            analysis = await analyze_legislation_text(processed_text, request.model, skip_extraction=True, user_profile=request.userProfile)
-            grades = await grade_legislation_text(processed_text, request.model, skip_extraction=True)
-        else:
-            # Generate analysis and grades using full text
-            analysis = await analyze_legislation_text(full_text, request.model, skip_extraction=True, user_profile=request.userProfile)
-            grades = await grade_legislation_text(full_text, request.model, skip_extraction=True)
-
-        return {"analysis": analysis, "grades": grades}
+        # Generate analysis and grades concurrently from a single excerpt
+        return await legislation_pipeline.run(full_text, request.model, user_profile=request.userProfile)
     except HTTPException:
         raise
     except Exception as e:
@@ -2783,29 +2965,73 @@ async def analyze_ca_proposition(request: AnalyzeCAPropositionRequest):
 # TEXT-TO-SPEECH ENDPOINTS
 # ============================================================================
 
-# Import TTS service
+# Import TTS worker
 import sys
 sys.path.append('speech_utils')
-from speech_utils.tts_service import GoogleTTSService
-
-# Initialize TTS service
-tts_service = GoogleTTSService()
+from speech_utils.tts_worker import TTSWorker, TTSError, TTSOverloaded, TTSTimeout
+from speech_utils.debate_audio import DebateAudioPipeline
+
+# Synthesis runs on the worker's own bounded thread pool (TTS_BACKEND=local for a credential-free stand-in)
+tts_worker = TTSWorker.from_env()
+
+def tts_http_error(error: TTSError) -> HTTPException:
+    if isinstance(error, TTSOverloaded):
+        return HTTPException(status_code=503, detail="TTS service is busy, try again shortly")
+    if isinstance(error, TTSTimeout):
+        return HTTPException(status_code=504, detail="TTS synthesis timed out")
+    return HTTPException(status_code=500, detail=f"Failed to synthesize speech: {str(error)}")
+
+async def synthesize_tts_audio(text: str, voice_name: str, rate: float = 1.0,
+                               pitch: float = 0.0, volume: float = 1.0) -> bytes:
+    """Synthesize through the TTS worker as parallel sentence chunks, mapping failures to HTTP errors"""
+    try:
+        return await tts_worker.synthesize_chunked(text, voice_name, rate=rate, pitch=pitch, volume=volume)
+    except TTSError as e:
+        raise tts_http_error(e)
+
+async def stream_tts_audio(text: str, voice_name: str, rate: float = 1.0,
+                           pitch: float = 0.0, volume: float = 1.0) -> StreamingResponse:
+    """Binary audio response sent chunk by chunk; the first chunk is awaited so failures still get an HTTP status"""
+    chunks = tts_worker.stream(text, voice_name, rate=rate, pitch=pitch, volume=volume)
+    try:
+        first = tts_worker.backend.stream_part(await chunks.__anext__(), first=True)
+    except StopAsyncIteration:
+        first = b""
+    except TTSError as e:
+        raise tts_http_error(e)
+
+    async def body():
+        yield first
+        try:
+            async for audio in chunks:
+                yield tts_worker.backend.stream_part(audio, first=False)
+        except TTSError as e:
+            # Headers are already sent; end the audio early rather than break the connection
+            logger.error(f"TTS stream ended early: {e}")
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(body(), media_type=tts_worker.backend.mime_type, headers={
+        "Cache-Control": "no-cache",
+        "X-Voice-Used": voice_name,
+    })
 
 @app.get("/tts/health")
 async def tts_health():
     """Check TTS service health"""
     try:
-        if tts_service.client:
+        backend = tts_worker.backend
+        if backend.available:
             return {
                 "status": "healthy",
-                "service": "google-tts",
+                "service": backend.name,
                 "credentials_loaded": True,
                 "message": "TTS service is running and ready"
             }
         else:
             return {
                 "status": "unhealthy",
-                "service": "google-tts",
+                "service": backend.name,
                 "credentials_loaded": False,
                 "message": "TTS service not initialized"
             }
@@ -2813,16 +3039,33 @@ async def tts_health():
         logger.error(f"TTS health check error: {e}")
         return {
             "status": "error",
-            "service": "google-tts",
+            "service": tts_worker.backend.name,
             "error": str(e)
         }
 
+@app.get("/tts/metrics")
+async def tts_metrics():
+    """TTS worker queue depth, counters, wait/latency percentiles and audio cache hit rate"""
+    return tts_worker.stats()
+
+@app.get("/tts/audio/{key}")
+async def get_tts_audio(key: str):
+    """Audio prepared ahead of playback (e.g. announced by a debate audio_ready event)"""
+    if not re.fullmatch(r"[0-9a-f]{64}", key):
+        raise HTTPException(status_code=400, detail="Invalid audio key")
+    audio = await tts_worker.cached_audio(key)
+    if audio is None:
+        raise HTTPException(status_code=404, detail="Audio not found or evicted, synthesize it again")
+    # Keys are content hashes, so the audio never changes
+    return Response(content=audio, media_type=tts_worker.backend.mime_type,
+                    headers={"Cache-Control": "public, max-age=86400, immutable"})
+
 @app.get("/tts/voices")
 async def get_tts_voices():
     """Get available TTS voices"""
     try:
-        voices = tts_service.get_available_voices()
-        default_voice = tts_service.get_default_voice()
+        voices = tts_worker.backend.get_available_voices()
+        default_voice = tts_worker.backend.get_default_voice()
         
         return {
             "success": True,
@@ -2840,36 +3083,47 @@ class TTSRequest(BaseModel):
     rate: float = 1.0
     pitch: float = 0.0
     volume: float = 1.0
+    response_format: str = "json"  # "json" (base64 audio_content) or "stream" (chunked binary audio)
 
 @app.post("/tts/synthesize")
 async def synthesize_speech(request: TTSRequest):
-    """Synthesize speech from text"""
+    """Synthesize speech from text, as base64 JSON or as streamed binary audio"""
     try:
         if not request.text or request.text.strip() == "":
             raise HTTPException(status_code=400, detail="Text is required")
+        if request.response_format not in ("json", "stream"):
+            raise HTTPException(status_code=400, detail="response_format must be 'json' or 'stream'")
         
         # Use default voice if none specified
-        voice_name = request.voice_name or tts_service.get_default_voice()
+        voice_name = request.voice_name or tts_worker.backend.get_default_voice()
+        
+        if request.response_format == "stream":
+            # Playable as soon as the first sentence chunk is synthesized
+            return await stream_tts_audio(
+                request.text,
+                voice_name,
+                rate=request.rate,
+                pitch=request.pitch,
+                volume=request.volume
+            )
         
-        # Synthesize speech
-        audio_content = tts_service.synthesize_speech(
-            text=request.text,
-            voice_name=voice_name,
+        # Synthesize speech off the event loop
+        audio = await synthesize_tts_audio(
+            request.text,
+            voice_name,
             rate=request.rate,
             pitch=request.pitch,
             volume=request.volume
         )
         
-        if audio_content:
-            return {
-                "success": True,
-                "audio_content": audio_content,
-                "voice_used": voice_name,
-                "text_length": len(request.text),
-                "message": "Speech synthesized successfully"
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to synthesize speech")
+        return {
+            "success": True,
+            "audio_content": base64.b64encode(audio).decode("utf-8"),
+            "mime_type": tts_worker.backend.mime_type,
+            "voice_used": voice_name,
+            "text_length": len(request.text),
+            "message": "Speech synthesized successfully"
+        }
             
     except HTTPException:
         raise
@@ -2882,23 +3136,21 @@ async def test_tts():
     """Test TTS with sample text"""
     try:
         test_text = "Hello! This is a test of the DebateSim text-to-speech system. The voice should sound natural and clear."
+        voice_name = tts_worker.backend.get_default_voice()
         
-        audio_content = tts_service.synthesize_speech(
-            text=test_text,
-            voice_name=tts_service.get_default_voice()
-        )
+        audio = await synthesize_tts_audio(test_text, voice_name)
         
-        if audio_content:
-            return {
-                "success": True,
-                "audio_content": audio_content,
-                "test_text": test_text,
-                "voice_used": tts_service.get_default_voice(),
-                "message": "TTS test successful"
-            }
-        else:
-            raise HTTPException(status_code=500, detail="TTS test failed")
+        return {
+            "success": True,
+            "audio_content": base64.b64encode(audio).decode("utf-8"),
+            "mime_type": tts_worker.backend.mime_type,
+            "test_text": test_text,
+            "voice_used": voice_name,
+            "message": "TTS test successful"
+        }
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"TTS test error: {e}")
         raise HTTPException(status_code=500, detail=f"TTS test error: {str(e)}")
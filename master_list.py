@@ -0,0 +1,123 @@
+"""
+Columnar view of one legislative session's full master list.
+
+A master list is held as parallel arrays (ids, bill type and status codes, action dates,
+numeric bill numbers) plus tuples of the text fields, instead of one dict per bill. Filters
+are boolean masks over the code arrays, sort orders are argsorts computed once at build time
+(including the round-robin "diversified" order across bill types), and listing dicts are only
+materialized for the requested page.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_TYPE = re.compile(r"^([A-Z]+)")
+_DIGITS = re.compile(r"(\d+)")
+
+SORTS = ("diversified", "recent", "oldest", "number", "title")
+
+# Text fields kept column-wise; rebuilt into listing records for each page
+_TEXT_FIELDS = ("number", "title", "description", "lastAction", "url", "stateLink", "changeHash")
+
+
+class MasterListColumns:
+    """Full master list of a session in columnar form, with filtered and sorted pagination"""
+
+    def __init__(self, bills: List[Dict[str, Any]]):
+        """
+        Args:
+            bills: Listing records (the get_master_list format), in any order
+        """
+        self.size = len(bills)
+        self.ids = np.array([bill.get("id") or 0 for bill in bills], dtype=np.int64)
+        self.text = {name: tuple(bill.get(name, "") or "" for bill in bills) for name in _TEXT_FIELDS}
+        self.dates = np.array([bill.get("lastActionDate", "") or "" for bill in bills], dtype="U10")
+
+        bill_types = [self._bill_type(bill.get("number", "")) for bill in bills]
+        self.types, type_codes = np.unique(np.array(bill_types, dtype=str), return_inverse=True)
+        self.type_codes = type_codes.astype(np.int16)
+        statuses = [bill.get("status", "") or "" for bill in bills]
+        self.statuses, status_codes = np.unique(np.array(statuses, dtype=str), return_inverse=True)
+        self.status_codes = status_codes.astype(np.int16)
+        number_values = [_DIGITS.search(bill.get("number", "") or "") for bill in bills]
+        self.number_values = np.array([int(m.group(1)) if m else 0 for m in number_values], dtype=np.int64)
+
+        # Most recent action first; ties keep master list order
+        _, date_rank = np.unique(self.dates, return_inverse=True)
+        recent = np.argsort(-date_rank, kind="stable")
+        titles = np.char.lower(np.array(self.text["title"], dtype=str))
+        self.orders = {
+            "recent": recent,
+            "oldest": np.argsort(date_rank, kind="stable"),
+            "number": np.lexsort((self.number_values, self.type_codes)),
+            "title": np.argsort(titles, kind="stable"),
+            "diversified": self._diversified(recent),
+        }
+
+    @staticmethod
+    def _bill_type(number: str) -> str:
+        """Bill type prefix, e.g. "SB" from "SB 123" (empty when the number has none)"""
+        match = _TYPE.match(number)
+        return match.group(1) if match else ""
+
+    def _diversified(self, recent: np.ndarray) -> np.ndarray:
+        """Round-robin across bill types, most recent first within each type"""
+        # Mix of SB, AB, HR, etc. instead of a page of just one type
+        by_type: Dict[int, List[int]] = {}
+        for row in recent.tolist():
+            by_type.setdefault(int(self.type_codes[row]), []).append(row)
+        queues = list(by_type.values())
+        order: List[int] = []
+        for i in range(max((len(queue) for queue in queues), default=0)):
+            order.extend(queue[i] for queue in queues if i < len(queue))
+        return np.array(order, dtype=np.int64)
+
+    def _mask(self, bill_type: Optional[str], status: Optional[str]) -> Optional[np.ndarray]:
+        mask = None
+        if bill_type:
+            matches = np.flatnonzero(self.types == bill_type.upper())
+            mask = self.type_codes == (matches[0] if len(matches) else -1)
+        if status:
+            matches = np.flatnonzero(np.char.lower(self.statuses) == status.lower())
+            status_mask = self.status_codes == (matches[0] if len(matches) else -1)
+            mask = status_mask if mask is None else mask & status_mask
+        return mask
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Listing record of one row"""
+        text = {name: column[row] for name, column in self.text.items()}
+        return {
+            "id": int(self.ids[row]),
+            "number": text["number"],
+            "title": text["title"],
+            "description": text["description"],
+            "status": str(self.statuses[self.status_codes[row]]),
+            "lastAction": text["lastAction"],
+            "lastActionDate": str(self.dates[row]),
+            "url": text["url"],
+            "stateLink": text["stateLink"],
+            "sponsor": "",  # Sponsors not available in master list
+            "changeHash": text["changeHash"],
+        }
+
+    def page(self, offset: int = 0, limit: int = 20, sort: str = "diversified",
+             bill_type: Optional[str] = None, status: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Listing records of one page and the number of bills matching the filters"""
+        if sort not in self.orders:
+            raise ValueError(f"Unknown sort '{sort}', expected one of {', '.join(SORTS)}")
+        order = self.orders[sort]
+        mask = self._mask(bill_type, status)
+        if mask is not None:
+            order = order[mask[order]]
+        rows = order[offset:offset + limit]
+        return [self.record(row) for row in rows.tolist()], len(order)
+
+    def facets(self) -> Dict[str, Dict[str, int]]:
+        """Bill counts per type and per status, for filter controls"""
+        type_counts = np.bincount(self.type_codes, minlength=len(self.types))
+        status_counts = np.bincount(self.status_codes, minlength=len(self.statuses))
+        return {
+            "types": {str(t): int(c) for t, c in zip(self.types, type_counts) if t},
+            "statuses": {str(s): int(c) for s, c in zip(self.statuses, status_counts) if s},
+        }
@@ -0,0 +1,170 @@
+"""
+Background pre-analysis of recommended bills.
+
+When the recommended bill list refreshes, each bill's text is prefetched and its analysis
+and grades are computed ahead of time, within a daily token budget.
+"""
+import asyncio
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetExceeded(Exception):
+    """Raised when a job would exceed the remaining daily token budget"""
+
+
+class TokenUsage:
+    """Tokens reported by the API responses received inside a metered block"""
+
+    def __init__(self):
+        self.tokens = 0
+
+
+_current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("preanalysis_usage", default=None)
+
+
+def record_usage(usage: Optional[Dict[str, Any]]) -> None:
+    """Count an API response's `usage` towards the metered block the call runs in, if any"""
+    meter = _current_usage.get()
+    if meter is not None and usage:
+        meter.tokens += int(usage.get("total_tokens") or 0)
+
+
+class DailyTokenBudget:
+    """Token allowance that resets at midnight UTC, optionally persisted across restarts"""
+
+    def __init__(self, daily_tokens: int, state_path: Optional[Path] = None):
+        self.daily_tokens = daily_tokens
+        self.state_path = Path(state_path) if state_path else None
+        self._day = ""
+        self._spent = 0
+        self._load()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _load(self) -> None:
+        if not self.state_path or not self.state_path.exists():
+            return
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            self._day, self._spent = state["day"], int(state["spent"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable token budget state: {e}")
+
+    def _save(self) -> None:
+        if not self.state_path:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps({"day": self._day, "spent": self._spent}), encoding="utf-8")
+
+    def _roll_over(self) -> None:
+        today = self._today()
+        if self._day != today:
+            self._day, self._spent = today, 0
+
+    @property
+    def remaining(self) -> int:
+        self._roll_over()
+        return max(0, self.daily_tokens - self._spent)
+
+    def reserve(self, tokens: int) -> None:
+        """Spend tokens from today's budget or raise BudgetExceeded"""
+        if tokens > self.remaining:
+            raise BudgetExceeded(f"needs ~{tokens} tokens, {self.remaining} left today")
+        self._spent += tokens
+        self._save()
+
+    @contextmanager
+    def metered(self, estimate: int) -> Iterator[TokenUsage]:
+        """
+        Reserve an estimate for a block of work, then charge what it actually used.
+
+        The estimate is held while the block runs (so concurrent jobs cannot overspend);
+        afterwards it is replaced by the usage recorded with record_usage(), refunding
+        whatever cache hits or incremental updates saved.
+        """
+        self.reserve(estimate)
+        day = self._day
+        usage = TokenUsage()
+        token = _current_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _current_usage.reset(token)
+            self._roll_over()
+            if self._day == day:
+                self._spent = max(0, self._spent - estimate + usage.tokens)
+            else:
+                self._spent += usage.tokens
+            self._save()
+
+
+class PreanalysisJob:
+    """Runs a per-bill coroutine over the latest recommended list, one background run at a time"""
+
+    def __init__(self, worker: Callable[[Dict[str, Any]], Awaitable[Optional[str]]],
+                 budget: DailyTokenBudget, concurrency: int = 2):
+        """
+        Args:
+            worker: Coroutine pre-analyzing one bill; returns a short status string
+            budget: Daily token budget (checked by the worker via reserve())
+            concurrency: Bills pre-analyzed at the same time
+        """
+        self.worker = worker
+        self.budget = budget
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[List[Dict[str, Any]]] = None
+        self.last_run: Dict[str, Any] = {}
+
+    def schedule(self, bills: List[Dict[str, Any]]) -> None:
+        """Queue a pre-analysis run for these bills; a run already in progress picks them up next"""
+        if self.budget.daily_tokens <= 0:
+            return
+        self._pending = list(bills)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._pending is not None:
+            bills, self._pending = self._pending, None
+            started = datetime.now(timezone.utc)
+            results: Dict[str, str] = {}
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def process(bill: Dict[str, Any]) -> None:
+                bill_id = bill.get("id") or f"{bill.get('type')}{bill.get('number')}"
+                async with semaphore:
+                    try:
+                        results[bill_id] = await self.worker(bill) or "done"
+                    except BudgetExceeded as e:
+                        results[bill_id] = f"skipped: {e}"
+                    except Exception as e:
+                        logger.warning(f"Pre-analysis failed for {bill_id}: {e}")
+                        results[bill_id] = f"failed: {e}"
+
+            await asyncio.gather(*(process(bill) for bill in bills))
+            self.last_run = {
+                "started": started.isoformat(),
+                "finished": datetime.now(timezone.utc).isoformat(),
+                "results": results,
+                "tokens_remaining_today": self.budget.remaining,
+            }
+            logger.info(f"Pre-analysis run finished: {results}")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
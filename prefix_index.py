@@ -0,0 +1,164 @@
+"""
+Prefix index for search-box typeahead.
+
+Suggestion phrases (bill titles, bill numbers, sponsor names, popular terms and searched
+queries) are kept as weighted keys in one sorted array. A prefix lookup is a bisect into
+that array followed by a top-k over the matching range; the top-k for prefixes of up to three
+letters is precomputed at build time and longer prefixes are memoized, so lookups never
+touch the network and take microseconds.
+"""
+import bisect
+import heapq
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]+", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+
+# Keys are sorted strings; every key starting with `prefix` sorts before prefix + _RANGE_END
+_RANGE_END = "\U0010ffff"
+
+
+def normalize_key(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ("H.R. 40" -> "hr 40")"""
+    return _SPACES.sub(" ", _NON_WORD.sub("", text.lower())).strip()
+
+
+class PrefixIndex:
+    """Weighted phrases grouped by source (a bill, a sponsor, a term), searchable by prefix"""
+
+    def __init__(self, max_words_per_phrase: int = 8, precompute_depth: int = 3,
+                 precompute_k: int = 10, memo_size: int = 4096):
+        """
+        Args:
+            max_words_per_phrase: Phrases are also indexed from each of their first N word starts,
+                so "insulin" finds "Affordable Insulin Now Act"
+            precompute_depth: Prefixes up to this length get their top-k computed at build time
+            precompute_k: Suggestions kept for precomputed and memoized prefixes
+            memo_size: Longer prefixes whose top-k is remembered until the next rebuild
+        """
+        self.max_words_per_phrase = max_words_per_phrase
+        self.precompute_depth = precompute_depth
+        self.precompute_k = precompute_k
+        self.memo_size = memo_size
+
+        self._sources: Dict[str, List[Tuple[str, float]]] = {}
+        self._keys: List[str] = []
+        self._items: List[Tuple[str, float]] = []  # (display, weight), parallel to _keys
+        self._precomputed: Dict[str, List[str]] = {}
+        self._memo: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()  # Guards the built arrays and memo
+        # Sources are updated on the event loop while rebuild() runs in a worker thread
+        self._sources_lock = threading.Lock()
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def set_source(self, source_id: str, phrases: Iterable[Tuple[str, float]]) -> None:
+        """Replace the (display phrase, weight) pairs contributed by one source; call rebuild() after"""
+        phrases = [(phrase, weight) for phrase, weight in phrases if phrase]
+        with self._sources_lock:
+            self._sources[source_id] = phrases
+            self.dirty = True
+
+    def remove_source(self, source_id: str) -> None:
+        with self._sources_lock:
+            if self._sources.pop(source_id, None) is not None:
+                self.dirty = True
+
+    def get_source(self, source_id: str) -> Optional[List[Tuple[str, float]]]:
+        with self._sources_lock:
+            return self._sources.get(source_id)
+
+    def _expand(self, phrase: str) -> List[str]:
+        """Keys for a phrase: the whole phrase and the suffixes starting at its first few word starts"""
+        key = normalize_key(phrase)
+        if not key:
+            return []
+        keys = [key]
+        position = 0
+        for _ in range(self.max_words_per_phrase - 1):
+            position = key.find(" ", position) + 1
+            if position == 0:
+                break
+            keys.append(key[position:])
+        return keys
+
+    @staticmethod
+    def _top(items: List[Tuple[str, float]], k: int) -> List[str]:
+        # A phrase appears once per word start, so the best few are usually distinct among the top 3k
+        candidates = heapq.nlargest(3 * k, items, key=lambda item: (item[1], item[0]))
+        top = list(dict.fromkeys(display for display, _ in candidates))
+        if len(top) >= k or len(candidates) == len(items):
+            return top[:k]
+
+        best: Dict[str, float] = {}
+        for display, weight in items:
+            if weight > best.get(display, float("-inf")):
+                best[display] = weight
+        return [display for display, _ in heapq.nlargest(k, best.items(), key=lambda pair: (pair[1], pair[0]))]
+
+    def rebuild(self) -> None:
+        """Re-sort the key array from the current sources and refresh precomputed prefixes"""
+        # Sources changed after the snapshot mark the index dirty again for the next rebuild
+        with self._sources_lock:
+            sources = list(self._sources.values())
+            self.dirty = False
+        pairs = sorted(
+            (key, (display, weight))
+            for phrases in sources
+            for display, weight in phrases
+            for key in self._expand(display)
+        )
+        keys = [key for key, _ in pairs]
+        items = [item for _, item in pairs]
+
+        grouped: Dict[str, List[Tuple[str, float]]] = {}
+        for key, item in pairs:
+            for depth in range(1, min(self.precompute_depth, len(key)) + 1):
+                grouped.setdefault(key[:depth], []).append(item)
+        precomputed = {prefix: self._top(group, self.precompute_k) for prefix, group in grouped.items()}
+
+        with self._lock:
+            self._keys, self._items, self._precomputed = keys, items, precomputed
+            self._memo = OrderedDict()
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[str]:
+        """Highest weighted phrases with a key starting with `prefix`"""
+        prefix = normalize_key(prefix)
+        if not prefix:
+            return []
+        if limit <= self.precompute_k:
+            if prefix in self._precomputed:
+                return self._precomputed[prefix][:limit]
+            with self._lock:
+                memoized = self._memo.get(prefix)
+                if memoized is not None:
+                    self._memo.move_to_end(prefix)
+                    return memoized[:limit]
+
+        with self._lock:
+            keys, items = self._keys, self._items
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + _RANGE_END, start)
+        # Phrases matching the whole input ("hr 40") come before longer completions ("hr 4024")
+        exact_end = bisect.bisect_right(keys, prefix, start, end)
+        top = self._top(items[start:exact_end], max(limit, self.precompute_k))
+        top += [display for display in self._top(items[exact_end:end], max(limit, self.precompute_k) + len(top))
+                if display not in top]
+        top = top[:max(limit, self.precompute_k)]
+
+        if limit <= self.precompute_k:
+            with self._lock:
+                if keys is self._keys:
+                    self._memo[prefix] = top
+                    if len(self._memo) > self.memo_size:
+                        self._memo.popitem(last=False)
+        return top[:limit]
+
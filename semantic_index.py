@@ -0,0 +1,199 @@
+"""
+Semantic search over bills and debate topics with local sentence embeddings.
+
+Each collection (e.g. "bills", "topics") is stored as one contiguous float32 matrix of
+L2-normalized embeddings on disk, memory-mapped for search, plus a JSON sidecar with the
+row ids and text hashes. Only new or changed texts are encoded, in batches, and a query is
+a single matrix-vector product followed by a partial sort for the top k rows.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_SEARCH_AVAILABLE = True
+except ImportError:
+    SEMANTIC_SEARCH_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+
+class EmbeddingCollection:
+    """Row-addressable float32 embedding matrix backed by a file and memory-mapped for reads"""
+
+    def __init__(self, directory: Path, name: str, dim: int, model_name: str):
+        self.matrix_path = Path(directory) / f"{name}.f32"
+        self.meta_path = Path(directory) / f"{name}.json"
+        self.dim = dim
+        self.model_name = model_name
+        self.ids: List[str] = []
+        self.hashes: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # (matrix, ids) published together for searches running while write() is in progress;
+        # ids, hashes and _rows are only touched by the single writer
+        self._view: Tuple[Optional[np.memmap], List[str]] = (None, [])
+        self._load()
+
+    def _load(self) -> None:
+        if not self.meta_path.exists() or not self.matrix_path.exists():
+            return
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable embedding metadata {self.meta_path}: {e}")
+            return
+        if meta.get("model") != self.model_name or meta.get("dim") != self.dim:
+            logger.info(f"Embedding model changed for {self.meta_path.stem}, re-encoding")
+            return
+        rows = self.matrix_path.stat().st_size // (4 * self.dim)
+        if rows != len(meta["ids"]):
+            logger.warning(f"Embedding matrix {self.matrix_path} does not match its metadata, re-encoding")
+            return
+        self.ids, self.hashes = meta["ids"], meta["hashes"]
+        self._rows = {item_id: row for row, item_id in enumerate(self.ids)}
+        self._map()
+
+    def _map(self) -> None:
+        matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(len(self.ids), self.dim)) if self.ids else None
+        self._view = (matrix, list(self.ids))
+
+    def _save_meta(self) -> None:
+        tmp_path = self.meta_path.with_name(f"{self.meta_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"model": self.model_name, "dim": self.dim, "ids": self.ids, "hashes": self.hashes}),
+                            encoding="utf-8")
+        os.replace(tmp_path, self.meta_path)
+
+    def __len__(self) -> int:
+        return len(self._view[1])
+
+    def stale(self, items: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        """(id, text, hash) of items that are new or whose text changed"""
+        pending = []
+        for item_id, text in items:
+            text_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+            row = self._rows.get(item_id)
+            if row is None or self.hashes[row] != text_hash:
+                pending.append((item_id, text, text_hash))
+        return pending
+
+    def write(self, entries: List[Tuple[str, str]], vectors: np.ndarray) -> None:
+        """Store vectors for (id, hash) entries: changed rows are overwritten in place, new rows appended"""
+        self.matrix_path.parent.mkdir(parents=True, exist_ok=True)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        appended = []
+        # The published view stays readable: overwritten rows keep their ids and appended
+        # rows are outside its shape until _map() publishes the new one
+        if self.ids:
+            updates = [(self._rows[item_id], i) for i, (item_id, _) in enumerate(entries) if item_id in self._rows]
+            if updates:
+                writable = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(len(self.ids), self.dim))
+                for row, i in updates:
+                    writable[row] = vectors[i]
+                    self.hashes[row] = entries[i][1]
+                writable.flush()
+                del writable
+        for i, (item_id, text_hash) in enumerate(entries):
+            if item_id not in self._rows:
+                self._rows[item_id] = len(self.ids)
+                self.ids.append(item_id)
+                self.hashes.append(text_hash)
+                appended.append(i)
+        if appended:
+            with open(self.matrix_path, "ab") as f:
+                f.write(vectors[appended].tobytes())
+        self._save_meta()
+        self._map()
+
+    def search(self, query_vector: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Top k (id, cosine similarity) pairs"""
+        matrix, ids = self._view
+        if matrix is None or k <= 0:
+            return []
+        scores = matrix @ query_vector.astype(np.float32)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[row], float(scores[row])) for row in top]
+
+
+class SemanticIndex:
+    """Sentence-embedding collections sharing one encoder model"""
+
+    def __init__(self, directory: Path, model_name: str = DEFAULT_MODEL, batch_size: int = 64, encoder: Any = None):
+        """
+        Args:
+            directory: Where collection matrices are stored
+            model_name: sentence-transformers model
+            batch_size: Texts encoded per batch at ingest
+            encoder: Preloaded model (loaded lazily from model_name when omitted)
+        """
+        self.directory = Path(directory)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._encoder = encoder
+        self._collections: Dict[str, EmbeddingCollection] = {}
+        self._lock = threading.Lock()  # One writer (update) at a time
+        # Searches and updates run in different threads; both may load the encoder or open a collection
+        self._encoder_lock = threading.Lock()
+        self._collections_lock = threading.Lock()
+
+    @property
+    def encoder(self) -> Any:
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    if not SEMANTIC_SEARCH_AVAILABLE:
+                        raise RuntimeError("sentence-transformers is not installed")
+                    logger.info(f"Loading sentence embedding model {self.model_name}")
+                    self._encoder = SentenceTransformer(self.model_name)
+        return self._encoder
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.encoder.encode(texts, batch_size=self.batch_size, normalize_embeddings=True,
+                                   convert_to_numpy=True, show_progress_bar=False)
+
+    def collection(self, name: str) -> EmbeddingCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            dim = self.encoder.get_sentence_embedding_dimension()
+            with self._collections_lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    collection = EmbeddingCollection(self.directory, name, dim, self.model_name)
+                    self._collections[name] = collection
+        return collection
+
+    def size(self, name: str) -> int:
+        return len(self._collections[name]) if name in self._collections else 0
+
+    def update(self, name: str, items: Iterable[Tuple[str, str]]) -> int:
+        """Encode new or changed (id, text) items into a collection; returns the number encoded"""
+        with self._lock:
+            collection = self.collection(name)
+            pending = collection.stale(items)
+            if not pending:
+                return 0
+            # Encode in chunks so an interrupted backfill keeps what it already encoded
+            chunk = self.batch_size * 16
+            for start in range(0, len(pending), chunk):
+                part = pending[start:start + chunk]
+                vectors = self.encode([text for _, text, _ in part])
+                collection.write([(item_id, text_hash) for item_id, _, text_hash in part], vectors)
+            logger.info(f"Encoded {len(pending)} texts into semantic collection '{name}' ({len(collection)} total)")
+            return len(pending)
+
+    def search(self, name: str, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top k (id, cosine similarity) pairs of a collection for a query"""
+        collection = self.collection(name)
+        if not len(collection):
+            return []
+        return collection.search(self.encode([query])[0], k)
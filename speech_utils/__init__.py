@@ -12,6 +12,10 @@ from .v2tgenerator import (
 )
 
 from .tts_service import GoogleTTSService
+from .tts_worker import TTSWorker, TTSBackend, GoogleTTSBackend, LocalTTSBackend
+from .tts_cache import TTSAudioCache
+from .speech_text import speech_text
+from .debate_audio import DebateAudioPipeline
 
 __version__ = "2.0.0"
 __author__ = "DebateSim Team"
@@ -24,5 +28,12 @@ __all__ = [
     "print_server",
     
     # Text-to-Speech (new)
-    "GoogleTTSService"
+    "GoogleTTSService",
+    "TTSWorker",
+    "TTSBackend",
+    "GoogleTTSBackend",
+    "LocalTTSBackend",
+    "TTSAudioCache",
+    "speech_text",
+    "DebateAudioPipeline"
 ] 
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Speech audio for streamed debates.
+
+Each finished speech is cleaned of markdown (as the frontend does before speaking it) and
+synthesized into the TTS cache while the next speech is being generated. An audio_ready
+event carrying the cache key then joins the debate's SSE stream, so playback of a speech
+can start as soon as it is announced.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from .speech_text import speech_text
+from .tts_worker import TTSError, TTSWorker
+
+logger = logging.getLogger(__name__)
+
+
+class DebateAudioPipeline:
+    """Synthesizes each finished debate speech while the next one is being generated"""
+
+    def __init__(self, worker: TTSWorker, voices: Dict[str, Optional[str]], rate: float = 1.0):
+        """
+        Args:
+            worker: TTS worker the speeches are synthesized and cached by
+            voices: Voice per speaker ("Pro"/"Con"); missing entries use the default voice
+            rate: Speaking rate for every speech
+        """
+        self.worker = worker
+        self.voices = voices
+        self.rate = rate
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.tasks: List[asyncio.Task] = []
+        self.announced = 0
+
+    def enqueue(self, index: int, part: Dict[str, Any]) -> None:
+        """Start synthesizing a transcript part; an audio_ready (or audio_error) event follows"""
+        self.tasks.append(asyncio.create_task(self._synthesize(index, part)))
+
+    async def _synthesize(self, index: int, part: Dict[str, Any]) -> None:
+        voice_name = self.voices.get(part["speaker"]) or self.worker.backend.get_default_voice()
+        event = {"index": index, "round": part["round"], "speaker": part["speaker"], "voice_used": voice_name}
+        try:
+            text = speech_text(part["content"])
+            if not text:
+                raise TTSError("speech has no text to speak")
+            # The key is derived from the cleaned text, matching audio the browser requests itself
+            key = await self.worker.prepare(text, voice_name, rate=self.rate)
+            event.update({
+                "type": "audio_ready",
+                "audio_key": key,
+                "audio_url": f"/tts/audio/{key}",
+                "mime_type": self.worker.backend.mime_type,
+            })
+        except Exception as e:
+            logger.error(f"Debate speech synthesis failed for part {index}: {e}")
+            event.update({"type": "audio_error", "message": str(e)})
+        self.announced += 1
+        await self.events.put(f"data: {json.dumps(event)}\n\n")
+
+    async def merge(self, debate_events: AsyncGenerator[str, None]) -> AsyncGenerator[str, None]:
+        """Debate SSE events interleaved with audio events as soon as each speech is synthesized"""
+        done = object()
+
+        async def pump():
+            try:
+                async for event in debate_events:
+                    await self.events.put(event)
+            finally:
+                await self.events.put(done)
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            debate_finished = False
+            # Every enqueued speech announces itself exactly once, so stop after the last one
+            while not (debate_finished and self.announced == len(self.tasks) and self.events.empty()):
+                event = await self.events.get()
+                if event is done:
+                    debate_finished = True
+                else:
+                    yield event
+        finally:
+            pump_task.cancel()
+            for task in self.tasks:
+                task.cancel()
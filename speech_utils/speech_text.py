@@ -0,0 +1,72 @@
+"""
+Markdown cleanup of speeches before synthesis.
+
+A port of stripMarkdown and addHeadingPauses in
+frontend/src/components/EnhancedVoiceOutput.jsx, so audio the server prepares speaks, and
+is cached under, the same text the browser sends to /tts for the same speech. Unlike the
+browser, long texts are not truncated: the TTS worker synthesizes them in chunks.
+"""
+import re
+from typing import List, Tuple
+
+_Rule = Tuple["re.Pattern[str]", str]
+
+
+def _rules(*rules: tuple) -> List[_Rule]:
+    return [(re.compile(pattern, *flags), replacement) for pattern, replacement, *flags in rules]
+
+
+# stripMarkdown, step for step
+_STRIP_MARKDOWN = _rules(
+    (r"^#{1,6}\s*", "", re.M),  # Headers
+    (r"#{1,6}\s*", ""),
+    (r"\*\*(.*?)\*\*", r"\1"),  # Bold / italic
+    (r"\*(.*?)\*", r"\1"),
+    (r"```[\s\S]*?```", ""),  # Code blocks
+    (r"`([^`]+)`", r"\1"),  # Inline code
+    (r"\[([^\]]+)\]\([^)]+\)", r"\1"),  # Links
+    (r"!\[([^\]]*)\]\([^)]+\)", r"\1"),  # Images
+    (r"^[-*_]{3,}$", "", re.M),  # Horizontal rules
+    (r"^>\s+", "", re.M),  # Blockquotes
+    (r"^[-*+]\s+", "", re.M),  # List markers
+    (r"^\d+\.\s+", "", re.M),
+    (r"_(.*?)_", r"\1"),  # Emphasis
+    (r"~~(.*?)~~", r"\1"),  # Strikethrough
+    (r"[\"']", ""),  # Quotes would be read as inches
+    (r"[()\[\]]", " "),  # (bracketed [PAUSE] markers go with the brackets)
+    (r"[—–]", " - "),  # Em and en dashes
+    (r"\.\.\.", ", pause,"),
+    (r"#", ""),
+    (r"\n\s*\n", "\n"),
+    (r"\s+", " "),
+)
+
+# addHeadingPauses, step for step
+_HEADING_PAUSES = _rules(
+    (r"^([A-Z][A-Za-z\s:]+)$", r"\1...", re.M),  # Standalone headings
+    (r"(\d+\.\s+[^\n]+)", r"\1..."),  # Numbered headings
+    (r"([^.!?]):\s*$", r"\1:...", re.M),  # Headings ending with a colon
+    (r"\b([A-Z]{3,})\b", r"\1...", re.ASCII),  # ALL CAPS words
+    (r"\n([A-Z][A-Za-z\s:]+)\n", r"\n\n\1...\n\n"),
+    (r"([.!?])\s*([A-Z])", r"\1  \2"),  # Breathing pause between sentences
+    (r"\.\.\.", ", , ,"),
+)
+
+
+def strip_markdown(text: str) -> str:
+    """Text without markdown syntax and symbols that are misread aloud"""
+    for pattern, replacement in _STRIP_MARKDOWN:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def add_heading_pauses(text: str) -> str:
+    """Text with comma pauses after headings and between sentences"""
+    for pattern, replacement in _HEADING_PAUSES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def speech_text(markdown: str) -> str:
+    """Text to synthesize for a markdown speech, as the frontend prepares it"""
+    return add_heading_pauses(strip_markdown(markdown or ""))
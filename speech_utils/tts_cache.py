@@ -0,0 +1,119 @@
+"""
+Size-bounded on-disk cache of synthesized speech.
+
+Debate speeches are replayed far more often than they are written, so synthesized audio is
+stored on disk keyed by a hash of everything that affects the output: the normalized text,
+voice, rate, pitch, volume and the backend's encoding. Entries are evicted least recently
+used first once the cache grows past `max_bytes`; recency survives restarts because a hit
+touches the file's mtime and the index is rebuilt from mtimes on first use.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Text as synthesized: surrounding whitespace stripped, inner runs collapsed"""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class TTSAudioCache:
+    """LRU cache of audio files under one directory; blocking, call it from worker threads"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory for cached audio
+            max_bytes: Total audio size kept before least recently used entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # key -> size, least recent first
+        self._size = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_served": 0}
+
+    @staticmethod
+    def key(text: str, voice_name: str, rate: float, pitch: float, volume: float, encoding: str) -> str:
+        parts = [normalize_text(text), voice_name or "", f"{rate:.3f}", f"{pitch:.3f}", f"{volume:.3f}", encoding]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.audio"
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            if self.cache_dir.exists():
+                for path in self.cache_dir.glob("*/*.audio"):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path.stem, stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._size = sum(self._index.values())
+            logger.info(f"TTS audio cache: {len(self._index)} entries, {self._size / 1e6:.1f} MB")
+        return self._index
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._load_index():
+                self.stats["misses"] += 1
+                return None
+        path = self._path(key)
+        try:
+            audio = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            audio = None  # Evicted or removed since the index was read
+        with self._lock:
+            if audio is None:
+                self._size -= self._index.pop(key, 0)
+                self.stats["misses"] += 1
+                return None
+            if key in self._index:
+                self._index.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["bytes_served"] += len(audio)
+            return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            index = self._load_index()
+            self._size += len(audio) - index.pop(key, 0)
+            index[key] = len(audio)
+            self.stats["stores"] += 1
+            while self._size > self.max_bytes and index:
+                evicted, size = index.popitem(last=False)
+                self._size -= size
+                self._path(evicted).unlink(missing_ok=True)
+                self.stats["evictions"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hitRate": round(self.stats["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self._index) if self._index is not None else None,
+                "bytes": self._size if self._index is not None else None,
+                "maxBytes": self.max_bytes,
+            }
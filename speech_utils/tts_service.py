@@ -115,6 +115,58 @@ class GoogleTTSService:
         """Get default voice name"""
         return self.default_voice
 
+    def synthesize_audio(self, text: str, voice_name: str = None,
+                         rate: float = 1.0, pitch: float = 0.0,
+                         volume: float = 1.0) -> bytes:
+        """
+        Synthesize speech using Google Cloud TTS (blocking gRPC call)
+
+        Args:
+            text: Text to synthesize
+            voice_name: Voice to use (defaults to default_voice)
+            rate: Speaking rate (0.25 to 4.0)
+            pitch: Pitch adjustment (-20.0 to 20.0)
+            volume: Volume gain in dB (-96.0 to 16.0)
+
+        Returns:
+            MP3 audio bytes; raises if the client is missing, the voice is unknown or the request fails
+        """
+        if not self.client:
+            raise RuntimeError("Google TTS client not initialized")
+
+        if not voice_name:
+            voice_name = self.default_voice
+
+        # Set the text input to be synthesized
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+
+        # Find the voice info to get the correct gender
+        voice_info = next((v for v in self.voices if v["name"] == voice_name), None)
+        if not voice_info:
+            raise ValueError(f"Voice not found: {voice_name}")
+
+        # Build the voice request with proper gender
+        voice = texttospeech.VoiceSelectionParams(
+            language_code="en-US",
+            name=voice_name,
+            ssml_gender=texttospeech.SsmlVoiceGender.FEMALE if voice_info["gender"] == "FEMALE" else texttospeech.SsmlVoiceGender.MALE
+        )
+
+        # Select the type of audio file to return
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.MP3,
+            speaking_rate=rate,
+            pitch=pitch,
+            volume_gain_db=volume if volume > 0 else -96,
+            effects_profile_id=["headphone-class-device"]
+        )
+
+        # Perform the text-to-speech request
+        response = self.client.synthesize_speech(
+            input=synthesis_input, voice=voice, audio_config=audio_config
+        )
+        return response.audio_content
+
     def synthesize_speech(self, text: str, voice_name: str = None, 
                          rate: float = 1.0, pitch: float = 0.0, 
                          volume: float = 1.0) -> Optional[str]:
@@ -131,53 +183,17 @@ class GoogleTTSService:
         Returns:
             Base64 encoded audio content or None if failed
         """
-        if not self.client:
-            print("❌ Google TTS client not initialized")
-            return None
-
-        if not voice_name:
-            voice_name = self.default_voice
-
         try:
-            # Set the text input to be synthesized
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-
-            # Find the voice info to get the correct gender
-            voice_info = next((v for v in self.voices if v["name"] == voice_name), None)
-            if not voice_info:
-                print(f"❌ Voice not found: {voice_name}")
-                return None
-
-            # Build the voice request with proper gender
-            voice = texttospeech.VoiceSelectionParams(
-                language_code="en-US",
-                name=voice_name,
-                ssml_gender=texttospeech.SsmlVoiceGender.FEMALE if voice_info["gender"] == "FEMALE" else texttospeech.SsmlVoiceGender.MALE
-            )
-
-            # Select the type of audio file to return
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=rate,
-                pitch=pitch,
-                volume_gain_db=volume if volume > 0 else -96,
-                effects_profile_id=["headphone-class-device"]
-            )
-
-            # Perform the text-to-speech request
-            response = self.client.synthesize_speech(
-                input=synthesis_input, voice=voice, audio_config=audio_config
-            )
-
-            # Return base64 encoded audio
-            audio_b64 = base64.b64encode(response.audio_content).decode('utf-8')
-            print(f"✅ Successfully synthesized speech for text: '{text[:50]}...' using voice: {voice_name}")
-            return audio_b64
-
+            audio = self.synthesize_audio(text, voice_name, rate, pitch, volume)
         except Exception as e:
             print(f"❌ Failed to synthesize speech: {e}")
             return None
 
+        # Return base64 encoded audio
+        audio_b64 = base64.b64encode(audio).decode('utf-8')
+        print(f"✅ Successfully synthesized speech for text: '{text[:50]}...' using voice: {voice_name or self.default_voice}")
+        return audio_b64
+
     def test_connection(self) -> bool:
         """Test if Google TTS service is working"""
         if not self.client:
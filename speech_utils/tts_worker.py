@@ -0,0 +1,467 @@
+"""
+Non-blocking text-to-speech execution for the API server.
+
+Google Cloud TTS synthesis is a blocking gRPC call that takes hundreds of milliseconds to
+seconds, so it must never run on the event loop. TTSWorker runs a TTSBackend on its own
+bounded thread pool: at most `max_workers` syntheses run at once, at most `max_queue`
+requests wait behind them (further requests are rejected instead of piling up), and every
+request has a timeout. Queue depth, wait time and synthesis latency are tracked for
+/tts/metrics. With a TTSAudioCache, audio already synthesized with the same settings is
+served from disk, and concurrent requests for the same audio share one synthesis.
+
+Long speeches are split at sentence boundaries (split_text) and synthesized chunk by chunk
+in parallel; TTSWorker.stream yields the chunks in order as soon as each is ready, so the
+first audio is available after one short chunk instead of the whole speech. Backends know
+how to join their chunks into one file (MP3 frames concatenate, WAV needs a single header).
+A synthesis nobody waits for any more is cancelled, freeing its place in the queue.
+
+Backends:
+    GoogleTTSBackend - Google Cloud TTS through GoogleTTSService (MP3)
+    LocalTTSBackend  - credential-free stand-in producing a tone WAV after a simulated
+                       latency, for load testing the server (TTS_BACKEND=local)
+"""
+import asyncio
+import io
+import logging
+import math
+import os
+import re
+import struct
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from .tts_cache import TTSAudioCache
+
+logger = logging.getLogger(__name__)
+
+# Google TTS accepts at most 5000 bytes of input per request
+MAX_CHUNK_BYTES = 4800
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|(?<=[.!?][\"')\]\u201d])\s+|\n\s*\n")
+_CLAUSE = re.compile(r"(?<=[,;:\u2014])\s+")
+
+
+class TTSError(RuntimeError):
+    """Synthesis could not be completed"""
+
+
+class TTSOverloaded(TTSError):
+    """The TTS queue is full"""
+
+
+class TTSTimeout(TTSError):
+    """Synthesis did not finish within the timeout"""
+
+
+class TTSBackend:
+    """Interface of a blocking speech synthesizer run by TTSWorker"""
+
+    name = "base"
+    mime_type = "audio/mpeg"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def get_available_voices(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def get_default_voice(self) -> str:
+        raise NotImplementedError
+
+    def synthesize(self, text: str, voice_name: str, rate: float = 1.0,
+                   pitch: float = 0.0, volume: float = 1.0) -> bytes:
+        """Audio bytes of the spoken text; blocking, raises on failure"""
+        raise NotImplementedError
+
+    def join(self, chunks: List[bytes]) -> bytes:
+        """One audio file from the audio of consecutive text chunks (MP3 frames concatenate as is)"""
+        return b"".join(chunks)
+
+    def stream_part(self, audio: bytes, first: bool) -> bytes:
+        """Bytes that send a chunk's audio as part of one streamed file"""
+        return audio
+
+
+class GoogleTTSBackend(TTSBackend):
+    """Google Cloud TTS (MP3) through the existing GoogleTTSService"""
+
+    name = "google-tts"
+    mime_type = "audio/mpeg"
+
+    def __init__(self, service=None):
+        if service is None:
+            from .tts_service import GoogleTTSService
+            service = GoogleTTSService()
+        self.service = service
+
+    @property
+    def available(self) -> bool:
+        return self.service.client is not None
+
+    def get_available_voices(self) -> List[Dict]:
+        return self.service.get_available_voices()
+
+    def get_default_voice(self) -> str:
+        return self.service.get_default_voice()
+
+    def synthesize(self, text: str, voice_name: str, rate: float = 1.0,
+                   pitch: float = 0.0, volume: float = 1.0) -> bytes:
+        return self.service.synthesize_audio(text, voice_name, rate, pitch, volume)
+
+
+class LocalTTSBackend(TTSBackend):
+    """Stand-in synthesizer: sleeps for a simulated latency and returns a short tone WAV"""
+
+    name = "local"
+    mime_type = "audio/wav"
+
+    VOICES = [
+        {"name": "local-female", "gender": "FEMALE", "description": "Local stand-in voice (tone)"},
+        {"name": "local-male", "gender": "MALE", "description": "Local stand-in voice (tone)"},
+    ]
+
+    def __init__(self, latency: float = 0.3, latency_per_char: float = 0.0005,
+                 sample_rate: int = 8000, max_seconds: float = 5.0):
+        """
+        Args:
+            latency: Fixed seconds per synthesis
+            latency_per_char: Additional seconds per character of text
+            sample_rate: Sample rate of the generated WAV
+            max_seconds: Cap on the generated audio duration
+        """
+        self.latency = latency
+        self.latency_per_char = latency_per_char
+        self.sample_rate = sample_rate
+        self.max_seconds = max_seconds
+
+    def get_available_voices(self) -> List[Dict]:
+        return self.VOICES
+
+    def get_default_voice(self) -> str:
+        return self.VOICES[0]["name"]
+
+    def synthesize(self, text: str, voice_name: str, rate: float = 1.0,
+                   pitch: float = 0.0, volume: float = 1.0) -> bytes:
+        time.sleep(self.latency + self.latency_per_char * len(text))
+        # Roughly the length of the real speech (~15 characters per second at rate 1.0)
+        seconds = min(self.max_seconds, max(0.2, len(text) / (15.0 * max(rate, 0.25))))
+        frequency = 220.0 if "male" in (voice_name or "") and "female" not in (voice_name or "") else 330.0
+        frequency *= 2 ** (pitch / 12.0)
+        samples = int(seconds * self.sample_rate)
+        step = 2 * math.pi * frequency / self.sample_rate
+        frames = struct.pack(f"<{samples}h", *(int(3000 * math.sin(i * step)) for i in range(samples)))
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(frames)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _read_wav(audio: bytes):
+        with wave.open(io.BytesIO(audio), "rb") as wav:
+            return wav.getparams(), wav.readframes(wav.getnframes())
+
+    @staticmethod
+    def _wav_header(params, data_bytes: int) -> bytes:
+        block_align = params.nchannels * params.sampwidth
+        return (b"RIFF" + struct.pack("<I", 36 + data_bytes) + b"WAVE"
+                + b"fmt " + struct.pack("<IHHIIHH", 16, 1, params.nchannels, params.framerate,
+                                        params.framerate * block_align, block_align, params.sampwidth * 8)
+                + b"data" + struct.pack("<I", data_bytes))
+
+    def join(self, chunks: List[bytes]) -> bytes:
+        """One WAV holding the frames of every chunk"""
+        if not chunks:
+            return b""
+        parts = [self._read_wav(chunk) for chunk in chunks]
+        frames = b"".join(part_frames for _, part_frames in parts)
+        return self._wav_header(parts[0][0], len(frames)) + frames
+
+    def stream_part(self, audio: bytes, first: bool) -> bytes:
+        """The first chunk carries a header of unknown length, later chunks only their frames"""
+        params, frames = self._read_wav(audio)
+        return (self._wav_header(params, 0xFFFFFFFF - 36) + frames) if first else frames
+
+
+def _split_long(sentence: str, max_bytes: int) -> List[str]:
+    """Split a sentence over the byte limit at clause boundaries, then at spaces"""
+    if len(sentence.encode("utf-8")) <= max_bytes:
+        return [sentence]
+    pieces: List[str] = []
+    for part in _CLAUSE.split(sentence):
+        while len(part.encode("utf-8")) > max_bytes:
+            cut = part.rfind(" ", 0, max_bytes // 4)  # Worst case 4 bytes per character
+            cut = cut if cut > 0 else max_bytes // 4
+            pieces.append(part[:cut].strip())
+            part = part[cut:].strip()
+        if part:
+            pieces.append(part)
+    return pieces
+
+
+def split_text(text: str, first_chars: int = 200, chunk_chars: int = 1200,
+               max_bytes: int = MAX_CHUNK_BYTES) -> List[str]:
+    """
+    Split text into synthesis chunks at sentence boundaries.
+
+    The first chunk is kept short (about `first_chars`) so playback can start quickly; later
+    chunks group sentences up to `chunk_chars`. No chunk exceeds `max_bytes` of UTF-8.
+    """
+    sentences: List[str] = []
+    for sentence in _SENTENCE.split(text):
+        sentence = " ".join(sentence.split())
+        if sentence:
+            sentences.extend(_split_long(sentence, max_bytes))
+
+    chunks: List[str] = []
+    current = ""
+    for sentence in sentences:
+        limit = first_chars if not chunks else chunk_chars
+        candidate = f"{current} {sentence}" if current else sentence
+        if current and (len(candidate) > limit or len(candidate.encode("utf-8")) > max_bytes):
+            chunks.append(current)
+            candidate = sentence
+        current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _percentiles(values: Deque[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+    return {
+        "p50": round(ordered[len(ordered) // 2], 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class TTSWorker:
+    """Runs a TTSBackend on a bounded thread pool with a queue limit, timeouts and metrics"""
+
+    def __init__(self, backend: TTSBackend, max_workers: int = 4, max_queue: int = 32,
+                 timeout: float = 30.0, samples: int = 500, cache: Optional[TTSAudioCache] = None):
+        """
+        Args:
+            backend: Synthesizer to run
+            max_workers: Syntheses running at once (the pool size)
+            max_queue: Requests allowed to wait for a free worker before new ones are rejected
+            timeout: Seconds a request may take, waiting included
+            samples: Recent requests kept for the wait/latency percentiles
+            cache: Audio cache consulted before synthesizing (None disables caching)
+        """
+        self.backend = backend
+        self.cache = cache
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}  # requests awaiting each in-flight synthesis
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self._lock = threading.Lock()
+        self._pending = 0  # submitted and not yet finished (queued + running)
+        self._running = 0
+        self.counters = {"requests": 0, "completed": 0, "failed": 0, "timeouts": 0, "rejected": 0, "characters": 0}
+        self.max_queue_depth = 0
+        self._waits: Deque[float] = deque(maxlen=samples)
+        self._latencies: Deque[float] = deque(maxlen=samples)
+
+    @classmethod
+    def from_env(cls) -> "TTSWorker":
+        """
+        Worker configured by TTS_BACKEND (google|local), TTS_WORKERS, TTS_MAX_QUEUE,
+        TTS_TIMEOUT_SECONDS, TTS_CACHE_DIR and TTS_CACHE_MAX_MB (0 disables the cache)
+        """
+        if os.getenv("TTS_BACKEND", "google").lower() == "local":
+            backend: TTSBackend = LocalTTSBackend(latency=float(os.getenv("TTS_LOCAL_LATENCY_SECONDS", "0.3")))
+        else:
+            backend = GoogleTTSBackend()
+        cache_mb = float(os.getenv("TTS_CACHE_MAX_MB", "512"))
+        cache_dir = Path(os.getenv("TTS_CACHE_DIR", Path(__file__).parent.parent / "tts_cache"))
+        return cls(
+            backend,
+            max_workers=int(os.getenv("TTS_WORKERS", "4")),
+            max_queue=int(os.getenv("TTS_MAX_QUEUE", "32")),
+            timeout=float(os.getenv("TTS_TIMEOUT_SECONDS", "30")),
+            cache=TTSAudioCache(cache_dir, int(cache_mb * 1024 * 1024)) if cache_mb > 0 else None,
+        )
+
+    def _run(self, submitted: float, text: str, voice_name: str, rate: float, pitch: float, volume: float):
+        started = time.monotonic()
+        with self._lock:
+            self._running += 1
+        try:
+            audio = self.backend.synthesize(text, voice_name, rate, pitch, volume)
+        finally:
+            with self._lock:
+                self._running -= 1
+        return audio, started - submitted, time.monotonic() - started
+
+    def _finished(self, _future) -> None:
+        # Also called for queued requests cancelled by a timeout before they started
+        with self._lock:
+            self._pending -= 1
+
+    async def synthesize(self, text: str, voice_name: Optional[str] = None, rate: float = 1.0,
+                         pitch: float = 0.0, volume: float = 1.0) -> bytes:
+        """
+        Audio bytes of the spoken text, from the cache or synthesized off the event loop.
+
+        Raises TTSOverloaded when the queue is full, TTSTimeout when the request takes longer
+        than the timeout and TTSError when the backend fails.
+        """
+        voice_name = voice_name or self.backend.get_default_voice()
+        if self.cache is None:
+            return await self._synthesize(text, voice_name, rate, pitch, volume)
+
+        key = self.cache.key(text, voice_name, rate, pitch, volume, self.backend.mime_type)
+        audio = await asyncio.to_thread(self.cache.get, key)
+        if audio is not None:
+            return audio
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._synthesize_and_store(key, text, voice_name, rate, pitch, volume))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            # Shielded so a disconnecting client does not cancel audio other requests are waiting for
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if not task.done():
+                    # The last waiter went away: drop the synthesis (a queued one never runs)
+                    self._inflight.pop(key, None)
+                    task.cancel()
+
+    async def stream(self, text: str, voice_name: Optional[str] = None, rate: float = 1.0,
+                     pitch: float = 0.0, volume: float = 1.0, parallel: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Audio of each sentence chunk of the text, in order, as soon as it is ready.
+
+        Up to `parallel` chunks (default: the pool size) are synthesized ahead of the one being
+        yielded. Each chunk is a complete audio file; backend.stream_part turns them into one
+        stream. Chunk failures raise like synthesize(); pending chunks are cancelled when the
+        consumer stops early.
+        """
+        voice_name = voice_name or self.backend.get_default_voice()
+        chunks = split_text(text)
+        parallel = max(1, parallel or self.max_workers)
+        pending: Deque[asyncio.Task] = deque()
+        next_chunk = 0
+        try:
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < parallel:
+                    pending.append(asyncio.create_task(
+                        self.synthesize(chunks[next_chunk], voice_name, rate, pitch, volume)
+                    ))
+                    next_chunk += 1
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def synthesize_chunked(self, text: str, voice_name: Optional[str] = None, rate: float = 1.0,
+                                 pitch: float = 0.0, volume: float = 1.0) -> bytes:
+        """Whole audio of a long text, synthesized as parallel sentence chunks and cached as one entry"""
+        voice_name = voice_name or self.backend.get_default_voice()
+        if self.cache is None:
+            return self.backend.join([audio async for audio in self.stream(text, voice_name, rate, pitch, volume)])
+        key = self.cache.key(text, voice_name, rate, pitch, volume, self.backend.mime_type)
+        audio = await asyncio.to_thread(self.cache.get, key)
+        if audio is None:
+            audio = self.backend.join([chunk async for chunk in self.stream(text, voice_name, rate, pitch, volume)])
+            try:
+                await asyncio.to_thread(self.cache.put, key, audio)
+            except OSError as e:
+                logger.warning(f"Could not cache TTS audio: {e}")
+        return audio
+
+    async def prepare(self, text: str, voice_name: Optional[str] = None, rate: float = 1.0,
+                      pitch: float = 0.0, volume: float = 1.0) -> str:
+        """Synthesize a text ahead of playback and return the cache key its audio is stored under"""
+        if self.cache is None:
+            raise TTSError("TTS audio cache is disabled")
+        voice_name = voice_name or self.backend.get_default_voice()
+        await self.synthesize_chunked(text, voice_name, rate, pitch, volume)
+        return self.cache.key(text, voice_name, rate, pitch, volume, self.backend.mime_type)
+
+    async def cached_audio(self, key: str) -> Optional[bytes]:
+        """Audio stored under a key returned by prepare(), if it is still cached"""
+        if self.cache is None:
+            return None
+        return await asyncio.to_thread(self.cache.get, key)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:  # A cancelled task may already have been replaced
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here in case every waiter went away
+
+    async def _synthesize_and_store(self, key: str, text: str, voice_name: str,
+                                    rate: float, pitch: float, volume: float) -> bytes:
+        audio = await self._synthesize(text, voice_name, rate, pitch, volume)
+        try:
+            await asyncio.to_thread(self.cache.put, key, audio)
+        except OSError as e:
+            logger.warning(f"Could not cache TTS audio: {e}")
+        return audio
+
+    async def _synthesize(self, text: str, voice_name: str, rate: float, pitch: float, volume: float) -> bytes:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.counters["rejected"] += 1
+                raise TTSOverloaded(f"TTS queue full ({self._pending - self._running} waiting)")
+            self._pending += 1
+            self.counters["requests"] += 1
+            self.counters["characters"] += len(text)
+            self.max_queue_depth = max(self.max_queue_depth, self._pending - self.max_workers, 0)
+
+        future = self._executor.submit(self._run, time.monotonic(), text, voice_name, rate, pitch, volume)
+        future.add_done_callback(self._finished)
+        try:
+            audio, waited, latency = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            # A queued request is dropped; a running one holds its thread until the backend returns
+            self.counters["timeouts"] += 1
+            raise TTSTimeout(f"TTS synthesis timed out after {self.timeout:.0f}s")
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.error(f"TTS synthesis failed ({self.backend.name}): {e}")
+            raise TTSError(str(e)) from e
+        self.counters["completed"] += 1
+        self._waits.append(waited)
+        self._latencies.append(latency)
+        return audio
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending, running = self._pending, self._running
+        return {
+            "backend": self.backend.name,
+            "maxWorkers": self.max_workers,
+            "maxQueue": self.max_queue,
+            "timeoutSeconds": self.timeout,
+            "inFlight": running,
+            "queued": pending - running,
+            "maxQueueDepth": self.max_queue_depth,
+            **self.counters,
+            "waitSeconds": _percentiles(self._waits),
+            "latencySeconds": _percentiles(self._latencies),
+            "cache": self.cache.summary() if self.cache is not None else None,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,123 @@
+"""
+Stale-while-revalidate cache for hot, slowly changing listings.
+
+A value is served straight from memory while fresh. Once it passes its refresh age the
+cached value is still returned immediately and a single background task reloads it, so
+no request waits on the upstream API. If the reload fails, the last good value keeps
+being served until it is older than the maximum stale age.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched_at: float
+    last_error: Optional[str] = None
+
+
+class StaleWhileRevalidateCache:
+    """Per-key cache that refreshes entries in the background before they go stale"""
+
+    def __init__(self, refresh_after: float, max_stale: float, maxsize: int = 100):
+        """
+        Args:
+            refresh_after: Age in seconds after which a background refresh is started
+            max_stale: Age in seconds after which a value is no longer served and the caller waits for a reload
+            maxsize: Maximum number of keys kept (oldest entries are evicted first)
+        """
+        self.refresh_after = refresh_after
+        self.max_stale = max(max_stale, refresh_after)
+        self.maxsize = maxsize
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {"fresh": 0, "stale": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def age(self, key: Hashable) -> Optional[float]:
+        entry = self._entries.get(key)
+        return time.monotonic() - entry.fetched_at if entry else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if key not in self._entries and len(self._entries) >= self.maxsize:
+            oldest = min(self._entries, key=lambda k: self._entries[k].fetched_at)
+            del self._entries[oldest]
+        self._entries[key] = _Entry(value, time.monotonic())
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def _load(self, key: Hashable, loader: Loader) -> asyncio.Task:
+        """Start (or join) the single in-flight load for a key"""
+        task = self._inflight.get(key)
+        if task is None:
+            async def run() -> Any:
+                try:
+                    value = await loader()
+                    self.set(key, value)
+                    return value
+                except Exception as e:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        entry.last_error = str(e)
+                    raise
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = asyncio.create_task(run())
+            self._inflight[key] = task
+        return task
+
+    def _refresh_in_background(self, key: Hashable, loader: Loader) -> None:
+        if key in self._inflight:
+            return
+        self.stats["refreshes"] += 1
+        task = self._load(key, loader)
+        self._background.add(task)
+
+        def done(finished: asyncio.Task) -> None:
+            self._background.discard(finished)
+            if not finished.cancelled() and finished.exception() is not None:
+                self.stats["refresh_errors"] += 1
+                logger.warning(f"Background refresh of {key!r} failed, serving stale value: {finished.exception()}")
+
+        task.add_done_callback(done)
+
+    async def get(self, key: Hashable, loader: Loader) -> Any:
+        """
+        Return the cached value for key, loading it with `loader` when needed.
+
+        Raises whatever `loader` raises only when there is no value young enough to serve.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.refresh_after:
+                self.stats["fresh"] += 1
+                return entry.value
+            if age < self.max_stale:
+                self.stats["stale"] += 1
+                self._refresh_in_background(key, loader)
+                return entry.value
+
+        self.stats["misses"] += 1
+        # Shield so a cancelled request doesn't cancel the load other callers are waiting on
+        return await asyncio.shield(self._load(key, loader))
+
+    async def close(self) -> None:
+        """Cancel background refreshes (called on shutdown)"""
+        tasks = list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,62 @@
+"""
+Bill text benchmarks: python tests/benchmark_bill_text.py [path/to/bill.xml]
+
+Compares the streaming XML parser with the previous recursive ElementTree parser on a large
+appropriations-shaped bill (or the given document), timing and peak memory, and the
+single-pass text normalizer with the previous substitution chains on ~4 MB of GPO text.
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bill_text import normalize_bill_text, parse_bill_xml  # noqa: E402
+from legacy_bill_text import (  # noqa: E402
+    GPO_SAMPLE,
+    legacy_normalize_congress_text,
+    legacy_normalize_legiscan_text,
+    legacy_parse_bill_xml,
+    synthetic_appropriations_xml,
+)
+
+
+def benchmark_parsers(document: str) -> None:
+    print(f"Document size: {len(document) / (1024 * 1024):.1f} MB")
+    parsers = (("legacy ElementTree", legacy_parse_bill_xml), ("streaming", lambda doc: parse_bill_xml(doc).text))
+    for name, parse in parsers:
+        start = time.perf_counter()
+        output = parse(document)
+        elapsed = time.perf_counter() - start
+
+        # Memory is measured in a separate run since tracemalloc slows parsing down
+        tracemalloc.start()
+        parse(document)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>20}: {elapsed:.3f}s, peak {peak / (1024 * 1024):.1f} MB, {len(output):,} chars")
+
+
+def benchmark_normalizers(text: str, repeat: int = 3) -> None:
+    print(f"Text size: {len(text) / (1024 * 1024):.1f} MB")
+    legacy = {"congress": legacy_normalize_congress_text, "legiscan": legacy_normalize_legiscan_text}
+    for profile, legacy_normalize in legacy.items():
+        timings = {}
+        for name, normalize in (("legacy", legacy_normalize), ("single-pass", lambda t: normalize_bill_text(t, profile))):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                normalize(text)
+            timings[name] = (time.perf_counter() - start) / repeat
+        print(f"{profile:>20}: legacy {timings['legacy']:.3f}s, single-pass {timings['single-pass']:.3f}s "
+              f"({timings['legacy'] / timings['single-pass']:.1f}x)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            bill = f.read()
+    else:
+        bill = synthetic_appropriations_xml()
+    benchmark_parsers(bill)
+    benchmark_normalizers(GPO_SAMPLE * (4 * 1024 * 1024 // len(GPO_SAMPLE)))
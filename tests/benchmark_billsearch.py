@@ -0,0 +1,35 @@
+"""
+Search matching benchmark: python tests/benchmark_billsearch.py
+
+Compares the batch relevance mask and scores in billsearch.py with the per-bill versions
+they replaced, on batches of 50 to 5000 bills.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from billsearch import BillSearcher  # noqa: E402
+from legacy_billsearch import QUERIES, calculate_simple_relevance, is_relevant_match, random_bills  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    for query in QUERIES:
+        fn(query)
+    return (time.perf_counter() - start) / len(QUERIES)
+
+
+if __name__ == "__main__":
+    searcher = BillSearcher(client=None)
+    bills = random_bills()
+    for size in (50, 1000, 5000):
+        sample = bills[:size]
+        fields = [searcher._search_fields(b) for b in sample]
+        per_bill = timed(lambda q: [is_relevant_match(searcher, b, q) for b in sample])
+        batch = timed(lambda q: searcher._relevance_mask(sample, q, fields))
+        print(f"{size:5d} bills mask:  per-bill {per_bill * 1000:7.2f} ms, batch {batch * 1000:7.2f} ms ({per_bill / batch:.1f}x)")
+        per_bill = timed(lambda q: [calculate_simple_relevance(searcher, b, q) for b in sample])
+        batch = timed(lambda q: searcher._relevance_scores(sample, q))
+        print(f"{size:5d} bills score: per-bill {per_bill * 1000:7.2f} ms, batch {batch * 1000:7.2f} ms ({per_bill / batch:.1f}x)")
@@ -0,0 +1,56 @@
+"""
+Dataset import benchmark: python tests/benchmark_legiscan_dataset.py [ARCHIVE [STORE_PATH]]
+
+Imports a LegiScan dataset archive (a zip or a saved getDataset response) into a store and
+reports the time taken. Without an archive, a synthetic session of 20,000 bills is generated
+and imported into a temporary store.
+"""
+import base64
+import io
+import json
+import logging
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from legiscan_dataset import LegiScanDatasetImporter  # noqa: E402
+from legiscan_service import LegiScanService  # noqa: E402
+from legiscan_store import LegiScanStore  # noqa: E402
+
+
+def synthetic_dataset(path: Path, bills: int = 20000) -> None:
+    """Write a getDataset-style JSON response holding a session of `bills` bills"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(1, bills + 1):
+            bill = {"bill_id": i, "state": "CA", "session_id": 2172, "bill_number": f"AB{i}",
+                    "title": f"Synthetic bill {i} relating to water and housing", "description": "Synthetic",
+                    "change_hash": f"{i:032x}", "history": [{"date": "2025-03-01", "action": "Introduced"}]}
+            archive.writestr(f"CA/2025-2026_Regular_Session/bill/AB{i}.json", json.dumps({"bill": bill}))
+    payload = base64.b64encode(buffer.getvalue()).decode("ascii").replace("/", "\\/")
+    path.write_text(f'{{"status": "OK", "dataset": {{"session_id": 2172, "zip": "{payload}"}}}}')
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            archive = Path(sys.argv[1])
+        else:
+            archive = Path(tmp) / "dataset.json"
+            synthetic_dataset(archive)
+        store_path = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(tmp) / "legiscan.sqlite3"
+        store = LegiScanStore(store_path)
+        importer = LegiScanDatasetImporter(LegiScanService("", None), store, (), store_path.parent)
+        start = time.perf_counter()
+        print(importer.import_archive(archive, dataset_hash=f"local:{archive.name}"))
+        print(f"{time.perf_counter() - start:.2f}s, store: {store.counts()}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
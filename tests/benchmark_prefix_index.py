@@ -0,0 +1,56 @@
+"""
+Typeahead benchmark: python tests/benchmark_prefix_index.py
+
+Builds a prefix index over a synthetic set of bill titles, numbers and sponsors and
+reports build time and cold/warm suggestion latency.
+"""
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from prefix_index import PrefixIndex  # noqa: E402
+
+WORDS = ("affordable health care insurance climate carbon emissions border security asylum visa school "
+         "college student tax relief energy independence veterans benefits firearm safety farm water "
+         "broadband access privacy data protection medicare social security voting rights infrastructure "
+         "housing child nutrition transportation defense authorization appropriations wildfire").split()
+
+
+def synthetic_index(titles: int = 12000, seed: int = 2026) -> PrefixIndex:
+    rng = random.Random(seed)
+    index = PrefixIndex()
+    for i in range(titles):
+        title = " ".join(rng.sample(WORDS, rng.randint(4, 10))).title() + " Act"
+        index.set_source(f"bill:{i}", [(title, 10 + rng.random() * 10), (f"HR {i + 1}", 8 + rng.random())])
+    for i, name in enumerate(["Jane Doe", "John Smith", "Maria Garcia", "Wei Chen", "Ada Lovelace"] * 40):
+        index.set_source(f"sponsor:{name}:{i}", [(f"Rep. {name} {i}", 5 + i % 7)])
+    return index
+
+
+if __name__ == "__main__":
+    index = synthetic_index()
+    start = time.perf_counter()
+    index.rebuild()
+    print(f"Built {len(index)} keys from 12000 titles in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(2026)
+    prefixes = []
+    for _ in range(2000):
+        word = rng.choice(WORDS + ["hr 1", "hr 40", "rep j", "123"])
+        prefixes.append(word[:rng.randint(1, len(word))])
+
+    for label in ("cold", "warm"):
+        timings = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.suggest(prefix, 5)
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+        print(f"{label}: mean {statistics.mean(timings):7.1f} us, p50 {timings[len(timings) // 2]:7.1f} us, "
+              f"p99 {timings[int(len(timings) * 0.99)]:7.1f} us, max {timings[-1]:8.1f} us")
+    print(index.suggest("insu", 5))
+    print(index.suggest("hr 40", 5))
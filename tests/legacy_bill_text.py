@@ -0,0 +1,191 @@
+"""
+Reference copies of the bill text code replaced in bill_text.py, and synthetic inputs.
+
+Used by the bill text tests and by benchmark_bill_text.py; not imported by the server.
+"""
+import random
+import re
+import xml.etree.ElementTree as ET
+from typing import List
+
+# Section heading patterns of the old chain, one case-insensitive substitution pass each
+LEGACY_HEADER_PATTERNS = (
+    r'SEC(?:TION)?\.?\s+\d+[A-Z]?\.',
+    r'TITLE\s+[IVX]+',
+    r'CHAPTER\s+\d+',
+    r'PART\s+[A-Z]+',
+    r'SUBTITLE\s+[A-Z]+',
+)
+
+
+def legacy_parse_bill_xml(xml_content: str) -> str:
+    """Previous recursive ElementTree parser"""
+    root = ET.fromstring(xml_content)
+
+    def extract_text_recursive(element):
+        text_parts = []
+        if element.tag in ['section', 'title', 'chapter', 'part', 'subtitle']:
+            enum = element.find('.//enum')
+            header = element.find('.//header')
+            section_text = []
+            if enum is not None and enum.text:
+                section_text.append(f"\n\nSEC. {enum.text.strip()}")
+            if header is not None and header.text:
+                section_text.append(f" {header.text.strip().upper()}")
+            if section_text:
+                text_parts.append(''.join(section_text))
+        if element.tag == 'text' and element.text:
+            text_parts.append(f"\n{element.text.strip()}")
+        for child in element:
+            text_parts.extend(extract_text_recursive(child))
+            if child.tail and child.tail.strip():
+                text_parts.append(child.tail.strip())
+        return text_parts
+
+    return re.sub(r'\s+', ' ', ' '.join(extract_text_recursive(root))).strip()
+
+
+def synthetic_appropriations_xml(divisions: int = 12, titles: int = 8, sections: int = 40,
+                                 paragraphs: int = 6) -> str:
+    """Generate an omnibus-appropriations-shaped bill"""
+    parts = ['<?xml version="1.0"?><bill><form><official-title>Making consolidated appropriations '
+             'for the fiscal year ending September 30, 2026, and for other purposes.</official-title></form>'
+             '<legis-body>']
+    number = 1
+    for d in range(divisions):
+        parts.append(f'<division><enum>{chr(65 + d)}</enum><header>Agency Appropriations Act {d}</header>')
+        for t in range(titles):
+            parts.append(f'<title><enum>{"I" * (t % 3 + 1)}</enum><header>Department {t} programs</header>')
+            for _ in range(sections):
+                parts.append(f'<section><enum>{number}.</enum><header>Salaries and expenses</header>'
+                             f'<appropriations-intermediate><header>Office {number}</header></appropriations-intermediate>')
+                for p in range(paragraphs):
+                    parts.append(f'<paragraph><enum>({p + 1})</enum><text>For necessary expenses of the '
+                                 f'office, ${number * 1000 + p:,}, to remain available until expended, of which '
+                                 f'<quote>amounts</quote> shall be derived from section {p + 2}.</text></paragraph>')
+                parts.append('</section>')
+                number += 1
+            parts.append('</title>')
+        parts.append('</division>')
+    parts.append('</legis-body></bill>')
+    return "".join(parts)
+
+
+def legacy_normalize_congress_text(text_content: str) -> str:
+    """Previous fetch_bill_text cleanup chain"""
+    clean_text = re.sub(r'<[^>]+>', '', text_content)
+    clean_text = re.sub(r'&lt;', '<', clean_text)
+    clean_text = re.sub(r'&gt;', '>', clean_text)
+    clean_text = re.sub(r'&amp;', '&', clean_text)
+    clean_text = re.sub(r'&quot;', '"', clean_text)
+    clean_text = re.sub(r'&apos;', "'", clean_text)
+    clean_text = re.sub(r'\r\n', '\n', clean_text)
+    clean_text = re.sub(r'[ \t]+', ' ', clean_text)
+    for pattern in LEGACY_HEADER_PATTERNS:
+        clean_text = re.sub(f'(?<!^)(?<!\n)({pattern})', r'\n\1', clean_text, flags=re.IGNORECASE)
+    clean_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', clean_text)
+    clean_text = clean_text.strip()
+    clean_text = re.sub(r'\[Congressional Bills.*?\]', '', clean_text)
+    clean_text = re.sub(r'\[From the U\.S\. Government Publishing Office\]', '', clean_text)
+    clean_text = re.sub(r'&lt;DOC&gt;.*?&lt;/DOC&gt;', '', clean_text, flags=re.DOTALL)
+    return clean_text
+
+
+def legacy_normalize_legiscan_text(doc_text: str) -> str:
+    """Previous LegiScanService.get_bill_text cleanup chain"""
+    clean_text = re.sub(r'<[^>]+>', '', doc_text)
+    clean_text = re.sub(r'&lt;', '<', clean_text)
+    clean_text = re.sub(r'&gt;', '>', clean_text)
+    clean_text = re.sub(r'&amp;', '&', clean_text)
+    clean_text = re.sub(r'&quot;', '"', clean_text)
+    clean_text = re.sub(r'&apos;', "'", clean_text)
+    clean_text = re.sub(r'\s+', ' ', clean_text)
+    clean_text = re.sub(r'\n\s*\n+', '\n\n', clean_text)
+    return clean_text.strip()
+
+
+GPO_SAMPLE = """<html><body><pre>
+[Congressional Bills 119th Congress]
+[From the U.S. Government Publishing Office]
+[H.R. 1 Introduced in House (IH)]
+
+&lt;DOC&gt;
+
+
+
+
+
+
+119th CONGRESS
+  1st Session
+                                H. R. 1
+
+ To provide for reconciliation pursuant to title II of H. Con. Res. 14.
+
+
+_______________________________________________________________________
+
+
+                    IN THE HOUSE OF REPRESENTATIVES
+
+                              May 20, 2025
+
+Mr. Arrington introduced the following bill; which was referred to the
+ Committee on the Budget
+
+_______________________________________________________________________
+
+                                 A BILL
+
+ To provide for reconciliation pursuant to title II of H. Con. Res. 14.
+
+    Be it enacted by the Senate and House of Representatives of the
+United States of America in Congress assembled,
+
+                            TITLE I--COMMITTEE ON AGRICULTURE
+
+SECTION 10001. ENHANCEMENT OF THE THRIFTY FOOD PLAN.
+
+    (a) In General.--Section 3 of the Food and Nutrition Act of 2008 
+(7 U.S.C. 2012) is amended--\r
+            (1) by striking subsection (u) and inserting the following:\r
+    ``(u) Thrifty Food Plan.--(1) The term `thrifty food plan' means 
+the diet required to feed a family of 4 persons consisting of a man and 
+a woman ages 20 through 50, a child age 6 through 8, and a child age 9 
+through 11, determined in accordance with the Secretary's calculations 
+of the cost of such diet, as part of the analysis under subtitle B.
+                    Subtitle A--Nutrition
+  Sec. 10002.  Chapter 4 of title 7 &amp; Part B, &quot;Subtitle D&quot; &apos;x&apos; &lt;b&gt;
+  CHAPTER 12--Forestry\tand \t related\tmatters;   PART III--Misc.
+SEC. 3. AT&T rule: 5 &lt; 6 &gt; 4 <!-- comment --> as part of the parts
+</pre></body></html>
+"""
+
+
+# Fragments of bill text and markup. Headings are complete and never share a separator
+# containing markup with a neighbour: the old chain matched headings after stripping tags,
+# the normalizer matches them in the source text (see KNOWN_DIFFERENCES in the tests).
+HEADINGS = ["SEC. 5.", "Sec. 12A.", "section 101.", "SECTION 7", "TITLE IV", "title ii", "Subtitle A",
+            "CHAPTER 3", "PART B", "part of"]
+FRAGMENTS = HEADINGS + [
+    "the", "Secretary", "shall", "department", "chapter.",
+    "[Congressional Bills 118th Congress]", "[From the U.S. Government Publishing Office]", "[H.R. 2]",
+    "&lt;", "&gt;", "&amp;", "&quot;", "&apos;", "&lt;DOC&gt;", "AT&T", "5 < 6", "x > y",
+    "(a)", "``quoted''", "$1,000,000", "--", ".", ",",
+]
+WHITESPACE = [" ", "  ", "\t", "\n", "\n\n", "\n\n\n", " \n \n \n ", "\r\n", "\r", "\f", "\xa0"]
+MARKUP = ["<p>", "</p>", "<b>", "<br/>", " <p> ", "\n<br/>\n"]
+
+
+def regression_corpus(seed: int = 2026, count: int = 2000) -> List[str]:
+    """Sample GPO documents plus randomized mixes of fragments joined by whitespace and markup"""
+    rng = random.Random(seed)
+    corpus = [GPO_SAMPLE, GPO_SAMPLE.replace("\n", "\r\n")]
+    for _ in range(count):
+        fragments = [rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 40))]
+        parts = [rng.choice(WHITESPACE + MARKUP) if rng.random() < 0.2 else ""]
+        for fragment, following in zip(fragments, fragments[1:] + [""]):
+            near_heading = fragment in HEADINGS or following in HEADINGS
+            parts += [fragment, rng.choice(WHITESPACE if near_heading else WHITESPACE + MARKUP)]
+        corpus.append("".join(parts))
+    return corpus
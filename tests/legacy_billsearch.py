@@ -0,0 +1,121 @@
+"""
+Per-bill search matchers and relevance score that the batch versions in billsearch.py replaced.
+
+Kept as the reference the batch versions are tested and benchmarked against.
+"""
+import random
+import re
+from typing import Any, Dict, List
+
+from rapidfuzz.fuzz import partial_ratio
+
+
+def fuzzy_match(text: str, query: str, threshold: int = 75) -> bool:
+    return partial_ratio(text.lower(), query.lower()) >= threshold
+
+
+def is_relevant_match(searcher, bill: Dict[str, Any], query: str) -> bool:
+    query_lower = query.lower()
+    title = bill.get("title", "").lower()
+
+    if fuzzy_match(title, query_lower):
+        return True
+
+    bill_type = bill.get("type", "").lower()
+    bill_number = str(bill.get("number", ""))
+    if bill_type and bill_number:
+        bill_code = f"{bill_type} {bill_number}"
+        if query_lower in bill_code or bill_code in query_lower:
+            return True
+        if re.search(rf"\b{re.escape(bill_type)}\s*{re.escape(bill_number)}\b", query_lower):
+            return True
+
+    sponsors = bill.get("sponsors", [])
+    if sponsors and isinstance(sponsors[0], dict):
+        last_name = sponsors[0].get("lastName", "").lower()
+        if fuzzy_match(last_name, query_lower):
+            return True
+
+    for keyword in searcher._expand_keywords([query_lower]):
+        if keyword in title:
+            return True
+
+    return False
+
+
+def matches_keyword(bill: Dict[str, Any], keyword: str) -> bool:
+    keyword_lower = keyword.lower()
+    title = bill.get("title", "").lower()
+    if fuzzy_match(title, keyword_lower):
+        return True
+
+    policy_area = bill.get("policyArea", {}).get("name", "").lower()
+    if fuzzy_match(policy_area, keyword_lower):
+        return True
+
+    return False
+
+
+def calculate_simple_relevance(searcher, bill: Dict[str, Any], query: str) -> int:
+    """Simplified relevance scoring for fast sorting"""
+    query_lower = query.lower()
+    score = 0
+
+    title = bill.get("title", "").lower()
+    bill_code = f"{bill.get('type', '')} {bill.get('number', '')}".lower()
+
+    # Title matches (highest priority)
+    if title.startswith(query_lower):
+        score += 100
+    elif query_lower in title:
+        score += 50
+
+    # Bill code exact match
+    if query_lower == bill_code:
+        score += 90
+    elif query_lower in bill_code:
+        score += 40
+
+    # Sponsor match
+    sponsor = bill.get("sponsor", "").lower()
+    if query_lower in sponsor:
+        score += 30
+
+    # Boost for current Congress
+    if bill.get("congress") == searcher.current_congress:
+        score += 10
+
+    # Boost for recent updates
+    update_date = bill.get("updateDate", "")
+    if update_date and "2024" in update_date or "2025" in update_date:
+        score += 5
+
+    return score
+
+
+WORDS = ("health care insurance climate carbon emissions border asylum visa school college tax energy "
+         "veterans firearm weapons farm water broadband privacy data medicare social security voting").split()
+LAST_NAMES = ["Smith", "Garcia", "Johnson", "Nguyen", "Doe", "O'Brien", "Schumer", "Pelosi", "Cruz", "Warren"]
+QUERIES = ["healthcare", "climate", "gun", "hr 123", "s 42", "Nguyen", "border asylum", "insurnce",
+           "broadband privacy act", "water", "social security", "sjres 7", "voting rights", "hr", "2025"]
+
+
+def random_bills(count: int = 5000, seed: int = 2026) -> List[Dict[str, Any]]:
+    """Raw Congress.gov-shaped bills that also carry the processed fields used for scoring"""
+    rng = random.Random(seed)
+    bills = []
+    for _ in range(count):
+        bill_type = rng.choice(["HR", "S", "HRES", "SJRES"])
+        number = str(rng.choice([7, 42, 123]) if rng.random() < 0.1 else rng.randint(1, 9999))
+        last_name = rng.choice(LAST_NAMES)
+        bills.append({
+            "type": bill_type,
+            "number": number,
+            "title": " ".join(rng.sample(WORDS, rng.randint(3, 9))).capitalize() + " Act of 2025",
+            "sponsors": [{"lastName": last_name}] if rng.random() < 0.8 else [],
+            "sponsor": f"Rep. Alex {last_name}",
+            "policyArea": {"name": rng.choice(["Health", "Taxation", "Immigration", "Energy", ""])},
+            "congress": rng.choice([119, 118, 117]),
+            "updateDate": rng.choice(["2025-03-01", "2024-11-05", "2023-01-01", ""]),
+        })
+    return bills
@@ -0,0 +1,119 @@
+import re
+
+import pytest
+
+from bill_text import BillXMLParser, iter_bill_sections, normalize_bill_text, parse_bill_xml
+
+from legacy_bill_text import (
+    GPO_SAMPLE,
+    legacy_normalize_congress_text,
+    legacy_normalize_legiscan_text,
+    legacy_parse_bill_xml,
+    regression_corpus,
+    synthetic_appropriations_xml,
+)
+
+SMALL_BILL = """<?xml version="1.0"?>
+<bill><legis-body>
+<section><enum>1.</enum><header>Short title</header><text>This Act may be cited as the <quote>Test Act</quote>.</text></section>
+<title><enum>I</enum><header>Funding</header>
+  <section><enum>101.</enum><header>Appropriations</header>
+    <subsection><enum>(a)</enum><header>In general</header><text>There are appropriated $5.</text></subsection>
+    <quoted-block><section><enum>9.</enum><text>Quoted section text.</text></section></quoted-block>
+  </section>
+</title>
+</legis-body></bill>"""
+
+
+def test_sections_carry_structure_and_offsets():
+    parsed = parse_bill_xml(SMALL_BILL)
+    assert parsed.index.keys() == ["section-1", "title-i", "title-i/section-101"]
+
+    section = parsed.index.get("title-i/section-101")
+    assert section.heading == "SEC. 101. APPROPRIATIONS"
+    # Quoted sections are amendment text, not structure of this bill
+    assert "(a) In general.— There are appropriated $5." in section.text
+    assert "Quoted section text." in section.text
+    for section in parsed.index:
+        assert parsed.text[section.start:section.end] == section.render()
+
+
+def test_incremental_feed_matches_single_pass():
+    document = synthetic_appropriations_xml(2, 2, 3, 2)
+    whole = list(iter_bill_sections(document))
+
+    parser = BillXMLParser()
+    chunked = []
+    for i in range(0, len(document), 97):
+        parser.feed(document[i:i + 97])
+        chunked.extend(parser.read_sections())
+    parser.close()
+    chunked.extend(parser.read_sections())
+
+    assert [(s.key, s.heading, s.text) for s in chunked] == [(s.key, s.heading, s.text) for s in whole]
+
+
+def test_streaming_parser_keeps_all_legacy_text():
+    document = synthetic_appropriations_xml(1, 2, 3, 2)
+    parsed = parse_bill_xml(document)
+    flat = " ".join(parsed.text.split())
+    legacy = legacy_parse_bill_xml(document)
+
+    amounts = re.findall(r"\$\d+,\d{3}", legacy)
+    assert len(amounts) == 12
+    for amount in amounts:
+        assert f"office, {amount}, to remain available" in flat
+    # Appropriations headings and inline quotes were dropped by the recursive parser
+    assert "Office 6" in flat and "Office 6" not in legacy
+    assert "of which amounts shall be derived" in flat
+    assert len(parsed.index) == 1 + 1 + 2 + 2 * 3
+
+
+def test_malformed_xml_falls_back_to_tag_stripping():
+    parsed = parse_bill_xml("<bill><section><text>SEC. 2. FUNDING. Money.</text></bill>")
+    assert "SEC. 2. FUNDING. Money." in parsed.text
+    assert parsed.index.keys() == ["section-2"]
+
+
+# Inputs where the normalizer intentionally differs from the old substitution chain
+KNOWN_DIFFERENCES = [
+    # Every character reference is decoded, exactly once
+    ("Fees&nbsp;&mdash;&#36;5 &#x2014; total", "congress", "Fees\xa0—$5 — total"),
+    ("say &amp;quot;hello&amp;quot;", "congress", "say &quot;hello&quot;"),
+    ("a&nbsp;&nbsp;b", "legiscan", "a b"),
+    # Headings start a word: no breaks inside "subsection", "counterpart" or "SUBTITLE"
+    ("see subsection 5. below", "congress", "see subsection 5. below"),
+    ("as part of the counterpart parts", "congress", "as \npart of the counterpart parts"),
+    ("under SUBTITLE IV of", "congress", "under \nSUBTITLE IV of"),
+    ('the "Subtitle Income" rules', "congress", 'the "\nSubtitle Income" rules'),
+    # Headings are matched in the source text, not across markup
+    ("see SEC.<b> 5.</b> here", "congress", "see SEC. 5. here"),
+]
+
+
+@pytest.mark.parametrize("profile,legacy_normalize", [
+    ("congress", legacy_normalize_congress_text),
+    ("legiscan", legacy_normalize_legiscan_text),
+])
+def test_normalizer_matches_legacy_chain_on_corpus(profile, legacy_normalize):
+    mismatches = [
+        document for document in regression_corpus()
+        if normalize_bill_text(document, profile) != legacy_normalize(document)
+    ]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("document,profile,expected", KNOWN_DIFFERENCES)
+def test_normalizer_known_differences(document, profile, expected):
+    assert normalize_bill_text(document, profile) == expected
+
+
+def test_gpo_sample_output():
+    text = normalize_bill_text(GPO_SAMPLE)
+    # Metadata lines are removed after the text is stripped, as before
+    assert text.lstrip("\n").startswith("[H.R. 1 Introduced in House (IH)]")
+    assert "[Congressional Bills" not in text and "Government Publishing Office" not in text
+    assert "\nSECTION 10001. ENHANCEMENT" in text
+    assert "\nSec. 10002." in text and "\nCHAPTER 12--Forestry and related matters;" in text
+    assert "\r" not in text and "\n\n\n" not in text and "  " not in text
+    assert normalize_bill_text(GPO_SAMPLE, "legiscan") == " ".join(legacy_normalize_legiscan_text(GPO_SAMPLE).split())
@@ -0,0 +1,22 @@
+import asyncio
+
+from bill_text_store import BillTextStore
+
+
+def test_per_document_locks_are_released(tmp_path):
+    store = BillTextStore(tmp_path)
+    order = []
+
+    async def hold(key, tag):
+        async with store._locked(key):
+            order.append(f"{tag} in")
+            await asyncio.sleep(0.01)
+            order.append(f"{tag} out")
+
+    async def run():
+        await asyncio.gather(hold("versions", "a"), hold("versions", "b"), hold("text", "c"))
+
+    asyncio.run(run())
+    assert order.index("a out") < order.index("b in")  # Same key is serialized
+    assert order.index("c in") < order.index("a out")  # Other keys are not
+    assert store._locks == {}
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from billsearch import BillSearcher
+from legacy_billsearch import QUERIES, calculate_simple_relevance, is_relevant_match, matches_keyword, random_bills
+
+BILLS = random_bills(2000)
+
+
+class DelayedClient:
+    """Congress client whose bill pages arrive after per-Congress delays"""
+
+    def __init__(self, delays):
+        self.delays = delays
+
+    async def list_bills(self, congress, limit, sort, timeout, retries):
+        await asyncio.sleep(self.delays[congress])
+        return [
+            {"type": "HR", "number": str(congress * 100 + i), "title": f"Climate Resilience Act {i}",
+             "latestAction": {"text": "Introduced", "actionDate": "2025-01-01"}}
+            for i in range(limit)
+        ]
+
+
+def test_direct_search_prefers_the_current_congress_over_faster_sessions():
+    searcher = BillSearcher(DelayedClient({119: 0.2, 118: 0.1, 117: 0.0, 116: 0.0}))
+    results = asyncio.run(searcher._direct_search("climate", 5))
+    assert len(results) == 5
+    assert {bill["congress"] for bill in results} == {119}
+
+
+def test_direct_search_returns_arrived_sessions_at_the_deadline():
+    searcher = BillSearcher(DelayedClient({119: 5.0, 118: 0.0, 117: 0.0, 116: 0.0}))
+    searcher.search_deadline = 0.2
+    results = asyncio.run(searcher._direct_search("climate", 5))
+    assert {bill["congress"] for bill in results} == {118}
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_batch_masks_match_per_bill_matchers(query):
+    searcher = BillSearcher(client=None)
+    assert searcher._relevance_mask(BILLS, query) == [is_relevant_match(searcher, b, query) for b in BILLS]
+    assert searcher._keyword_mask(BILLS, query) == [matches_keyword(b, query) for b in BILLS]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_batch_relevance_scores_match_per_bill_score(query):
+    searcher = BillSearcher(client=None)
+    expected = [calculate_simple_relevance(searcher, b, query) for b in BILLS]
+    assert searcher._relevance_scores(BILLS, query).tolist() == expected
+
+
+def test_relevance_scores_of_no_bills():
+    assert BillSearcher(client=None)._relevance_scores([], "tax").tolist() == []
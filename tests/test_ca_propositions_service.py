@@ -0,0 +1,102 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+import ca_propositions_service
+from ca_propositions_service import CAPropositionsService, _describe, index_proposition_pdf
+
+PROP_50 = """TEXT OF PROPOSED LAWS
+PROPOSITION 50
+ELECTION RIGGING RESPONSE ACT
+This initiative measure is submitted to the people in accordance with the provisions of Article II. It amends
+the California Constitution."""
+
+CITATIONS = """In 2008 voters approved Proposition 11, which created the Citizens Redistricting
+Commission, and in 2010 Proposition 20 extended it to congressional districts.
+PROPOSITION 11
+is quoted here on a line of its own."""
+
+PROP_51 = """PROPOSITION 51
+SCHOOL FACILITIES BOND ACT
+This measure authorizes bonds for the construction and modernization of school facilities across the state."""
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+
+class FakePDF:
+    def __init__(self, pages):
+        self.pages = [FakePage(text) for text in pages]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def pdf_pages(monkeypatch):
+    pages = []
+    monkeypatch.setattr(ca_propositions_service.pdfplumber, "open", lambda path: FakePDF(pages))
+    return pages
+
+
+def test_citations_of_other_propositions_do_not_start_one(pdf_pages):
+    pdf_pages += [PROP_50, CITATIONS, "SEC. 3. proposition 20 continued.\nPROPOSITION 50", PROP_51, None]
+    index = index_proposition_pdf("text.pdf")
+
+    assert [(p["number"], p["start"], p["end"]) for p in index["propositions"]] == [("50", 0, 3), ("51", 3, 5)]
+    assert index["pages"][4] == ""
+    assert index["propositions"][0]["title"] == "Election Rigging Response Act"
+    assert index["propositions"][1]["title"] == "School Facilities Bond Act"
+
+
+def test_describe_takes_the_first_title_and_sentence():
+    described = _describe(PROP_50.split("PROPOSITION 50", 1)[1])
+    assert described == {
+        "title": "Election Rigging Response Act",
+        "description": "This initiative measure is submitted to the people in accordance with the provisions of "
+                       "Article II.",
+    }
+    assert _describe("\n\n") == {"title": "", "description": ""}
+
+
+def test_proposition_text_spans_its_pages(pdf_pages, monkeypatch):
+    pdf_pages += [PROP_50, CITATIONS, PROP_51]
+    index = index_proposition_pdf("text.pdf")
+    service = CAPropositionsService()
+
+    async def get_index(election_cycle):
+        return index
+
+    monkeypatch.setattr(service, "get_index", get_index)
+    result = asyncio.run(service.get_proposition_text("prop_2025_50"))
+    assert result["pages"] == [1, 2] and result["text"] == f"{PROP_50}\n\n{CITATIONS}"
+    assert asyncio.run(service.get_proposition_text("prop_2025_11")) is None
+
+    listed = asyncio.run(service._load_propositions_list("2025_special"))
+    assert [p["number"] for p in listed] == ["50", "51"]
+    assert listed[0]["shortTitle"] == "Redistricting Commission Reform"  # Curated summary wins
+    assert listed[1]["shortTitle"] == "School Facilities Bond Act"
+
+
+def test_current_election_is_the_next_one_with_text():
+    service = CAPropositionsService()
+    service.ELECTIONS = {
+        "2024_general": {"date": "2024-11-05"},
+        "2025_special": {"date": "2025-11-04", "text_pdf_url": "a.pdf"},
+        "2026_primary": {"date": "2026-06-02", "text_pdf_url": "b.pdf"},
+    }
+    assert service.get_current_election(date(2025, 1, 1)) == "2025_special"
+    # An election stays current for the grace period after election day
+    assert service.get_current_election(date(2025, 11, 30)) == "2025_special"
+    assert service.get_current_election(date(2025, 12, 5)) == "2026_primary"
+    # Once every election is past, the latest one with text
+    assert service.get_current_election(date(2027, 1, 1)) == "2026_primary"
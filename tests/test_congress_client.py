@@ -0,0 +1,224 @@
+import asyncio
+import json
+
+import pytest
+
+import congress_client
+from congress_client import CongressAPIError, CongressClient, CongressNotFound, TokenBucket
+
+API = "https://api.congress.gov/v3"
+
+
+class FakeClock:
+    """Stands in for time.monotonic and asyncio.sleep; sleeping advances the clock instantly"""
+
+    def __init__(self, real_sleep):
+        self.now = 1000.0
+        self.sleeps = []
+        self.real_sleep = real_sleep
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay, result=None):
+        self.sleeps.append(delay)
+        self.now += delay
+        await self.real_sleep(0)
+        return result
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(asyncio.sleep)
+    monkeypatch.setattr(congress_client, "time", clock)
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+    return clock
+
+
+class FakeResponse:
+    def __init__(self, session, status, body, headers):
+        self.session = session
+        self.status = status
+        self.body = body
+        self.headers = headers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.session.active -= 1
+        return False
+
+    async def read(self):
+        if self.session.latency:
+            await asyncio.sleep(self.session.latency)
+        return self.body
+
+
+class FakeSession:
+    """Answers each GET with `respond(url, params)` -> (status, data, headers), tracking concurrency"""
+
+    def __init__(self, respond, latency=0.01):
+        self.respond = respond
+        self.latency = latency
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append((url, dict(params or {})))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        status, data, response_headers = self.respond(url, params or {})
+        body = data if isinstance(data, bytes) else json.dumps(data).encode()
+        return FakeResponse(self, status, body, response_headers)
+
+
+def scripted(*responses):
+    """Responder replaying (status, data, headers) tuples in order, repeating the last one"""
+    remaining = list(responses)
+
+    def respond(url, params):
+        return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+    return respond
+
+
+def client_for(session, **kwargs):
+    return CongressClient("key", lambda: session, **kwargs)
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2)
+
+    async def run():
+        return [await bucket.acquire() for _ in range(4)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.5, 0.5]
+    clock.now += 60
+    bucket.limit_to(1)  # Refills to capacity, then the server's remaining quota caps it
+    assert bucket.tokens == 1
+
+
+def test_client_rate_limits_api_requests_only(clock):
+    session = FakeSession(scripted((200, {"bills": []}, {})), latency=0)
+    client = client_for(session, hourly_quota=3600, burst=2)
+
+    async def run():
+        for _ in range(3):
+            await client.get("bill/119")
+        await client.get("https://www.govinfo.gov/content/pkg/BILLS.xml", as_text=True)
+
+    asyncio.run(run())
+    assert clock.sleeps == [1.0]  # The third API request waits for a token; govinfo does not
+    assert client.metrics["rate_limit_wait_seconds"] == 1.0
+    assert session.requests[0] == (f"{API}/bill/119", {"api_key": "key", "format": "json"})
+    assert session.requests[-1][1] == {}
+
+
+def test_quota_headers_throttle_the_limiter(clock):
+    session = FakeSession(scripted((200, {}, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "0"})),
+                          latency=0)
+    client = client_for(session, hourly_quota=3600, burst=50)
+
+    async def run():
+        await client.get("bill/119")
+        await client.get("bill/119")
+
+    asyncio.run(run())
+    assert client.metrics["quota_limit"] == 5000 and client.metrics["quota_remaining"] == 0
+    assert clock.sleeps == [1.0]
+
+
+def test_retries_with_jittered_backoff_and_retry_after(clock, monkeypatch):
+    bounds = []
+    monkeypatch.setattr(congress_client.random, "uniform", lambda low, high: bounds.append((low, high)) or high / 2)
+    session = FakeSession(scripted((503, b"busy", {}), (429, b"slow down", {"Retry-After": "2"}),
+                                   (200, {"bill": {"number": "1"}}, {})), latency=0)
+    client = client_for(session, backoff_base=0.5)
+
+    assert asyncio.run(client.get_bill(119, "HR", "1")) == {"number": "1"}
+    assert bounds == [(0, 0.5)]
+    assert clock.sleeps == [0.25, 2.0]
+    assert client.metrics["retries"] == 2 and client.metrics["statuses"] == {"503": 1, "429": 1, "200": 1}
+
+
+def test_gives_up_after_max_retries(clock, monkeypatch):
+    bounds = []
+    monkeypatch.setattr(congress_client.random, "uniform", lambda low, high: bounds.append((low, high)) or 0)
+    session = FakeSession(scripted((500, b"error", {})), latency=0)
+    client = client_for(session, max_retries=3, backoff_base=0.5)
+
+    with pytest.raises(CongressAPIError) as raised:
+        asyncio.run(client.get("bill/119"))
+    assert raised.value.status == 500 and len(session.requests) == 4
+    assert bounds == [(0, 0.5), (0, 1.0), (0, 2.0)]  # Doubling ceiling, full jitter below it
+
+
+def test_client_errors_are_not_retried(clock):
+    session = FakeSession(scripted((404, b"missing", {}), (400, b"bad request", {})), latency=0)
+    client = client_for(session)
+
+    with pytest.raises(CongressNotFound):
+        asyncio.run(client.get("bill/119/hr/99999"))
+    with pytest.raises(CongressAPIError) as raised:
+        asyncio.run(client.get("bill/119/hr/x"))
+    assert raised.value.status == 400
+    assert len(session.requests) == 2 and clock.sleeps == []
+
+
+def pages(count, report_count=True):
+    """Responder for a list endpoint of `count` bills"""
+    def respond(url, params):
+        offset, limit = params["offset"], params["limit"]
+        data = {"bills": [{"number": str(n)} for n in range(offset, min(offset + limit, count))]}
+        if report_count:
+            data["pagination"] = {"count": count}
+        return 200, data, {}
+    return respond
+
+
+def collect(client, **kwargs):
+    async def run():
+        return [page async for page in client.iter_pages("bill/119", "bills", **kwargs)]
+    return asyncio.run(run())
+
+
+def test_iter_pages_prefetches_following_pages_in_order():
+    session = FakeSession(pages(1100))
+    result = collect(client_for(session), page_size=100, prefetch=3)
+
+    assert [page[0]["number"] for page in result] == [str(n) for n in range(0, 1100, 100)]
+    assert sum(len(page) for page in result) == 1100
+    assert len(session.requests) == 11
+    assert session.max_active == 3  # Never more than `prefetch` pages in flight
+
+
+def test_iter_pages_stops_at_short_page_or_max_pages():
+    session = FakeSession(pages(250, report_count=False))
+    assert [len(page) for page in collect(client_for(session), page_size=100)] == [100, 100, 50]
+    assert len(session.requests) == 3
+
+    session = FakeSession(pages(1100))
+    assert len(collect(client_for(session), page_size=100, max_pages=4)) == 4
+    assert len(session.requests) == 4
+
+    session = FakeSession(pages(100))
+    assert collect(client_for(session), page_size=100) == [[{"number": str(n)} for n in range(100)]]
+    assert len(session.requests) == 1  # A full last page with the count reached requests nothing more
+
+
+def test_abandoned_iteration_cancels_prefetched_pages():
+    session = FakeSession(pages(1100), latency=0.05)
+    client = client_for(session)
+
+    async def run():
+        iterator = client.iter_pages("bill/119", "bills", page_size=100, prefetch=3)
+        await iterator.__anext__()
+        await iterator.__anext__()
+        await iterator.aclose()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    # Pages 200 and 300 were in flight and are cancelled; page 400, scheduled last, never starts
+    assert [params["offset"] for _, params in session.requests] == [0, 100, 200, 300]
+    assert session.active == 0
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import threading
+import time
+
+from speech_utils.debate_audio import DebateAudioPipeline
+from speech_utils.speech_text import speech_text
+from speech_utils.tts_cache import TTSAudioCache
+from speech_utils.tts_worker import TTSBackend, TTSWorker
+
+
+class EchoBackend(TTSBackend):
+    """Returns the text as audio after a latency; fails on texts containing "FAIL" """
+
+    name = "echo"
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_default_voice(self):
+        return "voice"
+
+    def synthesize(self, text, voice_name, rate=1.0, pitch=0.0, volume=1.0):
+        with self._lock:
+            self.calls.append(text)
+        time.sleep(self.latency)
+        if "FAIL" in text:
+            raise RuntimeError("backend failure")
+        return text.encode()
+
+
+def speech(round_, speaker, content):
+    return {"round": round_, "speaker": speaker, "content": content}
+
+
+async def debate(pipeline, parts, delay=0.0):
+    """Debate SSE events, enqueueing each speech as it finishes like run_debate does"""
+    yield "data: start\n\n"
+    for index, part in enumerate(parts):
+        await asyncio.sleep(delay)
+        pipeline.enqueue(index, part)
+        yield f"data: speech {index}\n\n"
+    yield "data: done\n\n"
+
+
+def run_merge(worker, parts, delay=0.0):
+    pipeline = DebateAudioPipeline(worker, {"Pro": "pro-voice"})
+
+    async def run():
+        return [event async for event in pipeline.merge(debate(pipeline, parts, delay))]
+
+    # A merge that never terminates fails the test instead of hanging it
+    events = asyncio.run(asyncio.wait_for(run(), 5))
+    return [e for e in events if not e.startswith("data: {")], [json.loads(e[6:]) for e in events if e.startswith("data: {")]
+
+
+def test_speech_text_matches_the_frontend_cleanup():
+    markdown = "## Opening Statement\n\n**The resolution** fails (see [CBO](https://cbo.gov)).\n\n- It costs \"more\"...\n"
+    assert speech_text(markdown) == "Opening Statement The resolution fails see CBO, , , .  It costs more, pause,"
+    assert speech_text("In CONCLUSION: vote con.") == "In CONCLUSION, , ,: vote con."
+    assert speech_text("") == ""
+
+
+def test_merge_ends_after_the_debate_and_every_speech(tmp_path):
+    backend = EchoBackend()
+    worker = TTSWorker(backend, cache=TTSAudioCache(tmp_path))
+    parts = [speech(1, "Pro", "## Constructive\n\n**Pass** the bill."), speech(1, "Con", "Reject it.")]
+    try:
+        debate_events, audio_events = run_merge(worker, parts)
+    finally:
+        worker.shutdown()
+
+    assert debate_events == ["data: start\n\n", "data: speech 0\n\n", "data: speech 1\n\n", "data: done\n\n"]
+    assert sorted(e["index"] for e in audio_events) == [0, 1]
+    assert all(e["type"] == "audio_ready" for e in audio_events)
+    # Markdown is cleaned before synthesis, and the key is that of the cleaned text
+    assert backend.calls.count(speech_text(parts[0]["content"])) == 1
+    pro = next(e for e in audio_events if e["speaker"] == "Pro")
+    assert pro["voice_used"] == "pro-voice"
+    assert pro["audio_key"] == worker.cache.key(speech_text(parts[0]["content"]), "pro-voice", 1.0, 0.0, 1.0,
+                                                 backend.mime_type)
+
+
+def test_merge_ends_with_failed_empty_or_no_speeches(tmp_path):
+    worker = TTSWorker(EchoBackend(), cache=TTSAudioCache(tmp_path))
+    try:
+        debate_events, audio_events = run_merge(worker, [])
+        assert debate_events == ["data: start\n\n", "data: done\n\n"] and audio_events == []
+
+        _, audio_events = run_merge(worker, [speech(1, "Pro", "FAIL now."), speech(1, "Con", "---\n")], delay=0.01)
+    finally:
+        worker.shutdown()
+    assert sorted((e["index"], e["type"]) for e in audio_events) == [(0, "audio_error"), (1, "audio_error")]
+
+
+def test_closing_the_merge_cancels_pending_speeches(tmp_path):
+    backend = EchoBackend(latency=0.2)
+    worker = TTSWorker(backend, max_workers=1, cache=TTSAudioCache(tmp_path))
+    pipeline = DebateAudioPipeline(worker, {})
+
+    async def run():
+        events = pipeline.merge(debate(pipeline, [speech(1, "Pro", f"Speech {i}.") for i in range(3)], delay=0.05))
+        async for event in events:
+            if event == "data: done\n\n":
+                break
+        await events.aclose()
+        await asyncio.sleep(0.3)
+
+    try:
+        asyncio.run(run())
+    finally:
+        worker.shutdown()
+    assert all(task.done() for task in pipeline.tasks)
+    assert backend.calls == ["Speech 0."]  # Queued speeches are dropped with their waiters
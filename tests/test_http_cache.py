@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+
+from http_cache import HTTPCache
+
+
+class FakeResponse:
+    def __init__(self, status, body, headers):
+        self.status = status
+        self.body = body
+        self.headers = headers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        await asyncio.sleep(0.01)
+        return self.body
+
+
+class FakeSession:
+    """Serves a fixed body per URL; answers 304 to conditional requests when `not_modified`"""
+
+    def __init__(self, not_modified=False):
+        self.not_modified = not_modified
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        if self.not_modified and "If-None-Match" in (headers or {}):
+            return FakeResponse(304, b"", {"ETag": '"v1"'})
+        return FakeResponse(200, url.encode() * 200, {"Content-Type": "text/plain", "ETag": '"v1"'})
+
+
+def entry_size(cache, url):
+    return sum(path.stat().st_size for path in cache._paths(cache.cache_url(url)))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    session = FakeSession()
+    probe = HTTPCache(tmp_path / "probe")
+    asyncio.run(probe.request(session, "https://api.example/a"))
+    cache = HTTPCache(tmp_path / "cache", max_bytes=int(entry_size(probe, "https://api.example/a") * 2.5))
+
+    async def run():
+        await cache.request(session, "https://api.example/a")
+        await cache.request(session, "https://api.example/b")
+        assert (await cache.request(session, "https://api.example/a")).source == "hit"
+        await cache.request(session, "https://api.example/c")  # Evicts b, the least recently used
+
+    asyncio.run(run())
+    assert cache.stats["evictions"] == 1
+    assert not any(path.exists() for path in cache._paths(cache.cache_url("https://api.example/b")))
+    summary = cache.summary()
+    assert summary["entries"] == 2 and summary["bytes"] <= cache.max_bytes
+
+
+def test_recency_is_rebuilt_from_disk(tmp_path):
+    session = FakeSession()
+    cache = HTTPCache(tmp_path)
+    for name in "abc":
+        asyncio.run(cache.request(session, f"https://api.example/{name}"))
+    # "a" was read most recently before the restart
+    now = time.time()
+    for age, name in ((30, "b"), (20, "c"), (10, "a")):
+        body_path = cache._paths(cache.cache_url(f"https://api.example/{name}"))[1]
+        os.utime(body_path, (now - age, now - age))
+
+    restarted = HTTPCache(tmp_path, max_bytes=int(entry_size(cache, "https://api.example/a") * 3.5))
+    asyncio.run(restarted.request(session, "https://api.example/d"))
+    assert restarted.stats["evictions"] == 1
+    assert restarted._load(restarted.cache_url("https://api.example/b")) is None
+    assert restarted._load(restarted.cache_url("https://api.example/a")) is not None
+
+
+def test_body_evicted_during_revalidation_is_fetched_again(tmp_path):
+    session = FakeSession(not_modified=True)
+    cache = HTTPCache(tmp_path, default_ttl=0)
+
+    async def run():
+        await cache.request(session, "https://api.example/a")
+        entry = cache._load(cache.cache_url("https://api.example/a"))
+        entry.body_path.unlink()  # As if evicted after the entry was loaded
+        original_load = cache._load
+        cache._load = lambda url: entry
+        try:
+            return await cache.request(session, "https://api.example/a")
+        finally:
+            cache._load = original_load
+
+    response = asyncio.run(run())
+    assert response.status == 200 and response.body == b"https://api.example/a" * 200
+    assert "If-None-Match" not in session.requests[-1][1]
+
+
+def test_concurrent_requests_share_one_fetch_and_release_their_lock(tmp_path):
+    session = FakeSession()
+    cache = HTTPCache(tmp_path)
+
+    async def run():
+        return await asyncio.gather(*(cache.request(session, "https://api.example/a") for _ in range(5)))
+
+    responses = asyncio.run(run())
+    assert len(session.requests) == 1
+    assert sorted(r.source for r in responses) == ["hit"] * 4 + ["miss"]
+    assert cache._locks == {}
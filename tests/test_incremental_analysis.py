@@ -0,0 +1,179 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+import main
+from bill_text import BillSectionIndex, diff_section_indexes
+from bill_text_store import BillTextStore, StoredBillText
+from incremental_analysis import IncrementalAnalyzer, SectionSummaryCache
+
+SECTIONS = {
+    "1": "SHORT TITLE.\nThis Act may be cited as the Clean Water Grants Act.",
+    "2": "GRANT PROGRAM.\n" + "The Administrator shall award grants to States for water infrastructure. " * 8,
+    "3": "ELIGIBILITY.\n" + "A State is eligible if it submits a plan for lead pipe replacement. " * 8,
+    "4": "REPORTS.\nThe Administrator shall report to Congress annually.",
+}
+
+
+def bill(**replaced):
+    sections = {**SECTIONS, **replaced}
+    return "A BILL\n" + "".join(f"SEC. {number}. {body}\n" for number, body in sections.items())
+
+
+def diff(old_text, new_text):
+    return diff_section_indexes(BillSectionIndex.from_text(old_text), BillSectionIndex.from_text(new_text))
+
+
+class FakeCompletion:
+    """Summarizes each section id in the prompt as "summary N" and returns a fixed updated analysis"""
+
+    def __init__(self, drop_ids=()):
+        self.drop_ids = set(drop_ids)
+        self.calls = []
+
+    async def __call__(self, payload, purpose):
+        prompt = payload["messages"][-1]["content"]
+        self.calls.append((purpose, prompt))
+        if purpose == "section summaries":
+            ids = re.findall(r"^\[(S\d+)\]", prompt, re.MULTILINE)
+            return json.dumps({i: f"summary {len(self.calls)}.{i}" for i in ids if i not in self.drop_ids})
+        return "## Executive Summary\nUpdated.\n## What Changed\nReports are now quarterly."
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    complete = FakeCompletion()
+    return IncrementalAnalyzer(complete, SectionSummaryCache(tmp_path / "summaries")), complete
+
+
+def test_summary_cache_is_per_model_and_body(tmp_path):
+    cache = SectionSummaryCache(tmp_path)
+    section = BillSectionIndex.from_text(bill()).get("section-2")
+    assert cache.get("openai/gpt-4o", section) is None
+
+    cache.set("openai/gpt-4o", section, "Creates a grant program.")
+    assert cache.get("openai/gpt-4o", section) == "Creates a grant program."
+    assert cache.get("anthropic/claude", section) is None
+    # The enumerator is not part of the key, so a renumbered section keeps its summary
+    renumbered = BillSectionIndex.from_text(bill().replace("SEC. 2.", "SEC. 7.")).get("section-7")
+    assert cache.get("openai/gpt-4o", renumbered) == "Creates a grant program."
+    assert all(path.parent.parent.name == "openai_gpt-4o" for path in tmp_path.rglob("*.txt"))
+
+
+def test_update_without_changes_reuses_prior_analysis(analyzer):
+    incremental, complete = analyzer
+    result = asyncio.run(incremental.update_analysis("prior", diff(bill(), bill()), "model", "IH", "RH"))
+    assert result == "prior"
+    assert complete.calls == []
+
+
+def test_update_falls_back_when_most_of_the_bill_changed(analyzer):
+    incremental, complete = analyzer
+    rewritten = diff(bill(), bill(**{"2": "GRANT PROGRAM.\n" + "Grants are repealed. " * 60}))
+    assert rewritten.changed_fraction > 0.5
+
+    assert asyncio.run(incremental.update_analysis("prior", rewritten, "model", "IH", "RH")) is None
+    assert complete.calls == []
+
+
+def test_update_summarizes_only_changed_sections_once(analyzer):
+    incremental, complete = analyzer
+    revised = diff(bill(), bill(**{"4": "REPORTS.\nThe Administrator shall report to Congress quarterly."}))
+    assert [new.key for _, new in revised.changed] == ["section-4"] and revised.changed_fraction < 0.5
+
+    result = asyncio.run(incremental.update_analysis("prior analysis", revised, "model", "IH", "RH"))
+    assert result.startswith("## Executive Summary")
+    (purpose, summaries_prompt), (_, update_prompt) = complete.calls
+    assert purpose == "section summaries"
+    assert "annually" in summaries_prompt and "quarterly" in summaries_prompt
+    assert "lead pipe" not in summaries_prompt  # Unchanged sections are never summarized
+    assert "CHANGED SEC. 4. REPORTS." in update_prompt and "summary 1.S1" in update_prompt
+    assert "4 sections are unchanged" in update_prompt and "prior analysis" in update_prompt
+
+    # A later update of the same sections reuses the cached summaries
+    complete.calls.clear()
+    asyncio.run(incremental.update_analysis("prior analysis", revised, "model", "IH", "RH"))
+    assert [purpose for purpose, _ in complete.calls] == ["analysis update"]
+    assert "summary 1.S1" in complete.calls[0][1]
+
+
+def test_missing_summaries_fall_back_to_text_and_are_retried(tmp_path):
+    complete = FakeCompletion(drop_ids={"S2"})
+    incremental = IncrementalAnalyzer(complete, SectionSummaryCache(tmp_path))
+    revised = diff(bill(), bill(**{"4": "REPORTS.\nThe Administrator shall report to Congress quarterly."}))
+    old, new = revised.changed[0]
+
+    summaries = asyncio.run(incremental.summarize_sections([old, new], "model"))
+    assert summaries[old.body_hash] == "summary 1.S1"
+    assert summaries[new.body_hash] == new.text[:300]
+    assert incremental.summary_cache.get("model", new) is None
+
+    complete.drop_ids.clear()
+    asyncio.run(incremental.summarize_sections([old, new], "model"))
+    assert complete.calls[-1][1].count("[S") == 1  # Only the missing summary is requested again
+
+
+@pytest.fixture
+def versions(tmp_path, monkeypatch):
+    """Stored previous and current versions with the previous version's results persisted"""
+    store = BillTextStore(tmp_path)
+    complete = FakeCompletion()
+    monkeypatch.setattr(main, "bill_text_store", store)
+    monkeypatch.setattr(main, "incremental_analyzer", IncrementalAnalyzer(complete, SectionSummaryCache(tmp_path)))
+    monkeypatch.setattr(main, "analysis_cache", {})
+    monkeypatch.setattr(main, "grades_cache", {})
+
+    def stored(version_date, version_type, text):
+        return StoredBillText(119, "HR", "1", version_date, version_type, "formatted text", text, tmp_path)
+
+    def prepare(current_text):
+        previous, current = stored("2025-01-03", "IH", bill()), stored("2025-03-04", "RH", current_text)
+        previous_key = main.base_analysis_key(f"HR 1\n\n{previous.text}", "model")
+        main.analysis_cache[previous_key] = {"analysis": "prior analysis", "generated": "earlier"}
+        main.grades_cache[previous_key] = {"overall": 80}
+        main.remember_version_analysis(previous, previous_key, "model")
+        main.analysis_cache.clear()
+        main.grades_cache.clear()
+
+        async def get_previous_stored(client, current_version):
+            return previous
+
+        monkeypatch.setattr(store, "get_previous_stored", get_previous_stored)
+        return current, main.base_analysis_key(f"HR 1\n\n{current.text}", "model")
+
+    return prepare, complete
+
+
+def test_unchanged_version_reuses_prior_grades_and_analysis(versions):
+    prepare, complete = versions
+    current, key = prepare(bill())
+    asyncio.run(main.prime_revised_analysis(current, "HR 1", key, "model"))
+
+    assert main.grades_cache[key] == {"overall": 80}
+    assert main.analysis_cache[key]["analysis"] == "prior analysis"
+    assert complete.calls == []
+
+
+def test_changed_version_updates_analysis_but_regrades(versions):
+    prepare, complete = versions
+    current, key = prepare(bill(**{"4": "REPORTS.\nThe Administrator shall report to Congress quarterly."}))
+    asyncio.run(main.prime_revised_analysis(current, "HR 1", key, "model"))
+
+    assert key not in main.grades_cache  # Left for the pipeline to grade again
+    assert main.analysis_cache[key]["analysis"].startswith("## Executive Summary")
+    assert [purpose for purpose, _ in complete.calls] == ["section summaries", "analysis update"]
+
+
+def test_current_version_results_are_loaded_before_any_update(versions):
+    prepare, complete = versions
+    current, key = prepare(bill(**{"4": "REPORTS.\nThe Administrator shall report to Congress quarterly."}))
+    main.bill_text_store.save_artifact(current, "analysis--model.json", json.dumps({"analysis": "own analysis"}))
+    main.bill_text_store.save_artifact(current, "grades--model.json", json.dumps({"overall": 90}))
+
+    assert main._load_version_results(current, key, "model") == {"analysis": {"analysis": "own analysis"},
+                                                                "grades": {"overall": 90}}
+    asyncio.run(main.prime_revised_analysis(current, "HR 1", key, "model"))
+    assert main.analysis_cache[key] == {"analysis": "own analysis"} and main.grades_cache[key] == {"overall": 90}
+    assert complete.calls == []
@@ -0,0 +1,94 @@
+import base64
+import io
+import json
+import zipfile
+
+import pytest
+
+from legiscan_dataset import LegiScanDatasetImporter, extract_zip_payload
+from legiscan_service import LegiScanService
+from legiscan_store import LegiScanStore
+
+
+def bill(bill_id, change_hash="h", title="Water Rights Act"):
+    return {"bill_id": bill_id, "state": "CA", "session_id": 2172, "bill_number": f"AB{bill_id}",
+            "title": title, "description": title, "change_hash": change_hash,
+            "history": [{"date": "2025-03-01", "action": "Introduced"}]}
+
+
+def zip_bytes(bills):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("CA/2025-2026_Regular_Session/people/1.json", json.dumps({"person": {"people_id": 1}}))
+        for b in bills:
+            archive.writestr(f"CA/2025-2026_Regular_Session/bill/AB{b['bill_id']}.json", json.dumps({"bill": b}))
+    return buffer.getvalue()
+
+
+def dataset_response(payload, separator='":"'):
+    encoded = base64.b64encode(payload).decode("ascii").replace("/", "\\/")  # As PHP's json_encode escapes it
+    return f'{{"status":"OK","dataset":{{"session_id":2172,"zip{separator}{encoded}"}}}}'.encode()
+
+
+@pytest.fixture
+def importer(tmp_path):
+    store = LegiScanStore(tmp_path / "legiscan.db")
+    yield LegiScanDatasetImporter(LegiScanService("", None), store, (), tmp_path, batch_size=2)
+    store.close()
+
+
+@pytest.mark.parametrize("separator", ['":"', '" : "', '":\n  "'])
+@pytest.mark.parametrize("chunk_size", [3, 5, 1 << 20])
+def test_zip_payload_is_decoded_across_chunks(tmp_path, separator, chunk_size):
+    payload = zip_bytes([bill(1), bill(2)]) + b"\xff" * 7  # Trailing bytes leave base64 padding
+    src, dst = tmp_path / "dataset.json", tmp_path / "dataset.zip"
+    src.write_bytes(dataset_response(payload, separator))
+    extract_zip_payload(src, dst, chunk_size=chunk_size)
+    assert dst.read_bytes() == payload
+
+
+def test_zip_payload_errors(tmp_path):
+    src, dst = tmp_path / "dataset.json", tmp_path / "dataset.zip"
+    src.write_bytes(b'{"status":"OK","dataset":{"session_id":2172}}')
+    with pytest.raises(ValueError, match="No base64 .zip. field"):
+        extract_zip_payload(src, dst, chunk_size=4)
+    src.write_bytes(b'{"dataset":{"zip":"UEsDBA')
+    with pytest.raises(ValueError, match="Truncated base64"):
+        extract_zip_payload(src, dst, chunk_size=4)
+
+
+def test_import_writes_bills_in_batches(importer, tmp_path):
+    path = tmp_path / "dataset.json"
+    path.write_bytes(dataset_response(zip_bytes([bill(1), bill(2), bill(3, title="Housing Permits Act")])))
+    result = importer.import_archive(path, dataset_hash="d1", dataset_date="2025-03-02")
+
+    assert result == {"state": "CA", "sessionId": 2172, "bills": 3, "removed": 0}
+    store = importer.store
+    assert store.counts()["bills"] == 3 and store.counts()["details"] == 3
+    assert [r["id"] for r in store.search("CA", "housing", 10)] == [3]
+    assert store.get_detail(2, max_age=0)["changeHash"] == "h"
+    assert store.dataset_hash(2172) == "d1"
+    assert not (tmp_path / "dataset.json.zip").exists()  # Decoded archive is removed
+
+
+def test_reimport_prunes_bills_dropped_from_the_dataset(importer, tmp_path):
+    first, second = tmp_path / "first.zip", tmp_path / "second.zip"
+    first.write_bytes(zip_bytes([bill(1), bill(2), bill(3)]))
+    second.write_bytes(zip_bytes([bill(1, change_hash="h2", title="Water Storage Act"), bill(3)]))
+    importer.import_archive(first, dataset_hash="d1")
+    result = importer.import_archive(second, dataset_hash="d2")
+
+    assert result["bills"] == 2 and result["removed"] == 1
+    store = importer.store
+    assert sorted(r["id"] for r in store.list_session(2172)) == [1, 3]
+    assert store.get_detail(2, max_age=3600) is None
+    assert store.get_detail(1, max_age=0)["title"] == "Water Storage Act"
+    assert [r["id"] for r in store.search("CA", "storage", 10)] == [1]
+    assert store.dataset_hash(2172) == "d2"
+
+
+def test_archive_without_bills_is_rejected(importer, tmp_path):
+    path = tmp_path / "empty.zip"
+    path.write_bytes(zip_bytes([]))
+    with pytest.raises(ValueError, match="No bills"):
+        importer.import_archive(path)
@@ -0,0 +1,39 @@
+import base64
+import io
+import json
+
+import pytest
+
+from legiscan_service import decode_base64_field, extract_document_text
+
+
+def bill_text_response(doc: bytes, mime="text/html", separator='":"'):
+    encoded = base64.b64encode(doc).decode("ascii").replace("/", "\\/")
+    return (f'{{"status":"OK","text":{{"doc_id":2955,"mime":"{mime}","text_size":{len(doc)},'
+            f'"doc{separator}{encoded}","url":"https:\\/\\/legiscan.com\\/CA\\/text"}}}}').encode()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_field_is_decoded_and_removed_from_the_response(chunk_size):
+    doc = bytes(range(256)) * 3 + b"?"
+    out = io.BytesIO()
+    rest = decode_base64_field(io.BytesIO(bill_text_response(doc, separator='" :  "')), out, "doc", chunk_size)
+    assert out.getvalue() == doc
+    data = json.loads(rest)
+    assert data["text"]["doc"] == "" and data["text"]["doc_id"] == 2955
+    assert data["text"]["url"] == "https://legiscan.com/CA/text"
+
+
+def test_document_text_is_extracted():
+    html = "<html><body><p>SECTION 1.  The people of the State of California enact:</p></body></html>"
+    text, note = extract_document_text(bill_text_response(html.encode()))
+    assert note == "text/html"
+    assert "SECTION 1." in text and "<p>" not in text
+
+
+def test_document_errors_are_reported():
+    assert extract_document_text(b'{"status":"ERROR","alert":{"message":"Unknown text id"}}') == \
+        (None, "LegiScan API error: {'message': 'Unknown text id'}")
+    assert extract_document_text(bill_text_response(b"")) == (None, "no document data")
+    assert extract_document_text(b'{"status":"OK","text":{"doc_id":1}}') == (None, "no document data")
+    assert extract_document_text(bill_text_response(b"\xff\xfe")) == (None, "document is not UTF-8")
@@ -0,0 +1,97 @@
+import pytest
+
+import legiscan_store
+from legiscan_store import LegiScanStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(legiscan_store, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LegiScanStore(tmp_path / "legiscan.db")
+    yield store
+    store.close()
+
+
+def record(bill_id, change_hash, title="Water Rights Act", number=None, last_action="2025-01-10"):
+    return {"id": bill_id, "number": number or f"AB {bill_id}", "title": title, "description": title,
+            "changeHash": change_hash, "lastActionDate": last_action}
+
+
+def test_master_list_rewrites_only_changed_rows(store):
+    first = [record(1, "a"), record(2, "b"), record(3, "c")]
+    assert store.apply_master_list("CA", 100, first) == {"added": 3, "changed": 0, "removed": 0, "unchanged": 0}
+    generation = store.generation
+
+    assert store.apply_master_list("CA", 100, first) == {"added": 0, "changed": 0, "removed": 0, "unchanged": 3}
+    assert store.generation == generation
+
+    second = [record(1, "a"), record(2, "b2", title="Housing Permits Act", last_action="2025-02-01"), record(4, "d")]
+    assert store.apply_master_list("CA", 100, second) == {"added": 1, "changed": 1, "removed": 1, "unchanged": 1}
+    assert store.generation == generation + 1
+
+    listed = [r["id"] for r in store.list_session(100)]
+    assert listed[0] == 2 and sorted(listed) == [1, 2, 4]  # Most recent action first
+    assert [r["id"] for r in store.search("CA", "housing", 10)] == [2]
+    assert sorted(r["id"] for r in store.search("CA", "water", 10)) == [1, 4]
+    assert store.find_number("CA", "A.B. 3") == []
+
+
+def test_master_lists_of_other_sessions_are_untouched(store):
+    store.apply_master_list("CA", 100, [record(1, "a")])
+    store.apply_master_list("CA", 101, [record(2, "b")])
+    store.apply_master_list("CA", 100, [])
+    assert store.list_session(100) == []
+    assert [r["id"] for r in store.list_session(101)] == [2]
+
+
+def test_detail_is_current_while_its_hash_matches_the_master_list(store, clock):
+    store.apply_master_list("CA", 100, [record(1, "a")])
+    clock.now += 10
+    store.save_detail({"id": 1, "changeHash": "a", "title": "Water Rights Act"})
+    assert store.get_detail(1, max_age=60)["changeHash"] == "a"
+
+    clock.now += 3600  # Age alone does not expire details of synced sessions
+    assert store.get_detail(1, max_age=60) is not None
+
+    store.apply_master_list("CA", 100, [record(1, "a2")])
+    assert store.get_detail(1, max_age=60) is None
+    assert store.stale_details(10) == [1]
+
+
+def test_detail_fetched_after_the_master_list_is_current(store, clock):
+    store.apply_master_list("CA", 100, [record(1, "a")])
+    clock.now += 10
+    # The bill changed after the list was synced; the fetched detail is newer than the listing
+    store.save_detail({"id": 1, "changeHash": "a2", "title": "Water Rights Act"})
+    assert store.get_detail(1, max_age=60)["changeHash"] == "a2"
+    assert store.stale_details(10) == []
+
+    clock.now += 10
+    store.apply_master_list("CA", 100, [record(1, "a2")])
+    assert store.get_detail(1, max_age=60)["changeHash"] == "a2"
+
+    clock.now += 10
+    store.apply_master_list("CA", 100, [record(1, "a3")])
+    assert store.get_detail(1, max_age=60) is None
+
+
+def test_detail_outside_synced_sessions_expires_by_age(store, clock):
+    store.save_detail({"id": 7, "changeHash": "x"})
+    clock.now += 30
+    assert store.get_detail(7, max_age=60) is not None
+    clock.now += 60
+    assert store.get_detail(7, max_age=60) is None
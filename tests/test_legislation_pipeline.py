@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from legislation_pipeline import AnalysisError, LegislationPipeline
+
+
+def make_pipeline(started, cancelled, analysis_delay=10.0):
+    async def analyze(text, model, **kwargs):
+        started.append("analysis")
+        try:
+            await asyncio.sleep(analysis_delay)
+        except asyncio.CancelledError:
+            cancelled.append("analysis")
+            raise
+        return f"analysis of {len(text)} chars"
+
+    async def grade(text, model, **kwargs):
+        started.append("grades")
+        try:
+            await asyncio.sleep(10.0)
+        except asyncio.CancelledError:
+            cancelled.append("grades")
+            raise
+        return {"overall": 1}
+
+    return LegislationPipeline(analyze, grade, lambda text, limit: text[:limit], max_chars=100)
+
+
+def test_run_cancels_both_stages_when_caller_is_cancelled():
+    started, cancelled = [], []
+    pipeline = make_pipeline(started, cancelled)
+
+    async def scenario():
+        run = asyncio.create_task(pipeline.run("bill text", "model"))
+        await asyncio.sleep(0.05)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert sorted(started) == ["analysis", "grades"]
+    assert sorted(cancelled) == ["analysis", "grades"]
+
+
+def test_run_returns_partial_result_when_grading_times_out():
+    started, cancelled = [], []
+    pipeline = make_pipeline(started, cancelled, analysis_delay=0.01)
+    pipeline.grading_timeout = 0.05
+
+    result = asyncio.run(pipeline.run("x" * 500, "model"))
+    assert result["analysis"] == "analysis of 100 chars"
+    assert result["grades"] is None
+    assert result["errors"] == {"grades": "Grades timed out"}
+
+
+def test_run_raises_analysis_error_when_analysis_times_out():
+    started, cancelled = [], []
+    pipeline = make_pipeline(started, cancelled, analysis_delay=1.0)
+    pipeline.analysis_timeout = 0.05
+
+    with pytest.raises(AnalysisError, match="timed out") as raised:
+        asyncio.run(pipeline.run("bill text", "model"))
+    assert raised.value.timed_out
+    assert "analysis" in cancelled
+
+
+def test_run_without_extraction_analyzes_full_text():
+    pipeline = make_pipeline([], [], analysis_delay=0.01)
+    pipeline.grading_timeout = 0.05
+
+    result = asyncio.run(pipeline.run("x" * 500, "model", extract=False))
+    assert result["analysis"] == "analysis of 500 chars"
+
+
+def test_stream_emits_status_before_priming_finishes():
+    pipeline = make_pipeline([], [], analysis_delay=0.01)
+    pipeline.grading_timeout = 0.05
+    primed = asyncio.Event()
+
+    async def prime():
+        await asyncio.sleep(0.05)
+        primed.set()
+
+    async def scenario():
+        events = pipeline.stream("bill text", "model", prime=prime)
+        first = await events.__anext__()
+        assert '"status"' in first and not primed.is_set()
+        rest = [event async for event in events]
+        assert primed.is_set()
+        return rest
+
+    rest = asyncio.run(scenario())
+    assert '"analysis"' in rest[0] and '"complete"' in rest[-1]
+
+
+def test_failed_priming_still_runs_both_stages():
+    started = []
+    pipeline = make_pipeline(started, [], analysis_delay=0.01)
+    pipeline.grading_timeout = 0.05
+
+    async def prime():
+        raise ValueError("no previous version")
+
+    result = asyncio.run(pipeline.run("bill text", "model", prime=prime))
+    assert result["analysis"] == "analysis of 9 chars"
+    assert sorted(started) == ["analysis", "grades"]
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from preanalysis import BudgetExceeded, DailyTokenBudget, record_usage
+
+
+def test_metered_block_charges_actual_usage(tmp_path):
+    budget = DailyTokenBudget(10000, state_path=tmp_path / "budget.json")
+
+    async def api_call(tokens):
+        await asyncio.sleep(0)
+        record_usage({"prompt_tokens": tokens - 100, "completion_tokens": 100, "total_tokens": tokens})
+
+    async def work():
+        with budget.metered(6000) as usage:
+            assert budget.remaining == 4000
+            # Usage recorded in tasks started inside the block counts too
+            await asyncio.gather(asyncio.create_task(api_call(700)), api_call(300))
+        return usage.tokens
+
+    assert asyncio.run(work()) == 1000
+    assert budget.remaining == 9000
+    assert DailyTokenBudget(10000, state_path=tmp_path / "budget.json").remaining == 9000
+
+
+def test_usage_outside_a_metered_block_is_not_charged():
+    budget = DailyTokenBudget(1000)
+    record_usage({"total_tokens": 500})
+    with budget.metered(800):
+        pass
+    assert budget.remaining == 1000
+
+
+def test_metered_block_refuses_estimates_over_the_remaining_budget():
+    budget = DailyTokenBudget(1000)
+    with pytest.raises(BudgetExceeded):
+        with budget.metered(1500):
+            pass
+    assert budget.remaining == 1000
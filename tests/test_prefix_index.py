@@ -0,0 +1,56 @@
+import threading
+
+from prefix_index import PrefixIndex, normalize_key
+
+
+def test_normalize_key():
+    assert normalize_key("  H.R. 40 ") == "hr 40"
+
+
+def test_suggest_ranks_exact_matches_then_weight():
+    index = PrefixIndex()
+    index.set_source("bill:1", [("Affordable Insulin Now Act", 12.0), ("HR 40", 9.0)])
+    index.set_source("bill:2", [("HR 4024", 15.0)])
+    index.set_source("term:insurance", [("Insurance", 40.0)])
+    index.rebuild()
+    assert index.suggest("insu", 5) == ["Insurance", "Affordable Insulin Now Act"]
+    assert index.suggest("hr 40", 5) == ["HR 40", "HR 4024"]
+    assert index.suggest("H.R. 40", 1) == ["HR 40"]
+
+    index.remove_source("term:insurance")
+    assert index.dirty
+    index.rebuild()
+    assert index.suggest("insu", 5) == ["Affordable Insulin Now Act"]
+
+
+def test_sources_can_change_while_rebuilding_in_another_thread():
+    index = PrefixIndex()
+    for i in range(2000):
+        index.set_source(f"bill:{i}", [(f"Bill number {i} act", float(i))])
+    errors = []
+    stop = threading.Event()
+
+    def rebuild_repeatedly():
+        try:
+            while not stop.is_set():
+                index.rebuild()
+        except Exception as e:  # e.g. "dictionary changed size during iteration"
+            errors.append(e)
+
+    worker = threading.Thread(target=rebuild_repeatedly)
+    worker.start()
+    try:
+        for i in range(20000):
+            index.set_source(f"query:{i}", [(f"query {i}", 1.0)])
+            if i % 3 == 0:
+                index.remove_source(f"query:{i - 1}")
+    finally:
+        stop.set()
+        worker.join()
+
+    assert errors == []
+    # Sources added during the last rebuild are picked up by the next one
+    if index.dirty:
+        index.rebuild()
+    assert index.suggest("query 19999", 1) == ["query 19999"]
+    assert index.suggest("query 19997", 1) == []
@@ -0,0 +1,79 @@
+import hashlib
+import threading
+
+import numpy as np
+
+from semantic_index import SemanticIndex
+
+
+class HashEncoder:
+    """Deterministic unit vectors derived from the text, standing in for a sentence-transformers model"""
+
+    dim = 16
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, **kwargs):
+        vectors = np.array([
+            np.frombuffer(hashlib.sha256(text.encode()).digest()[:self.dim], dtype=np.uint8) - 127.5
+            for text in texts
+        ], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_update_encodes_only_new_or_changed_items(tmp_path):
+    index = SemanticIndex(tmp_path, encoder=HashEncoder())
+    assert index.update("bills", [("a", "clean water"), ("b", "border security")]) == 2
+    assert index.update("bills", [("a", "clean water"), ("b", "farm subsidies"), ("c", "tax relief")]) == 2
+    assert index.search("bills", "farm subsidies", 1)[0][0] == "b"
+
+    reopened = SemanticIndex(tmp_path, encoder=HashEncoder())
+    assert reopened.update("bills", [("a", "clean water"), ("c", "tax relief")]) == 0
+    assert [item_id for item_id, _ in reopened.search("bills", "tax relief", 3)][0] == "c"
+    assert reopened.size("bills") == 3
+
+
+def test_search_while_another_thread_writes(tmp_path):
+    index = SemanticIndex(tmp_path, encoder=HashEncoder(), batch_size=4)
+    index.update("bills", [(f"bill-{i}", f"text {i}") for i in range(50)])
+    errors = []
+    done = threading.Event()
+
+    def write():
+        try:
+            for round_number in range(40):
+                index.update("bills", [(f"bill-{i}", f"text {i} v{round_number}") for i in range(0, 50, 7)]
+                             + [(f"new-{round_number}-{i}", f"new {round_number} {i}") for i in range(5)])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    searches = 0
+    while not done.is_set() or searches == 0:
+        try:
+            results = index.search("bills", "text 3", 5)
+            assert len(results) == 5 and all(item_id.startswith(("bill-", "new-")) for item_id, _ in results)
+        except Exception as e:
+            errors.append(e)
+            break
+        searches += 1
+    writer.join()
+
+    assert errors == []
+    assert index.size("bills") == 50 + 40 * 5
+    assert index.search("bills", "new 39 4", 1)[0][0] == "new-39-4"
+
+
+def test_concurrent_first_use_opens_one_collection(tmp_path):
+    index = SemanticIndex(tmp_path, encoder=HashEncoder())
+    collections = []
+    threads = [threading.Thread(target=lambda: collections.append(index.collection("topics"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(collection is collections[0] for collection in collections)
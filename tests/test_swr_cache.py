@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+import swr_cache
+from swr_cache import StaleWhileRevalidateCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Loader:
+    """Returns "v1", "v2", ... after `delay`; raises while `failing` is set"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.calls = 0
+        self.failing = False
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        await asyncio.sleep(self.delay)
+        if self.failing:
+            raise RuntimeError("upstream unavailable")
+        return f"v{self.calls}"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(swr_cache, "time", clock)
+    return clock
+
+
+def test_stale_hit_returns_old_value_and_refreshes_once(clock):
+    cache = StaleWhileRevalidateCache(refresh_after=60, max_stale=3600)
+    loader = Loader()
+
+    async def run():
+        assert await cache.get("bills", loader) == "v1"
+        clock.now += 120
+        loader.release = asyncio.Event()
+        stale = await asyncio.gather(*(cache.get("bills", loader) for _ in range(5)))
+        assert loader.calls == 2 and cache.stats["refreshes"] == 1
+        loader.release.set()
+        await asyncio.gather(*cache._background)
+        return stale, await cache.get("bills", loader)
+
+    stale, refreshed = asyncio.run(run())
+    assert stale == ["v1"] * 5  # No request waited on the refresh
+    assert refreshed == "v2" and cache.age("bills") == 0
+    assert cache.stats == {"fresh": 1, "stale": 5, "misses": 1, "refreshes": 1, "refresh_errors": 0}
+
+
+def test_entry_past_max_stale_blocks_on_reload(clock):
+    cache = StaleWhileRevalidateCache(refresh_after=60, max_stale=3600)
+    loader = Loader()
+
+    async def run():
+        await cache.get("bills", loader)
+        clock.now += 3600
+        # Concurrent callers share the one reload
+        return await asyncio.gather(cache.get("bills", loader), cache.get("bills", loader))
+
+    assert asyncio.run(run()) == ["v2", "v2"]
+    assert loader.calls == 2 and cache.stats["misses"] == 3 and cache.stats["refreshes"] == 0
+
+
+def test_failed_refresh_keeps_serving_stale_value(clock):
+    cache = StaleWhileRevalidateCache(refresh_after=60, max_stale=3600)
+    loader = Loader()
+
+    async def run():
+        await cache.get("bills", loader)
+        loader.failing = True
+        clock.now += 120
+        assert await cache.get("bills", loader) == "v1"
+        await asyncio.gather(*cache._background, return_exceptions=True)
+        assert cache.stats["refresh_errors"] == 1
+        assert cache._entries["bills"].last_error == "upstream unavailable"
+        assert await cache.get("bills", loader) == "v1"  # Another refresh is attempted, the value still served
+        await asyncio.gather(*cache._background, return_exceptions=True)
+
+        clock.now += 3600
+        with pytest.raises(RuntimeError, match="upstream unavailable"):
+            await cache.get("bills", loader)
+
+    asyncio.run(run())
+    assert loader.calls == 4 and cache.stats["refresh_errors"] == 2
+
+
+def test_oldest_entry_is_evicted(clock):
+    cache = StaleWhileRevalidateCache(refresh_after=60, max_stale=3600, maxsize=2)
+    for key in "abc":
+        cache.set(key, key)
+        clock.now += 1
+    assert "a" not in cache and "b" in cache and "c" in cache
@@ -0,0 +1,56 @@
+import os
+import time
+
+from speech_utils.tts_cache import TTSAudioCache, normalize_text
+
+
+def key(text):
+    return TTSAudioCache.key(text, "en-US-Neural2-D", 1.0, 0.0, 0.0, "mp3")
+
+
+def test_key_ignores_whitespace_differences():
+    assert normalize_text("  Mr.  Speaker,\n thank you ") == "Mr. Speaker, thank you"
+    assert key("Mr. Speaker,\n\nthank you") == key(" Mr. Speaker, thank you")
+    assert key("Mr. Speaker") != TTSAudioCache.key("Mr. Speaker", "en-US-Neural2-D", 1.1, 0.0, 0.0, "mp3")
+
+
+def test_least_recently_used_audio_is_evicted(tmp_path):
+    cache = TTSAudioCache(tmp_path, max_bytes=250)
+    cache.put(key("a"), b"a" * 100)
+    cache.put(key("b"), b"b" * 100)
+    assert cache.get(key("a")) == b"a" * 100  # "b" is now the least recently used
+    cache.put(key("c"), b"c" * 100)
+
+    assert cache.get(key("b")) is None
+    assert cache.get(key("a")) == b"a" * 100 and cache.get(key("c")) == b"c" * 100
+    summary = cache.summary()
+    assert summary["evictions"] == 1 and summary["entries"] == 2 and summary["bytes"] == 200
+    assert not cache._path(key("b")).exists()
+
+
+def test_audio_larger_than_the_cache_is_not_stored(tmp_path):
+    cache = TTSAudioCache(tmp_path, max_bytes=50)
+    cache.put(key("a"), b"a" * 51)
+    assert cache.get(key("a")) is None and cache.summary()["evictions"] == 0
+
+
+def test_recency_survives_a_restart(tmp_path):
+    cache = TTSAudioCache(tmp_path)
+    for name in "abc":
+        cache.put(key(name), name.encode() * 100)
+    now = time.time()
+    for age, name in ((30, "b"), (20, "c"), (10, "a")):
+        os.utime(cache._path(key(name)), (now - age, now - age))
+
+    restarted = TTSAudioCache(tmp_path, max_bytes=350)
+    restarted.put(key("d"), b"d" * 100)
+    assert restarted.get(key("b")) is None
+    assert all(restarted.get(key(name)) is not None for name in "acd")
+
+
+def test_removed_file_counts_as_a_miss(tmp_path):
+    cache = TTSAudioCache(tmp_path)
+    cache.put(key("a"), b"a" * 100)
+    cache._path(key("a")).unlink()
+    assert cache.get(key("a")) is None
+    assert cache.summary()["entries"] == 0 and cache.summary()["bytes"] == 0
@@ -0,0 +1,118 @@
+import asyncio
+import io
+import threading
+import time
+import wave
+
+from speech_utils.tts_cache import TTSAudioCache
+from speech_utils.tts_worker import LocalTTSBackend, TTSBackend, TTSWorker, split_text
+
+SPEECH = " ".join(f"Point number {i} of this rebuttal shows the opposing case does not hold up." for i in range(40))
+
+
+class RecordingBackend(TTSBackend):
+    """MP3-like backend echoing the text after a fixed latency"""
+
+    name = "recording"
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_default_voice(self):
+        return "voice"
+
+    def synthesize(self, text, voice_name, rate=1.0, pitch=0.0, volume=1.0):
+        with self._lock:
+            self.calls.append(text)
+        time.sleep(self.latency)
+        return text.encode()
+
+
+def wav_frames(audio):
+    with wave.open(io.BytesIO(audio), "rb") as wav:
+        return wav.readframes(wav.getnframes())
+
+
+def test_split_text_keeps_every_word_in_order():
+    chunks = split_text(SPEECH)
+    assert len(chunks) > 2
+    assert " ".join(chunks).split() == SPEECH.split()
+    assert len(chunks[0]) <= 200 and all(len(chunk) <= 1200 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)  # Split at sentence boundaries
+
+
+def test_split_text_breaks_at_paragraphs_and_collapses_whitespace():
+    assert split_text("Opening statement\n\n  Second   paragraph\nwithout periods", first_chars=10) == \
+        ["Opening statement", "Second paragraph without periods"]
+    assert split_text("   \n\n ") == []
+
+
+def test_split_text_respects_the_byte_limit():
+    sentence = ", ".join(["éléphant rapide"] * 30) + "."
+    chunks = split_text(sentence, max_bytes=100)
+    assert all(len(chunk.encode("utf-8")) <= 100 for chunk in chunks)
+    assert " ".join(chunks).replace(",", "").split() == sentence.replace(",", "").split()
+
+    unbroken = "x" * 300  # No clause or space to split at
+    chunks = split_text(unbroken, max_bytes=100)
+    assert "".join(chunks).replace(" ", "") == unbroken and all(len(chunk) <= 100 for chunk in chunks)
+
+
+def test_wav_chunks_are_joined_into_one_file():
+    backend = LocalTTSBackend(latency=0, latency_per_char=0)
+    worker = TTSWorker(backend)
+    try:
+        audio = asyncio.run(worker.synthesize_chunked(SPEECH))
+    finally:
+        worker.shutdown()
+    expected = b"".join(wav_frames(backend.synthesize(chunk, "local-female")) for chunk in split_text(SPEECH))
+    assert wav_frames(audio) == expected
+
+    streamed = b"".join(backend.stream_part(backend.synthesize(chunk, "local-female"), first=i == 0)
+                        for i, chunk in enumerate(split_text(SPEECH)))
+    assert wav_frames(streamed) == expected
+    assert backend.join([]) == b""
+
+
+def test_closing_a_stream_cancels_chunks_nobody_waits_for(tmp_path):
+    backend = RecordingBackend()
+    worker = TTSWorker(backend, max_workers=1, cache=TTSAudioCache(tmp_path))
+    chunks = split_text(SPEECH)
+
+    async def run():
+        stream = worker.stream(SPEECH, parallel=4)
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(backend.latency * 4)
+        return first
+
+    try:
+        assert asyncio.run(run()) == chunks[0].encode()
+    finally:
+        worker.shutdown()
+    assert len(chunks) > 3
+    # Only the chunk already running may finish; queued ones never start
+    assert backend.calls in (chunks[:1], chunks[:2])
+    assert worker._inflight == {} and worker._waiters == {}
+    assert worker.stats()["queued"] == 0
+
+
+def test_synthesis_shared_by_another_request_is_not_cancelled(tmp_path):
+    backend = RecordingBackend()
+    worker = TTSWorker(backend, cache=TTSAudioCache(tmp_path))
+
+    async def run():
+        leaving = asyncio.create_task(worker.synthesize("Shared speech."))
+        staying = asyncio.create_task(worker.synthesize("Shared speech."))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        return await staying
+
+    try:
+        assert asyncio.run(run()) == b"Shared speech."
+    finally:
+        worker.shutdown()
+    assert backend.calls == ["Shared speech."]
+    assert worker._inflight == {} and worker._waiters == {}